@@ -0,0 +1,218 @@
+"""
+Time the generator stages (parse_header, generate_cpp_bridge,
+generate_gml_stub, generate_yy_extension) on the checked-in OpenXR
+expansion and on synthetic copies of it scaled to 10x/100x the functions
+and structs. Each stage reports its median wall time, plus the peak Python
+heap and the memory blocks it leaves allocated, from a separate run under
+tracemalloc. The results are written as JSON. With --compare, the run
+fails if any stage got slower than a previous result by more than
+--tolerance.
+
+    py benchmarks/generation_bench.py [--scales 1,10,100] [--repeat N] [--json out.json]
+                                      [--compare base.json] [--tolerance 0.25]
+"""
+import io
+import re
+import sys
+import json
+import time
+import argparse
+import platform
+import statistics
+import tempfile
+import tracemalloc
+import contextlib
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from parser import parse_header
+from generator.cpp_bridge_gen import generate_cpp_bridge
+from generator.gml_stub_gen import generate_gml_stub
+from generator.yy_extension_gen import generate_yy_extension
+
+STAGES = ("parse_header", "generate_cpp_bridge", "generate_gml_stub", "generate_yy_extension")
+
+# Every OpenXR identifier starts with one of these; each synthetic copy gets
+# its own infix so names stay unique (XrSpace → XrS2Space, XR_TRUE → XR_S2_TRUE)
+OPENXR_PREFIX_RE = re.compile(r"\b(PFN_xr|XR_|Xr|xr)(?=\w)")
+
+
+def scaled_header(source: Path, scale: int, out_dir: Path) -> Path:
+    """`source` with its OpenXR part repeated `scale` times under fresh names."""
+    if scale == 1:
+        return source
+    content = source.read_text(encoding="utf-8", errors="replace")
+    start   = OPENXR_PREFIX_RE.search(content)
+    start   = content.rfind("\n", 0, start.start()) + 1 if start else 0
+    prelude, body = content[:start], content[start:]
+
+    parts = [prelude, body]
+    for copy in range(2, scale + 1):
+        parts.append(OPENXR_PREFIX_RE.sub(
+            lambda m: f"{m.group(1)}S{copy}_" if m.group(1) == "XR_" else f"{m.group(1)}S{copy}",
+            body,
+        ))
+    path = out_dir / f"{source.stem}_x{scale}.h"
+    path.write_text("\n".join(parts), encoding="utf-8")
+    return path
+
+
+def run_stages(config, quiet=True):
+    """Run every stage once; return ({stage: seconds}, {stage: output bytes}, parse_result)."""
+    seconds, sizes = {}, {}
+    sink = io.StringIO() if quiet else sys.stdout
+    with contextlib.redirect_stdout(sink):
+        started = time.perf_counter()
+        parse_result = parse_header(config)
+        seconds["parse_header"] = time.perf_counter() - started
+
+        # Streamed like main.py, so only one chunk is alive at a time
+        started = time.perf_counter()
+        sizes["generate_cpp_bridge"] = sum(
+            len(chunk)
+            for chunks in generate_cpp_bridge(parse_result, config, stream=True).values()
+            for chunk in chunks
+        )
+        seconds["generate_cpp_bridge"] = time.perf_counter() - started
+
+        started = time.perf_counter()
+        sizes["generate_gml_stub"] = len(generate_gml_stub(parse_result, config))
+        seconds["generate_gml_stub"] = time.perf_counter() - started
+
+        started = time.perf_counter()
+        sizes["generate_yy_extension"] = len(generate_yy_extension(parse_result, config))
+        seconds["generate_yy_extension"] = time.perf_counter() - started
+    return seconds, sizes, parse_result
+
+
+def trace_stages(config):
+    """Run every stage once under tracemalloc; return {stage: {peak_bytes, retained_blocks}}."""
+    memory = {}
+    sink   = io.StringIO()
+    steps  = {
+        "parse_header":          lambda state: state.update(parse_result=parse_header(config)),
+        "generate_cpp_bridge":   lambda state: sum(
+            len(chunk)
+            for chunks in generate_cpp_bridge(state["parse_result"], config, stream=True).values()
+            for chunk in chunks
+        ),
+        "generate_gml_stub":     lambda state: generate_gml_stub(state["parse_result"], config),
+        "generate_yy_extension": lambda state: generate_yy_extension(state["parse_result"], config),
+    }
+    state = {}
+    tracemalloc.start()
+    try:
+        with contextlib.redirect_stdout(sink):
+            for stage in STAGES:
+                blocks = sys.getallocatedblocks()
+                tracemalloc.reset_peak()
+                base = tracemalloc.get_traced_memory()[0]
+                steps[stage](state)
+                peak = tracemalloc.get_traced_memory()[1]
+                memory[stage] = {
+                    "peak_bytes":      peak - base,
+                    "retained_blocks": sys.getallocatedblocks() - blocks,
+                }
+    finally:
+        tracemalloc.stop()
+    return memory
+
+
+def bench_header(header: Path, scale: int, base_config, repeat, quiet):
+    config = dict(base_config, include_files=[str(header)])
+    runs = {stage: [] for stage in STAGES}
+    for _ in range(repeat):
+        seconds, sizes, parse_result = run_stages(config, quiet)
+        for stage, value in seconds.items():
+            runs[stage].append(value)
+    memory = trace_stages(config)
+
+    return {
+        "header":    header.name,
+        "scale":     scale,
+        "bytes":     header.stat().st_size,
+        "functions": len(parse_result["functions"]),
+        "structs":   len(parse_result["struct_fields"]),
+        "stages": {
+            stage: {
+                "seconds":      statistics.median(runs[stage]),
+                "runs":         runs[stage],
+                "output_bytes": sizes.get(stage),
+                **memory[stage],
+            }
+            for stage in STAGES
+        },
+    }
+
+
+def regressions(results, baseline, tolerance):
+    """Stages slower than the matching baseline entry by more than `tolerance`."""
+    previous = {(r["header"], r["scale"]): r for r in baseline["results"]}
+    slower = []
+    for result in results:
+        before = previous.get((result["header"], result["scale"]))
+        if not before:
+            continue
+        for stage, now in result["stages"].items():
+            then = before["stages"].get(stage)
+            if then and now["seconds"] > then["seconds"] * (1 + tolerance):
+                slower.append((result["header"], stage, then["seconds"], now["seconds"]))
+    return slower
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("header", nargs="?", default=str(ROOT / "openxr_expanded.h"))
+    ap.add_argument("--scales", default="1,10,100", help="comma-separated copies of the header's API")
+    ap.add_argument("--repeat", type=int, default=3)
+    ap.add_argument("--config", default=str(ROOT / "config.json"),
+                    help="generator config to benchmark (include_files and libraries are replaced)")
+    ap.add_argument("--json", help="write results here instead of stdout")
+    ap.add_argument("--compare", help="previous --json output to check for regressions")
+    ap.add_argument("--tolerance", type=float, default=0.25)
+    ap.add_argument("--verbose", action="store_true", help="show the generator's own output")
+    args = ap.parse_args()
+
+    with open(args.config, "r", encoding="utf-8") as cfg_file:
+        config = json.load(cfg_file)
+    # Measure the generator, not the caches, the export filter or the debug dumps
+    config.update(libraries=[], cache=False, profile="release")
+
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for scale in (int(s) for s in args.scales.split(",")):
+            header = scaled_header(Path(args.header).resolve(), scale, Path(tmp))
+            config["output_folder"] = tmp
+            result = bench_header(header, scale, config, args.repeat, not args.verbose)
+            results.append(result)
+            print(
+                f"[GMBridge] x{scale}: {result['functions']} functions, {result['structs']} structs  "
+                + "  ".join(f"{stage} {result['stages'][stage]['seconds']:.3f}s" for stage in STAGES),
+                file=sys.stderr,
+            )
+
+    report = {
+        "python":   platform.python_version(),
+        "platform": platform.platform(),
+        "repeat":   args.repeat,
+        "results":  results,
+    }
+    text = json.dumps(report, indent=2)
+    if args.json:
+        Path(args.json).write_text(text + "\n", encoding="utf-8")
+    else:
+        print(text)
+
+    if args.compare:
+        baseline = json.loads(Path(args.compare).read_text(encoding="utf-8"))
+        slower = regressions(results, baseline, args.tolerance)
+        for header, stage, then, now in slower:
+            print(f"[GMBridge] Regression: {header} {stage} {then:.3f}s -> {now:.3f}s", file=sys.stderr)
+        return 1 if slower else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,99 @@
+"""
+Time struct export (to_json of a struct whose pointer fields all go through
+RefManager::get_ref_for_ptr) against the number of registered types, using
+the RefManager.h this generator emits. The cost per export should stay flat
+as the type count grows.
+
+    py benchmarks/ref_lookup_bench.py [--handles string|int] [--fields K] [--cxx g++]
+"""
+import sys
+import shutil
+import argparse
+import tempfile
+import subprocess
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from generator.cpp_bridge_gen import BRIDGE_STRINGS_H, ref_manager_header
+from generator.ref_handles import REF_HANDLE_MODES
+
+NLOHMANN_INCLUDE = ROOT / "generator" / "dependencies" / "include"
+TYPE_COUNTS      = (1, 10, 100, 1000)
+
+# A struct with K pointer fields, exported the way generate_struct_json_overloads
+# emits ref_handle fields. Every registered type holds one live object, so the
+# per-type reverse maps of the old lookup are all non-empty.
+BENCH_CPP = r'''
+#include <chrono>
+#include <cstdio>
+#include <cstdlib>
+#include <string>
+#include <vector>
+#include "RefManager.h"
+
+int main(int argc, char** argv) {
+    const int fields     = std::atoi(argv[1]);
+    const int iterations = std::atoi(argv[2]);
+    auto& manager = RefManager::instance();
+
+    std::vector<int> objects(fields);
+    for (int count : {@TYPE_COUNTS@}) {
+        manager.flush();
+        for (int t = 0; t < count; ++t) {
+            std::string type = "T" + std::to_string(t);
+            manager.register_type_custom(type, [](void*){});
+            manager.store(type, new int(t));
+        }
+        std::vector<void*> members;
+        for (int k = 0; k < fields; ++k) {
+            members.push_back(&objects[k]);
+            manager.store("T" + std::to_string(k % count), &objects[k]);
+        }
+
+        std::size_t sink = 0;
+        auto start = std::chrono::steady_clock::now();
+        for (int i = 0; i < iterations; ++i) {
+            json jsonValue = json::object();
+            for (int k = 0; k < fields; ++k)
+                jsonValue[std::to_string(k)] = manager.get_ref_for_ptr(members[k]);
+            sink += jsonValue.size();
+        }
+        double ns = std::chrono::duration<double, std::nano>(
+            std::chrono::steady_clock::now() - start).count() / iterations;
+        std::printf("%6d types: %10.0f ns per export (%zu)\n", count, ns, sink % 7);
+    }
+    return 0;
+}
+'''
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--handles", choices=REF_HANDLE_MODES, default="string")
+    ap.add_argument("--fields", type=int, default=16, help="pointer fields per exported struct")
+    ap.add_argument("--iterations", type=int, default=20000)
+    ap.add_argument("--cxx", default=shutil.which("c++") or shutil.which("g++") or shutil.which("clang++"))
+    args = ap.parse_args()
+    if not args.cxx:
+        sys.exit("No C++ compiler found; pass --cxx")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        (tmp / "RefManager.h").write_text(ref_manager_header({"ref_handles": args.handles}) + "\n", encoding="utf-8")
+        (tmp / "BridgeStrings.h").write_text(BRIDGE_STRINGS_H, encoding="utf-8")
+        source = BENCH_CPP.replace("@TYPE_COUNTS@", ", ".join(map(str, TYPE_COUNTS)))
+        (tmp / "bench.cpp").write_text(source, encoding="utf-8")
+        exe = tmp / "bench"
+        subprocess.run(
+            [args.cxx, "-std=c++17", "-O2", f"-I{tmp}", f"-I{NLOHMANN_INCLUDE}",
+             str(tmp / "bench.cpp"), "-o", str(exe)],
+            check=True,
+        )
+        print(f"ref_handles={args.handles}, {args.fields} pointer fields per struct")
+        subprocess.run([str(exe), str(args.fields), str(args.iterations)], check=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+"""
+Hammer store/retrieve/get_ref_for_ptr/release on the emitted RefManager.h
+from many threads at once, built with ThreadSanitizer and ref_thread_safe
+on. Any data race TSan sees fails the run.
+
+    py benchmarks/ref_thread_stress.py [--handles string|int] [--threads N] [--cxx clang++]
+"""
+import os
+import sys
+import shutil
+import argparse
+import tempfile
+import subprocess
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from generator.cpp_bridge_gen import BRIDGE_STRINGS_H, ref_manager_header
+from generator.ref_handles import REF_HANDLE_MODES
+
+NLOHMANN_INCLUDE = ROOT / "generator" / "dependencies" / "include"
+
+# Every thread churns its own objects and keeps probing handles published by
+# the others. A probe may find the object gone, but whatever it gets back must
+# be exactly the object that handle was issued for.
+STRESS_CPP = r'''
+#include <atomic>
+#include <cstdio>
+#include <cstdlib>
+#include <mutex>
+#include <string>
+#include <thread>
+#include <utility>
+#include <vector>
+#include "RefManager.h"
+
+struct Item { int owner; int serial; };
+
+int main(int argc, char** argv) {
+    const int threads    = std::atoi(argv[1]);
+    const int iterations = std::atoi(argv[2]);
+    auto& manager = RefManager::instance();
+
+    const char* types[] = {"A", "B", "C", "D"};
+    for (const char* type : types)
+        manager.register_type_custom(type, [](void* p) { delete static_cast<Item*>(p); });
+
+    // Latest (handle, object) each thread published for the others to probe.
+    // Probes never dereference: the owner may delete the object at any time.
+    std::mutex published_mutex;
+    std::vector<std::pair<RefManager::Ref, void*>> published(threads);
+    std::atomic<int> failures{0};
+
+    auto worker = [&](int self) {
+        std::vector<RefManager::Ref> mine;
+        for (int i = 0; i < iterations; ++i) {
+            auto* item = new Item{self, i};
+            RefManager::Ref ref = manager.store(types[i % 4], item);
+            if (manager.retrieve(ref) != item) ++failures;
+            if (manager.get_ref_for_ptr(item) != ref) ++failures;
+            mine.push_back(ref);
+            {
+                std::lock_guard<std::mutex> lock(published_mutex);
+                published[self] = {ref, item};
+            }
+
+            // A neighbour's handle may already be stale; it must never
+            // resolve to anything but the object it was issued for
+            std::pair<RefManager::Ref, void*> probe;
+            {
+                std::lock_guard<std::mutex> lock(published_mutex);
+                probe = published[(self + 1 + i) % threads];
+            }
+            if (void* found = manager.retrieve(probe.first))
+                if (found != probe.second) ++failures;
+
+            if (mine.size() > 8) {
+                manager.release(mine.front());
+                if (manager.retrieve(mine.front()) != nullptr) ++failures;
+                manager.release(mine.front());   // double release is a no-op
+                mine.erase(mine.begin());
+            }
+        }
+        for (RefManager::Ref ref : mine) manager.release(ref);
+    };
+
+    std::vector<std::thread> pool;
+    for (int t = 0; t < threads; ++t) pool.emplace_back(worker, t);
+    for (auto& thread : pool) thread.join();
+
+    std::printf("%d threads x %d iterations: %d failures\n", threads, iterations, failures.load());
+    return failures.load() ? 1 : 0;
+}
+'''
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--handles", choices=REF_HANDLE_MODES, default="int")
+    ap.add_argument("--threads", type=int, default=8)
+    ap.add_argument("--iterations", type=int, default=20000)
+    ap.add_argument("--cxx", default=shutil.which("clang++") or shutil.which("g++") or shutil.which("c++"))
+    ap.add_argument("--no-tsan", action="store_true", help="plain -O2 build (for compilers without TSan)")
+    args = ap.parse_args()
+    if not args.cxx:
+        sys.exit("No C++ compiler found; pass --cxx")
+
+    config = {"ref_handles": args.handles, "ref_thread_safe": True}
+    sanitize = [] if args.no_tsan else ["-fsanitize=thread", "-g"]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        (tmp / "RefManager.h").write_text(ref_manager_header(config) + "\n", encoding="utf-8")
+        (tmp / "BridgeStrings.h").write_text(BRIDGE_STRINGS_H, encoding="utf-8")
+        (tmp / "stress.cpp").write_text(STRESS_CPP, encoding="utf-8")
+        exe = tmp / "stress"
+        subprocess.run(
+            [args.cxx, "-std=c++17", "-O1", "-pthread", *sanitize, f"-I{tmp}", f"-I{NLOHMANN_INCLUDE}",
+             str(tmp / "stress.cpp"), "-o", str(exe)],
+            check=True,
+        )
+        env = dict(os.environ, TSAN_OPTIONS="halt_on_error=1 exitcode=66")
+        print(f"ref_handles={args.handles}, ref_thread_safe=true{'' if args.no_tsan else ', ThreadSanitizer'}")
+        result = subprocess.run([str(exe), str(args.threads), str(args.iterations)], env=env)
+        sys.exit(result.returncode)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""
+Compare the single-pass declaration scanner against the original regex
+pipeline (a dozen full-text passes) on the checked-in OpenXR expansion.
+
+    py benchmarks/scanner_bench.py [header] [--repeat N]
+"""
+import re
+import sys
+import time
+import argparse
+import statistics
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from decl_scanner import (
+    scan_declarations, LINE_CONTINUATION_RE, FUNC_PTR_RE, ENUM_RE, CONST_RE,
+    TYPEDEF_RE, USING_RE, HANDLE_RE, STRUCT_RE, FUNC_RE
+)
+
+
+def regex_pipeline(content: str) -> dict:
+    """The scanning work parse_header used to do before the single-pass scanner."""
+    content = LINE_CONTINUATION_RE.sub(' ', content)
+    found = {
+        "function_ptr": list(FUNC_PTR_RE.finditer(content)),
+        "enum":         list(ENUM_RE.finditer(content)),
+        "constant":     CONST_RE.findall(content),
+        "typedef":      TYPEDEF_RE.findall(content),
+        "using":        USING_RE.findall(content),
+        "handle":       HANDLE_RE.findall(content),
+        "struct":       list(STRUCT_RE.finditer(content)),
+    }
+
+    def _collapse_proto(match):
+        inner = match.group(1).replace('\n', ' ').strip()
+        return "(" + inner + ")"
+
+    content = re.sub(r'\b__stdcall\b', '', content)
+    content = re.sub(r'\b__cdecl\b',   '', content)
+    content = re.sub(r'\b__fastcall\b','', content)
+    content = re.sub(r'\(\s*(.*?)\s*\)', _collapse_proto, content, flags=re.DOTALL)
+    content = re.sub(r'\)\s*;\s*', ');' + '\n', content)
+    found["function"] = list(FUNC_RE.finditer(content))
+    return found
+
+
+def time_it(fn, content: str, repeat: int) -> list[float]:
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn(content)
+        samples.append(time.perf_counter() - started)
+    return samples
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("header", nargs="?", default=str(ROOT / "openxr_expanded.h"))
+    ap.add_argument("--repeat", type=int, default=20)
+    args = ap.parse_args()
+
+    content = Path(args.header).read_text(encoding="utf-8", errors="replace")
+    print(f"[GMBridge] Benchmarking {args.header} ({len(content)} bytes, {args.repeat} runs)")
+
+    legacy  = regex_pipeline(content)
+    scanned = scan_declarations(content)
+    for kind, matches in scanned.items():
+        print(f"    {kind:<13} regex={len(legacy[kind]):<5} scanner={len(matches)}")
+
+    regex_times   = time_it(regex_pipeline, content, args.repeat)
+    scanner_times = time_it(scan_declarations, content, args.repeat)
+    regex_ms   = statistics.median(regex_times) * 1000
+    scanner_ms = statistics.median(scanner_times) * 1000
+    print(f"[GMBridge] regex pipeline : {regex_ms:8.2f} ms (median)")
+    print(f"[GMBridge] single-pass    : {scanner_ms:8.2f} ms (median)")
+    print(f"[GMBridge] speedup        : {regex_ms / scanner_ms:8.2f}x")
+
+    # Non-zero exit if the scanner ever regresses past the old pipeline
+    return 0 if scanner_ms < regex_ms else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
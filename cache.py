@@ -0,0 +1,275 @@
+import os
+import re
+import json
+import time
+import pickle
+import hashlib
+from pathlib import Path
+
+from generator.output_writer import atomic_write_bytes
+
+# ——— Defaults ———
+DEFAULT_CACHE_DIR    = ".gmbridge_cache"
+DEFAULT_CACHE_MAX_MB = 256
+
+# Bump whenever the per-file parse_result shape changes; old entries are ignored.
+PARSE_CACHE_SCHEMA = 1
+# Source files whose edits must invalidate cached parse results.
+PARSER_SOURCES     = [
+    Path(__file__).parent / "parser.py",
+    Path(__file__).parent / "decl_scanner.py",
+    Path(__file__).parent / "const_eval.py",
+]
+
+# Splits a make-style dependency rule ("target: dep dep \") on the first ":"
+# that is followed by whitespace, so Windows drive letters ("C:/…") survive.
+DEP_TARGET_RE = re.compile(r'^.*?:(?=\s)', re.DOTALL)
+DEP_TOKEN_RE  = re.compile(r'(?:\\ |\\#|\$\$|[^\s])+')
+SHOW_INCLUDES_RE = re.compile(r'^Note: including file:\s*(.+?)\s*$', re.MULTILINE)
+
+
+def cache_enabled(config) -> bool:
+    return bool(config.get("cache", True))
+
+
+def cache_root(config) -> Path:
+    return Path(config.get("cache_dir", DEFAULT_CACHE_DIR))
+
+
+def hash_text(*parts) -> str:
+    """Stable sha256 over a sequence of strings (or JSON-serializable values)."""
+    h = hashlib.sha256()
+    for part in parts:
+        if not isinstance(part, str):
+            part = json.dumps(part, sort_keys=True)
+        h.update(part.encode("utf-8"))
+        h.update(b"\0")
+    return h.hexdigest()
+
+
+def file_digest(path) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def touch(path: Path):
+    """Bump a cache entry's mtime so LRU eviction sees it as recently used."""
+    try:
+        now = time.time()
+        os.utime(path, (now, now))
+    except OSError:
+        pass
+
+
+def evict_lru(folder: Path, max_bytes: int):
+    """
+    Treat every "<key>.*" group of files in `folder` as one cache entry and
+    delete the least-recently-used entries until the folder fits in max_bytes.
+    """
+    if not folder.is_dir():
+        return
+    entries = {}
+    for item in folder.iterdir():
+        if not item.is_file() or item.name.startswith("."):
+            continue
+        key = item.name.split(".", 1)[0]
+        st  = item.stat()
+        size, last_used, files = entries.get(key, (0, 0.0, []))
+        entries[key] = (size + st.st_size, max(last_used, st.st_mtime), files + [item])
+
+    total = sum(size for size, _, _ in entries.values())
+    if total <= max_bytes:
+        return
+    for key, (size, _, files) in sorted(entries.items(), key=lambda kv: kv[1][1]):
+        for item in files:
+            try:
+                item.unlink()
+            except OSError:
+                pass
+        total -= size
+        print(f"[GMBridge] Cache evicted {key[:12]} ({size} bytes)")
+        if total <= max_bytes:
+            break
+
+
+# ——— Preprocessor output cache ———
+
+def parse_make_deps(text: str) -> list[str]:
+    """Extract the prerequisite list from `-MD`/`-MF` make-style dependency output."""
+    text = text.replace("\\\r\n", " ").replace("\\\n", " ")
+    deps = []
+    for rule in text.splitlines():
+        m = DEP_TARGET_RE.match(rule)
+        if not m:
+            continue
+        for tok in DEP_TOKEN_RE.findall(rule[m.end():]):
+            deps.append(tok.replace("\\ ", " ").replace("\\#", "#").replace("$$", "$"))
+    return deps
+
+
+def parse_show_includes(stderr: str) -> list[str]:
+    """Extract headers from MSVC `/showIncludes` notes."""
+    return SHOW_INCLUDES_RE.findall(stderr or "")
+
+
+def dependency_flags(cpp_cmd: list[str], dep_file: str) -> list[str]:
+    """Flags that make the preprocessor report every header it opened."""
+    if cpp_cmd[0].lower() == "cl":
+        return ["/showIncludes"]
+    return ["-MD", "-MF", dep_file]
+
+
+def _dep_record(path: str) -> dict:
+    st = os.stat(path)
+    return {
+        "path":     os.path.abspath(path),
+        "mtime_ns": st.st_mtime_ns,
+        "size":     st.st_size,
+        "sha256":   file_digest(path),
+    }
+
+
+def _dep_unchanged(dep: dict) -> bool:
+    try:
+        st = os.stat(dep["path"])
+    except OSError:
+        return False
+    if st.st_mtime_ns == dep["mtime_ns"] and st.st_size == dep["size"]:
+        return True
+    # mtime moved (checkout, touch) – fall back to content comparison
+    return st.st_size == dep["size"] and file_digest(dep["path"]) == dep["sha256"]
+
+
+def preprocess_key(full_cmd: list[str], tool_path: str | None) -> str:
+    tool_stamp = ""
+    if tool_path and os.path.exists(tool_path):
+        tool_stamp = str(os.stat(tool_path).st_mtime_ns)
+    return hash_text("preprocess", full_cmd, tool_path or "", tool_stamp)
+
+
+def load_preprocessed(config, key: str) -> str | None:
+    """Return cached preprocessor output for `key` if every recorded dependency is unchanged."""
+    if not cache_enabled(config):
+        return None
+    folder   = cache_root(config) / "preprocess"
+    manifest = folder / f"{key}.json"
+    output   = folder / f"{key}.i"
+    try:
+        meta = json.loads(manifest.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+    if not meta.get("deps") or not all(_dep_unchanged(d) for d in meta["deps"]):
+        return None
+    try:
+        content = output.read_text(encoding="utf-8")
+    except OSError:
+        return None
+    if hash_text(content) != meta.get("output_sha256"):
+        return None
+    touch(manifest)
+    touch(output)
+    return content
+
+
+def store_preprocessed(config, key: str, content: str, deps: list[str]):
+    """Persist preprocessor output plus a manifest of the headers it was built from."""
+    if not cache_enabled(config):
+        return
+    records = []
+    for dep in dict.fromkeys(deps):
+        if os.path.isfile(dep):
+            records.append(_dep_record(dep))
+    if not records:
+        return
+    folder = cache_root(config) / "preprocess"
+    meta = {
+        "deps":          records,
+        "output_sha256": hash_text(content),
+    }
+    atomic_write_bytes(folder / f"{key}.i", content.encode("utf-8"))
+    atomic_write_bytes(folder / f"{key}.json", json.dumps(meta, indent=1).encode("utf-8"))
+    max_bytes = int(config.get("cache_max_mb", DEFAULT_CACHE_MAX_MB) * 1024 * 1024)
+    evict_lru(folder, max_bytes)
+
+
+# ——— Per-file parse_result cache ———
+
+def parse_cache_key(content: str, config) -> str:
+    """
+    Key a per-file parse on the preprocessed text, the config values that shape
+    the result, the schema version and the parser source itself.
+    """
+    parser_stamp = []
+    for source in PARSER_SOURCES:
+        try:
+            parser_stamp.append(file_digest(source))
+        except OSError:
+            parser_stamp.append("")
+    return hash_text(
+        "parse",
+        PARSE_CACHE_SCHEMA,
+        parser_stamp,
+        config.get("namespace", ""),
+        config.get("skip_function_prefixes", []),
+        content,
+    )
+
+
+def load_parse_result(config, key: str):
+    """Return (parse_result, original_parse_seconds) or None on a miss/stale schema."""
+    if not cache_enabled(config):
+        return None
+    path = cache_root(config) / "parse" / f"{key}.pickle"
+    try:
+        with open(path, "rb") as f:
+            entry = pickle.load(f)
+    except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ValueError):
+        return None
+    if not isinstance(entry, dict) or entry.get("schema") != PARSE_CACHE_SCHEMA:
+        return None
+    touch(path)
+    return entry["result"], entry.get("parse_seconds", 0.0)
+
+
+def store_parse_result(config, key: str, parse_result: dict, parse_seconds: float):
+    if not cache_enabled(config):
+        return
+    folder = cache_root(config) / "parse"
+    entry = {
+        "schema":        PARSE_CACHE_SCHEMA,
+        "parse_seconds": parse_seconds,
+        "result":        parse_result,
+    }
+    atomic_write_bytes(folder / f"{key}.pickle", pickle.dumps(entry, protocol=pickle.HIGHEST_PROTOCOL))
+    max_bytes = int(config.get("cache_max_mb", DEFAULT_CACHE_MAX_MB) * 1024 * 1024)
+    evict_lru(folder, max_bytes)
+
+
+# ——— Library export symbol cache ———
+
+def symbols_key(lib_path, reader_version: int) -> str:
+    return hash_text("symbols", reader_version, file_digest(lib_path))
+
+
+def load_symbols(config, key: str) -> list[str] | None:
+    if not cache_enabled(config):
+        return None
+    path = cache_root(config) / "symbols" / f"{key}.json"
+    try:
+        names = json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+    touch(path)
+    return names
+
+
+def store_symbols(config, key: str, names: list[str]):
+    if not cache_enabled(config):
+        return
+    folder = cache_root(config) / "symbols"
+    atomic_write_bytes(folder / f"{key}.json", json.dumps(names).encode("utf-8"))
+    max_bytes = int(config.get("cache_max_mb", DEFAULT_CACHE_MAX_MB) * 1024 * 1024)
+    evict_lru(folder, max_bytes)
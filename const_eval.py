@@ -0,0 +1,275 @@
+import re
+from functools import lru_cache
+
+# ——— Integer constant expressions ———
+# Enough of C's constant-expression grammar for enumerator initializers:
+# integer/char literals with suffixes, references to earlier enumerators and
+# #define constants, casts to integer types and every unary/binary/ternary
+# integer operator. Values follow C's usual arithmetic conversions between
+# signed and unsigned operands (MSVC widths: long is 32 bits); signed
+# arithmetic is not wrapped, so 1 << 31 stays 2147483648.
+
+TOKEN_RE = re.compile(r'''
+    \s*(?:
+        (?P<number> (?:0[xX][0-9A-Fa-f]+ | 0[bB][01]+ | \d+) (?:[uU]?(?:ll|LL|[lL]|i64)?[uU]?) )
+      | (?P<char>   '(?:[^'\\]|\\.)+' )
+      | (?P<name>   [A-Za-z_]\w* )
+      | (?P<op>     <<|>>|<=|>=|==|!=|&&|\|\||[-+*/%&|^~!()?:<>] )
+    )''', re.VERBOSE)
+
+# Integer type names a cast can name → (bits, unsigned)
+CAST_TYPES = {
+    "char": (8, False), "signed char": (8, False), "unsigned char": (8, True),
+    "short": (16, False), "unsigned short": (16, True),
+    "int": (32, False), "signed": (32, False), "unsigned": (32, True), "unsigned int": (32, True),
+    "long": (32, False), "unsigned long": (32, True),
+    "long long": (64, False), "unsigned long long": (64, True),
+    "int8_t": (8, False), "uint8_t": (8, True), "int16_t": (16, False), "uint16_t": (16, True),
+    "int32_t": (32, False), "uint32_t": (32, True), "int64_t": (64, False), "uint64_t": (64, True),
+    "size_t": (64, True), "uintptr_t": (64, True), "intptr_t": (64, False),
+}
+CHAR_ESCAPES = {"n": 10, "t": 9, "r": 13, "0": 0, "\\": 92, "'": 39, '"': 34, "a": 7, "b": 8, "f": 12, "v": 11}
+
+BINARY_PRECEDENCE = {
+    "||": 1, "&&": 2, "|": 3, "^": 4, "&": 5,
+    "==": 6, "!=": 6, "<": 7, ">": 7, "<=": 7, ">=": 7,
+    "<<": 8, ">>": 8, "+": 9, "-": 9, "*": 10, "/": 10, "%": 10,
+}
+
+
+class ConstantError(ValueError):
+    pass
+
+
+def wrap(value, bits, unsigned):
+    """Reduce `value` to a C integer of the given width and signedness."""
+    value &= (1 << bits) - 1
+    if not unsigned and value >> (bits - 1):
+        value -= 1 << bits
+    return value
+
+
+INT_LITERAL_RE = re.compile(r'(0[xX][0-9A-Fa-f]+|0[bB][01]+|\d+)(\w*)')
+
+
+def parse_int_literal(text):
+    """(value, bits, unsigned) of a C integer literal such as 0x7FFFFFFFu or 10ULL."""
+    digits, suffix = INT_LITERAL_RE.fullmatch(text).groups()
+    suffix   = suffix.lower()
+    unsigned = "u" in suffix
+    if digits[:2] in ("0x", "0X"):
+        value, decimal = int(digits, 16), False
+    elif digits[:2] in ("0b", "0B"):
+        value, decimal = int(digits, 2), False
+    elif len(digits) > 1 and digits[0] == "0":
+        value, decimal = int(digits, 8), False
+    else:
+        value, decimal = int(digits), True
+
+    bits = 64 if ("ll" in suffix or "i64" in suffix) else 32
+    if bits == 32 and not unsigned and value > 0x7FFFFFFF:
+        # C picks the first type that fits: hex/octal may go unsigned first
+        if not decimal and value <= 0xFFFFFFFF:
+            unsigned = True
+        else:
+            bits = 64
+    if bits == 32 and unsigned and value > 0xFFFFFFFF:
+        bits = 64
+    if bits == 64 and not unsigned and value > 0x7FFFFFFFFFFFFFFF:
+        unsigned = True
+    return value, bits, unsigned
+
+
+def parse_char_literal(text):
+    body = text[1:-1]
+    if body.startswith("\\"):
+        esc = body[1:]
+        if esc[0] in "xX":
+            return int(esc[1:], 16)
+        if esc[0].isdigit():
+            return int(esc, 8)
+        return CHAR_ESCAPES.get(esc[0], ord(esc[0]))
+    return ord(body[0])
+
+
+@lru_cache(maxsize=8192)
+def tokenize(expr: str) -> tuple:
+    """(kind, text) tokens of `expr`; memoized, since enum bodies repeat the same initializers."""
+    tokens, pos, expr = [], 0, expr.strip()
+    while pos < len(expr):
+        m = TOKEN_RE.match(expr, pos)
+        if not m or m.end() == pos:
+            raise ConstantError(f"unexpected {expr[pos:]!r}")
+        tokens.append((m.lastgroup, m.group(m.lastgroup)))
+        pos = m.end()
+        while pos < len(expr) and expr[pos].isspace():
+            pos += 1
+    return tuple(tokens)
+
+
+class ConstantEvaluator:
+    """
+    Evaluates integer constant expressions against a growing symbol table:
+    define() each enumerator as it is assigned, so later initializers can
+    refer to it. Lookups are single dict hits and tokenization is memoized
+    across the whole parse. `typedefs` ({alias: type}) lets casts name
+    typedefs as well as the built-in integer types.
+    """
+
+    def __init__(self, symbols=None, typedefs=None):
+        self.typedefs = dict(typedefs or {})
+        self.symbols  = {}
+        for name, value in (symbols or {}).items():
+            if isinstance(value, int):
+                self.define(name, value)
+
+    def define(self, name, value):
+        self.symbols[name] = value
+
+    def evaluate(self, expr: str):
+        """The value of `expr`, or None if it is not a constant we can fold."""
+        try:
+            parser = _Parser(tokenize(expr), self.symbols, self.typedefs)
+            value, _, _ = parser.expression()
+            if parser.pos != len(parser.tokens):
+                raise ConstantError(f"trailing {parser.tokens[parser.pos][1]!r}")
+            return value
+        except (ValueError, ZeroDivisionError, RecursionError):
+            return None
+
+
+class _Parser:
+    """Precedence-climbing parser yielding (value, bits, unsigned) triples."""
+
+    def __init__(self, tokens, symbols, typedefs=None):
+        self.tokens   = tokens
+        self.symbols  = symbols
+        self.typedefs = typedefs or {}
+        self.pos      = 0
+
+    def peek(self, offset=0):
+        i = self.pos + offset
+        return self.tokens[i] if i < len(self.tokens) else (None, None)
+
+    def take(self, text=None):
+        kind, tok = self.peek()
+        if kind is None or (text is not None and tok != text):
+            raise ConstantError(f"expected {text or 'operand'}")
+        self.pos += 1
+        return kind, tok
+
+    def expression(self):
+        cond = self.binary(1)
+        if self.peek()[1] == "?":
+            self.take("?")
+            yes = self.expression()
+            self.take(":")
+            no = self.expression()
+            return yes if cond[0] else no
+        return cond
+
+    def binary(self, min_precedence):
+        left = self.unary()
+        while True:
+            kind, op = self.peek()
+            precedence = BINARY_PRECEDENCE.get(op) if kind == "op" else None
+            if precedence is None or precedence < min_precedence:
+                return left
+            self.take()
+            right = self.binary(precedence + 1)
+            left  = self.apply(op, left, right)
+
+    def apply(self, op, left, right):
+        (a, abits, aun), (b, bbits, bun) = left, right
+        if op in ("&&", "||", "==", "!=", "<", ">", "<=", ">="):
+            result = {
+                "&&": bool(a) and bool(b), "||": bool(a) or bool(b),
+                "==": a == b, "!=": a != b, "<": a < b, ">": a > b, "<=": a <= b, ">=": a >= b,
+            }[op]
+            return int(result), 32, False
+        if op in ("<<", ">>"):
+            # shifts take the left operand's type
+            bits, unsigned = abits, aun
+            value = a << b if op == "<<" else a >> b
+        else:
+            bits     = max(abits, bbits)
+            unsigned = (aun and abits >= bbits) or (bun and bbits >= abits)
+            if unsigned:
+                a, b = wrap(a, bits, True), wrap(b, bits, True)
+            if op in ("/", "%"):
+                if b == 0:
+                    raise ZeroDivisionError
+                quotient = abs(a) // abs(b) * (1 if (a < 0) == (b < 0) else -1)   # truncates toward zero
+                value = quotient if op == "/" else a - b * quotient
+            else:
+                value = {"+": a + b, "-": a - b, "*": a * b, "&": a & b, "|": a | b, "^": a ^ b}[op]
+        if unsigned:
+            value = wrap(value, bits, True)
+        return value, bits, unsigned
+
+    def unary(self):
+        kind, tok = self.peek()
+        if kind == "op" and tok in ("-", "+", "~", "!"):
+            self.take()
+            value, bits, unsigned = self.unary()
+            if tok == "!":
+                return int(not value), 32, False
+            value = {"-": -value, "+": value, "~": ~value}[tok]
+            return (wrap(value, bits, True) if unsigned else value), bits, unsigned
+        if tok == "(":
+            cast = self.cast_type()
+            if cast:
+                value, _, _ = self.unary()
+                bits, unsigned = cast
+                return wrap(value, bits, unsigned), bits, unsigned
+        return self.primary()
+
+    def cast_type(self):
+        """If a cast such as (uint32_t) or (unsigned long) starts here, consume it."""
+        words, offset = [], 1
+        while self.peek(offset)[0] == "name" and self.peek(offset)[1] not in self.symbols:
+            words.append(self.peek(offset)[1])
+            offset += 1
+        if not words or self.peek(offset)[1] != ")":
+            return None
+        # Only a cast if an operand follows; "(UNKNOWN)" alone is a missing symbol
+        kind, tok = self.peek(offset + 1)
+        if kind not in ("number", "char", "name") and tok not in ("(", "~", "!", "-", "+"):
+            return None
+        # Only known type names make a cast: "(UNKNOWN)-1" is a missing
+        # symbol minus one, not a cast to some type we cannot see
+        cast = self.known_type(" ".join(w for w in words if w not in ("const", "volatile")))
+        if cast is None:
+            return None
+        self.pos += offset + 1
+        return cast
+
+    def known_type(self, name):
+        """(bits, unsigned) of a built-in integer type or typedef name, else None."""
+        seen = set()
+        while name in self.typedefs and name not in seen:
+            seen.add(name)
+            name = " ".join(w for w in self.typedefs[name].split() if w not in ("const", "volatile"))
+        if name not in ("int", "unsigned int"):
+            name = name.replace(" int", "")
+        if name in CAST_TYPES:
+            return CAST_TYPES[name]
+        # typedefs we cannot see through keep the operand's value
+        return (64, False) if seen else None
+
+    def primary(self):
+        kind, tok = self.take()
+        if kind == "number":
+            return parse_int_literal(tok)
+        if kind == "char":
+            return parse_char_literal(tok), 32, False
+        if kind == "name":
+            if tok not in self.symbols:
+                raise ConstantError(f"unknown symbol {tok}")
+            value = self.symbols[tok]
+            return value, 32 if -2**31 <= value < 2**31 else 64, False
+        if tok == "(":
+            value = self.expression()
+            self.take(")")
+            return value
+        raise ConstantError(f"unexpected {tok!r}")
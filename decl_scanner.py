@@ -0,0 +1,209 @@
+import re
+
+# ——— Declaration regexes ———
+# These are only ever applied to a single statement handed out by
+# scan_declarations(), never to the whole preprocessed text.
+LINE_CONTINUATION_RE = re.compile(r'\\\r?\n\s*')
+FUNC_PTR_RE = re.compile(r'''
+    typedef
+    \s+ (?P<ret>.*?)           # return type
+    \(\s* (?:[^(]*?) \* \s*     # skip qualifiers then "*"
+    (?P<alias>\w+)\)\s*        # alias name
+    \((?P<args>[^)]*)\)\s*;     # parameter list
+''', re.VERBOSE | re.DOTALL)
+ENUM_RE = re.compile(r'typedef\s+enum\s+(\w+)?\s*{([^}]+)}\s*(\w+)?\s*;', re.DOTALL)
+CONST_RE = re.compile(
+    r'^#define\s+([A-Za-z_]\w*)\s+("(?:[^"\\]|\\.)*"|-?\d+|0x[0-9A-Fa-f]+)\s*$',
+    re.MULTILINE
+)
+TYPEDEF_RE = re.compile(r'typedef\s+([^\s]+(?:\s+\w+)*)\s+(\w+)\s*;')
+USING_RE   = re.compile(r'using\s+(\w+)\s*=\s*([^;]+);')
+HANDLE_RE = re.compile(r'typedef\s+struct\s+(\w+)_T\s*\*\s*(\w+);')
+# The original struct regex: only one level of nested braces. Kept for the
+# scanner benchmark's whole-text pipeline; statements use AGGREGATE_RE.
+STRUCT_RE  = re.compile(
+    r'\btypedef\s+struct\b'
+    r'(?:\s+[A-Za-z_]\w*)*'
+    r'\s*\{(?P<body>(?:[^{}]|\{[^{}]*\})*)\}'
+    r'\s*(?P<name>[A-Za-z_]\w*)\s*;',
+    re.DOTALL
+)
+# A typedef'd struct or union. The scanner hands over exactly one balanced
+# top-level statement, so the greedy body runs to its final "}" and nested
+# structs/unions at any depth stay inside it.
+AGGREGATE_RE = re.compile(
+    r'\btypedef\s+(?P<kind>struct|union)\b'
+    r'(?:\s+[A-Za-z_]\w*)*'
+    r'\s*\{(?P<body>.*)\}'
+    r'\s*(?P<name>[A-Za-z_]\w*)\s*;',
+    re.DOTALL
+)
+
+# Generic function-declaration regex (drops XRAPI specifics)
+FUNC_RE = re.compile(
+    r'^\s*'                            # start of line, maybe whitespace
+    r'(?P<ret>[A-Za-z_]\w*(?:\s+[\w\*\:<>]+)*)'  # return type (no newlines!)
+    r'\s+'                             # at least one space
+    r'(?P<name>[A-Za-z_]\w*)'          # function name
+    r'\s*\('                           # opening paren
+    r'(?P<args>[^)]*)'                 # argument list (no parentheses inside)
+    r'\)\s*;'                          # closing paren + semicolon
+    , re.MULTILINE
+)
+
+CALLING_CONVENTION_RE = re.compile(r'\b(?:__stdcall|__cdecl|__fastcall)\b')
+# MSVC `__pragma(...)` / C99 `_Pragma(...)` operators carry no ";" of their own
+PRAGMA_OP_RE          = re.compile(r'\b(?:__pragma|_Pragma)\s*\((?:[^()]|\([^()]*\))*\)')
+PAREN_GROUP_RE        = re.compile(r'\(\s*(.*?)\s*\)', re.DOTALL)
+
+# The only characters the scanner has to look at: directives, literals (so a
+# ";" or "{" inside quotes is ignored), braces and statement terminators.
+SCAN_TOKEN_RE = re.compile(r'''
+      ^[ \t]*\#(?:\\[\s\S]|[^\n\\])*    # preprocessor directive (with continuations)
+    | "(?:\\.|[^"\\\n])*"               # string literal
+    | '(?:\\.|[^'\\\n])*'               # char literal
+    | [{};]
+''', re.VERBOSE | re.MULTILINE)
+
+# `extern "C" {` / `namespace x {` only wrap declarations – their braces do
+# not start a nested scope as far as the scanner is concerned.
+LINKAGE_BLOCK_RE = re.compile(r'^\s*(?:extern\s+"C(?:\+\+)?"|(?:inline\s+)?namespace(?:\s+[\w:]+)?)\s*$')
+FUNCTION_BODY_RE = re.compile(r'\)\s*(?:const\s*)?(?:noexcept\s*)?$')
+# Compiler decl-specifiers that can precede "typedef" (glibc writes
+# `__extension__ typedef struct { … } lldiv_t;`); dropped before routing
+DECL_NOISE_RE    = re.compile(r'''
+    ^\s*(?:
+        (?:__extension__|__inline__|__inline)\b
+      | (?:__attribute__|__declspec)\s*\((?:[^()]|\((?:[^()]|\([^()]*\))*\))*\)
+    \s*)+
+''', re.VERBOSE)
+
+DECL_KINDS = ("function_ptr", "enum", "constant", "typedef", "using", "handle", "struct", "function")
+
+
+def _collapse_proto(match):
+    inner = match.group(1).replace('\n', ' ').strip()
+    return "(" + inner + ")"
+
+
+def _classify_statement(stmt: str, decls: dict):
+    """Route one top-level statement (ending in ";") to the matching record list."""
+    if "ragma" in stmt:
+        stmt = PRAGMA_OP_RE.sub('', stmt)
+    if "__" in stmt:
+        stmt = DECL_NOISE_RE.sub('', stmt, count=1)
+    head = stmt.lstrip()
+    if head.startswith("typedef"):
+        if "{" in head:
+            after = head[7:].lstrip()
+            if after.startswith("enum"):
+                m = ENUM_RE.match(head)
+                if m:
+                    decls["enum"].append(m)
+            elif after.startswith(("struct", "union")):
+                m = AGGREGATE_RE.match(head)
+                if m:
+                    decls["struct"].append(m)
+            return
+        if "(" in head:
+            m = FUNC_PTR_RE.match(head)
+            if m:
+                decls["function_ptr"].append(m)
+            return
+        m = HANDLE_RE.match(head)
+        if m:
+            decls["handle"].append(m)
+            return
+        m = TYPEDEF_RE.match(head)
+        if m:
+            decls["typedef"].append(m)
+        return
+
+    if head.startswith("using"):
+        m = USING_RE.match(head)
+        if m:
+            decls["using"].append(m)
+        return
+
+    # Anything else with a parameter list and no body is a prototype candidate
+    if "(" not in head or "{" in head:
+        return
+    if "__" in head:
+        head = CALLING_CONVENTION_RE.sub('', head)
+    if "\n" in head:
+        # Collapse multi-line prototypes into single lines
+        head = PAREN_GROUP_RE.sub(_collapse_proto, head)
+    m = FUNC_RE.search(head)
+    if m:
+        decls["function"].append(m)
+
+
+def scan_declarations(content: str) -> dict[str, list]:
+    """
+    Walk preprocessed text once, tracking brace depth, and hand every top-level
+    declaration to the record list for its kind.
+
+    Returns { kind: [match, …] } for each kind in DECL_KINDS, in source order.
+    Every record is the kind's regex matched against that single statement, so
+    consumers read it with the same group names they always have.
+    """
+    decls = {kind: [] for kind in DECL_KINDS}
+
+    depth         = 0
+    stmt_start    = 0
+    brace_stack   = []     # per open brace: "linkage", "body" (function) or "scope"
+    for m in SCAN_TOKEN_RE.finditer(content):
+        tok = m.group()
+        ch  = tok[0]
+
+        if ch == ";":
+            if depth == 0:
+                _classify_statement(content[stmt_start:m.end()], decls)
+                stmt_start = m.end()
+
+        elif ch == "{":
+            if depth == 0:
+                head = content[stmt_start:m.start()]
+                if LINKAGE_BLOCK_RE.match(head):
+                    brace_stack.append("linkage")
+                    stmt_start = m.end()
+                    continue
+                brace_stack.append("body" if FUNCTION_BODY_RE.search(head) else "scope")
+            else:
+                brace_stack.append("scope")
+            depth += 1
+
+        elif ch == "}":
+            if not brace_stack:
+                stmt_start = m.end()
+                continue
+            kind = brace_stack.pop()
+            if kind == "linkage":
+                stmt_start = m.end()
+                continue
+            depth -= 1
+            if depth == 0 and kind == "body":
+                # Inline function definition – nothing to declare
+                stmt_start = m.end()
+
+        elif ch in "\"'":
+            # Literal – only matched so its contents are skipped
+            continue
+
+        else:
+            # Preprocessor directive; only #define lines carry constants
+            line = tok.strip()
+            if line.startswith("#define"):
+                if "\\" in line:
+                    line = LINE_CONTINUATION_RE.sub(' ', line)
+                cm = CONST_RE.match(line)
+                if cm:
+                    decls["constant"].append(cm)
+            if depth == 0:
+                pending = content[stmt_start:m.start()]
+                if "ragma" in pending:
+                    pending = PRAGMA_OP_RE.sub('', pending)
+                if not pending.strip():
+                    stmt_start = m.end()
+
+    return decls
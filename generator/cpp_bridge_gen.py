@@ -1,13 +1,31 @@
 # generator/cpp_bridge_gen.py
 import os
 from pathlib import Path
+from math import ceil
 from string import Template
 
+from generator.marshaling import (
+    arg_passing, array_count, batch_signatures, buffer_layouts, capacity_arrays, classify_field,
+    function_arg_passing, resolve_type,
+)
+from generator.output_writer import joined, split_template
+from generator.profiles import profile_option
+from generator.ref_handles import REF_C_TYPE, REF_ERROR_RET, REF_MANAGER_TEMPLATE, ref_handle_mode
+
 # Load templates…
 TEMPLATES_DIR     = Path(__file__).parent / "templates"
 BRIDGE_HEADER_TPL = Template((TEMPLATES_DIR / "bridge_header.cpp.tpl").read_text(encoding="utf-8"))
-REF_MANAGER_H     = (TEMPLATES_DIR / "RefManager.h").read_text(encoding="utf-8")
+BRIDGE_SHARED_TPL = Template((TEMPLATES_DIR / "bridge_shared.h.tpl").read_text(encoding="utf-8"))
+BRIDGE_SHARD_TPL  = Template((TEMPLATES_DIR / "bridge_shard.cpp.tpl").read_text(encoding="utf-8"))
+BRIDGE_BATCH_TPL  = Template((TEMPLATES_DIR / "bridge_batch.cpp.tpl").read_text(encoding="utf-8"))
+REF_MANAGER_H     = {
+    mode: (TEMPLATES_DIR / tpl).read_text(encoding="utf-8")
+    for mode, tpl in REF_MANAGER_TEMPLATE.items()
+}
 REF_MANAGER_CPP   = (TEMPLATES_DIR / "RefManager.cpp").read_text(encoding="utf-8")
+BRIDGE_LOG_H      = (TEMPLATES_DIR / "BridgeLog.h").read_text(encoding="utf-8")
+BRIDGE_STATS_H    = (TEMPLATES_DIR / "BridgeStats.h").read_text(encoding="utf-8")
+BRIDGE_STRINGS_H  = (TEMPLATES_DIR / "BridgeStrings.h").read_text(encoding="utf-8")
 
 # Constants for 64-bit limits
 INT64_MIN = "-9223372036854775808"
@@ -15,58 +33,11 @@ INT64_MAX = "9223372036854775807"
 
 import re
 
-def resolve_type(type_name: str, typedef_map: dict[str,str]) -> str:
-    """Chase typedefs until we find the underlying type."""
-    seen = set()
-    result = type_name.strip()
-    while result in typedef_map and result not in seen:
-        seen.add(result)
-        result = typedef_map[result].strip()
-    return result
-
-def classify_field(field: dict,
-                   typedef_map: dict[str,str],
-                   struct_set: set[str],
-                   enum_set: set[str]) -> str:
-    raw        = field["type"].strip()
-    canonical  = field["canonical_type"].lower()
-    array_size = field.get("array_size")
-
-    # 1) fixed-size char arrays
-    if array_size and raw.rstrip("*").endswith("char"):
-        return "char_array"
-    # 2) all other C-arrays
-    if array_size:
-        return "array"
-    # 3) any raw pointer (T*, const T*, T**…) → handle
-    if raw.endswith("*"):
-        return "ref_handle"
-    # 4) function-pointer typedefs → handle
-    if field.get("is_function_ptr", False):
-        return "ref_handle"
-    # 5) nested structs
-    if field["canonical_type"] in struct_set:
-        return "struct"
-    # 6) numeric & enums
-    integer_types = {
-        "bool","int","float","double",
-        "int8_t","uint8_t","int16_t","uint16_t",
-        "int32_t","uint32_t","int64_t","uint64_t"
-    }
-    if canonical in integer_types or field["is_enum"]:
-        return "numeric"
-    # 7) strings
-    if field["extension_type"] == "string" and not field["is_ref"]:
-        return "string"
-    # 8) refs caught here (in case classify_c_type set is_ref on some pointer-like)
-    if field.get("is_ref", False):
-        return "ref_handle"
-    # fallback
-    return "numeric"
-
 def generate_struct_json_overloads(struct_name: str,
                                    fields: list[dict],
-                                   parse_result: dict) -> str:
+                                   parse_result: dict,
+                                   inline: bool = True,
+                                   handles: str = "string") -> str:
     typedef_map = parse_result["typedef_map"]
     struct_set  = set(parse_result["struct_fields"])
     enum_set    = set(parse_result["enums"])
@@ -91,9 +62,10 @@ def generate_struct_json_overloads(struct_name: str,
         Retrieve a RefManager handle and cast it back to the exact declared type.
         """
         decl = field["declared_type"]
+        handle_type = "std::string" if handles == "string" else "RefManager::Ref"
         return "\n".join([
             f'    {{',
-            f'        auto handleString = jsonValue.at("{name}").get<std::string>();',
+            f'        auto handleString = jsonValue.at("{name}").get<{handle_type}>();',
             f'        void* ptr = RefManager::instance().retrieve(handleString);',
             f'        o.{name} = reinterpret_cast<{decl}>(ptr);',
             f'    }}'
@@ -111,20 +83,15 @@ def generate_struct_json_overloads(struct_name: str,
                 f'    }}'
             ])
         ),
+        # C arrays convert element by element, without a std::vector in between
         "array": (
+            lambda name, sz, field=None:
+                f'    jsonValue["{name}"] = o.{name};',
             lambda name, sz, field=None: "\n".join([
                 f'    {{',
-                f'        std::vector<{field["canonical_type"]}> tmp;',
-                f'        tmp.reserve({sz});',
-                f'        for (size_t i = 0; i < {sz}; ++i) tmp.push_back(o.{name}[i]);',
-                f'        jsonValue["{name}"] = tmp;',
-                f'    }}'
-            ]),
-            lambda name, sz, field=None: "\n".join([
-                f'    {{',
-                f'        auto tmp = jsonValue.at("{name}").get<std::vector<{field["canonical_type"]}>>();',
+                f'        const json& tmp = jsonValue.at("{name}");',
                 f'        size_t n = std::min(tmp.size(), size_t({sz}));',
-                f'        for (size_t i = 0; i < n; ++i) o.{name}[i] = tmp[i];',
+                f'        for (size_t i = 0; i < n; ++i) o.{name}[i] = tmp[i].get<{field["canonical_type"]}>();',
                 f'        for (size_t i = n; i < {sz}; ++i) o.{name}[i] = {field["canonical_type"]}();',
                 f'    }}'
             ])
@@ -156,11 +123,21 @@ def generate_struct_json_overloads(struct_name: str,
             ref_to_json,
             ref_from_json
         ),
+        # nested structs/unions and the like: left at their zero value
+        "unmarshaled": (
+            lambda name, sz=None, field=None:
+                f'    // {name or "(anonymous " + field["type"] + ")"}: not converted',
+            lambda name, sz=None, field=None:
+                f'    // {name or "(anonymous " + field["type"] + ")"}: not converted',
+        ),
     }
     
+    # Sharded output defines each overload in exactly one translation unit
+    linkage = "inline " if inline else ""
+
     lines = []
     # to_json
-    lines.append(f'inline void to_json(json& jsonValue, const {struct_name}& o) {{')
+    lines.append(f'{linkage}void to_json(json& jsonValue, const {struct_name}& o) {{')
     lines.append('    jsonValue = json::object();')
     for field in fields:
         kind = classify_field(field, typedef_map, struct_set, enum_set)
@@ -173,7 +150,7 @@ def generate_struct_json_overloads(struct_name: str,
     lines.append('}')
 
     # from_json
-    lines.append(f'inline void from_json(const json& jsonValue, {struct_name}& o) {{')
+    lines.append(f'{linkage}void from_json(const json& jsonValue, {struct_name}& o) {{')
     for field in fields:
         kind = classify_field(field, typedef_map, struct_set, enum_set)
         handler = GEN_HANDLERS[kind]
@@ -194,6 +171,102 @@ def generate_struct_json_overloads(struct_name: str,
 
     return "\n".join(lines)
 
+def generate_struct_buffer_io(struct_name: str,
+                              fields: list[dict],
+                              layout: dict,
+                              inline: bool = True) -> str:
+    """
+    Emit __buffer_write_T / __buffer_read_T, which copy a struct to and from
+    its packed buffer layout (see marshaling.buffer_layouts) field by field.
+    """
+    def element(entry, index):
+        name = entry["name"]
+        if entry["count"] == 1:
+            return f"o.{name}", f"buf + {entry['offset']}"
+        return f"o.{name}[{index}]", f"buf + {entry['offset']} + {index} * {entry['size']}"
+
+    def each(entry, line):
+        # repeat a per-element line across an array field
+        if entry["count"] == 1:
+            return f"    {line}"
+        return f"    for (size_t i = 0; i < {entry['count']}; ++i) {line}"
+
+    asserts, writes, reads = [], [], []
+    for entry, field in zip(layout["fields"], fields):
+        name, kind = entry["name"], entry["kind"]
+        index      = "i" if entry["count"] > 1 else None
+        member, at = element(entry, index)
+
+        if kind == "char_array":
+            asserts.append(
+                f'static_assert(sizeof({struct_name}::{name}) == {entry["count"]}, '
+                f'"{struct_name}::{name} does not match its buffer layout");'
+            )
+            writes.append(f"    std::memcpy(buf + {entry['offset']}, o.{name}, {entry['count']});")
+            reads.append(f"    std::memcpy(o.{name}, buf + {entry['offset']}, {entry['count']});")
+            reads.append(f"    o.{name}[{entry['count']}-1] = '\\0';")
+        elif kind == "numeric":
+            asserts.append(
+                f'static_assert(sizeof({struct_name}::{name}) == {entry["size"] * entry["count"]}, '
+                f'"{struct_name}::{name} does not match its buffer layout");'
+            )
+            writes.append(each(entry, f"__buffer_put<{entry['c_type']}>({at}, {member});"))
+            reads.append(each(entry, f"{member} = ({field['type']})__buffer_get<{entry['c_type']}>({at});"))
+        elif kind == "ref_handle":
+            # pointers travel as RefManager handles, like the JSON overloads
+            inner = re.sub(r'\bconst\b\s*', '', field["declared_type"]).strip()
+            writes.append(
+                f"    __buffer_put<uint64_t>({at}, RefManager::instance().get_ref_for_ptr("
+                f"reinterpret_cast<void*>(const_cast<{inner}>({member}))));"
+            )
+            reads.append(
+                f"    {member} = reinterpret_cast<{field['declared_type']}>("
+                f"RefManager::instance().retrieve(__buffer_get<uint64_t>({at})));"
+            )
+        else:  # nested struct, laid out inline
+            writes.append(each(entry, f"__buffer_write_{entry['struct']}({at}, {member});"))
+            reads.append(each(entry, f"__buffer_read_{entry['struct']}({at}, {member});"))
+
+    # Sharded output defines each accessor in exactly one translation unit
+    linkage = "inline " if inline else ""
+
+    lines = [f"// {struct_name}: {layout['size']} packed bytes"]
+    lines += asserts
+    lines.append(f"{linkage}void __buffer_write_{struct_name}(char* buf, const {struct_name}& o) {{")
+    lines += writes
+    lines.append("}")
+    lines.append(f"{linkage}void __buffer_read_{struct_name}(const char* buf, {struct_name}& o) {{")
+    lines += reads
+    lines.append("}")
+    return "\n".join(lines)
+
+def layout_checks(parse_result, config) -> dict[str, dict]:
+    """Struct layouts to check with static_asserts: all of them with config "layout_asserts", else none."""
+    if not config.get("layout_asserts", False):
+        return {}
+    return parse_result.get("struct_layouts", {})
+
+
+def generate_layout_asserts(struct_name: str, layout: dict) -> str:
+    """
+    static_asserts pinning the compiler's sizeof/alignof/offsetof of a struct
+    to the layout the parser computed (struct_layout.compute_layouts), so a
+    header the model gets wrong (#pragma pack, an unknown ABI) fails the
+    build instead of corrupting buffers.
+    """
+    message = f'"{struct_name}: layout differs from the parsed header"'
+    lines = [
+        "#if GMBRIDGE_LAYOUT_CHECKS",
+        f"static_assert(sizeof({struct_name}) == {layout['size']}, {message});",
+        f"static_assert(alignof({struct_name}) == {layout['align']}, {message});",
+    ]
+    for entry in layout["fields"]:
+        # bitfields have no offset and anonymous members no name to take one of
+        if entry["name"] and "bit_width" not in entry:
+            lines.append(f"static_assert(offsetof({struct_name}, {entry['name']}) == {entry['offset']}, {message});")
+    lines.append("#endif")
+    return "\n".join(lines)
+
 def order_structs_by_dependency(dependency_map: dict[str, list[str]]) -> list[str]:
     """
     dependency_map: map from struct_name to list of structs it depends on
@@ -232,15 +305,7 @@ def order_structs_by_dependency(dependency_map: dict[str, list[str]]) -> list[st
     return sorted_list
 
 
-
-def generate_cpp_bridge(parse_result, config):
-    debug               = config.get("debug", True)
-    functions           = parse_result["functions"]
-    known_structs       = parse_result["struct_fields"].keys()
-    func_ptr_aliases    = parse_result["function_ptr_aliases"]
-    
-    namespace   = config.get("namespace", "XR")
-
+def struct_dependencies(parse_result) -> dict[str, list[str]]:
     # 0) Build dependency graph: structName -> [list of nested struct names]
     struct_fields = parse_result["struct_fields"]
     struct_set    = set(struct_fields.keys())
@@ -255,204 +320,286 @@ def generate_cpp_bridge(parse_result, config):
             if canon in struct_set:
                 needed.append(canon)
         deps[struct_name] = needed
+    return deps
 
+
+def order_bridge_structs(parse_result) -> list[str]:
+    """Structs to bridge, nested structs first and typedef aliases dropped."""
     # Topologically sort so that nested structs come first
-    ordered_structs = order_structs_by_dependency(deps)
+    ordered_structs = order_structs_by_dependency(struct_dependencies(parse_result))
 
     # Only keep structs whose name is their own canonical type
     filtered_structs = [
         name for name in ordered_structs
         if resolve_type(name, parse_result["typedef_map"]) == name
     ]
+    return filtered_structs
+
 
-    # 1) Struct constructors + JSON I/O (import then export)
-    struct_constructors = []
+def iter_struct_constructors(parse_result, filtered_structs, inline=True, handles="string", layouts=None,
+                             checks=None):
+    """Yield the create function, the JSON overloads, any buffer accessors and layout checks of each struct."""
+    layouts = layouts or {}
+    checks  = checks or {}
     for name in filtered_structs:
         fields = parse_result["struct_fields"][name]
         # 1) Create function
-        struct_constructors.append(f'''
+        yield f'''
 // === Auto-generated bridge for {name} ===
-extern "C" const char* __cpp_create_{name}() {{
+extern "C" {REF_C_TYPE[handles]} __cpp_create_{name}() {{
     auto* obj = new {name}{{}};
-    std::string _tmp_str = RefManager::instance().store("{name}", obj);
-    return _tmp_str.c_str();
+    return RefManager::to_gml(RefManager::instance().store("{name}", obj));
 }}
-'''.strip())
+'''.strip()
 
         # 2) JSON overloads
-        struct_constructors.append(generate_struct_json_overloads(name, fields, parse_result))
+        yield generate_struct_json_overloads(name, fields, parse_result, inline, handles)
 
-    
-    # 2) Function bridges
-    function_bridges = []
-    for fn in functions:
-        fn_name     = fn["name"]
-        ret_meta = fn["return_meta"]
-        ret_ext  = ret_meta["extension_type"]
-        canon_rt = ret_meta["canonical_type"]
-
-        # pick return signature and default error return
-        if ret_ext == "void":
-            # we return a dummy double (GML will ignore it)
-            ret_sig, err_return = "double", "0.0"
-        elif ret_ext == "double":
-            ret_sig, err_return = "double", "std::numeric_limits<double>::quiet_NaN()"
-        elif ret_ext in ("ref", "string"):
-            ret_sig, err_return = "const char*", "\"\""
-        else:
-            # fallback – should rarely happen
-            ret_sig, err_return = "const char*", "\"\""
-
-
-
-        # Build argument decls, conversions, and call_args:
-        decls, converts, call_args = [], [], []
-        for i, arg in enumerate(fn["args"]):
-            arg_name         = arg["name"]
-            base_type    = arg["base_type"]
-            canonical    = arg["canonical_type"].lower()
-            is_big       = arg["is_unsupported_numeric"]
-            is_ref       = arg["is_ref"]
-            ext          = arg["extension_type"]
-
-            # 1) Big integers → receive as string, parse back
-            if is_big:
-                decls.append(f"const char* {name}_str")
-                # Use the real declared_type (e.g. XrInstance) for the local variable
-                if canonical.startswith("u"):
-                    converts.append(f"// Parse big unsigned integer Argument{i} ({name})")
-                    converts.append(f"{arg['declared_type']} {name} = static_cast<{arg['declared_type']}>(std::stoull({name}_str));")
-                else:
-                    converts.append(f"// Parse big signed integer Argument{i} ({name})")
-                    converts.append(f"{arg['declared_type']} {name} = static_cast<{arg['declared_type']}>(std::stoll({name}_str));")
-                call_args.append(name)
-
-            # 2) Standard numerics (float, double, int32, bool, enum)
-            elif ext == "double":
-                # always accept as double in the bridge signature
-                decls.append(f"double {arg_name}")
-                # cast back to the real C type if needed
-                cdecl = arg["declared_type"]
-                if cdecl == "float":
-                    converts.append(
-                        f"float {arg_name}_val = static_cast<float>({arg_name});"
-                    )
-                    call_args.append(f"{arg_name}_val")
-                elif cdecl != "double":
-                    # e.g. uint32_t propertyCapacityInput = static_cast<uint32_t>(propertyCapacityInput);
-                    converts.append(
-                        f"{cdecl} {arg_name}_val = static_cast<{cdecl}>({arg_name});"
-                    )
-                    call_args.append(f"{arg_name}_val")
-                else:
-                    # it's already a true double
-                    call_args.append(arg_name)
-            
-            # 4) Structs passed by value → receive as JSON, deserialize
-            elif is_ref and not arg["has_pointer"] and base_type in known_structs:
-                decls.append(f"const char* {arg_name}_json")
-                converts.append(f"    // Deserialize JSON into {base_type}")
+        # 3) Packed buffer accessors (struct_marshaling "buffer")
+        if name in layouts:
+            yield generate_struct_buffer_io(name, fields, layouts[name], inline)
+
+        # 4) sizeof/offsetof checks against the parsed layout (layout_asserts)
+        if name in checks:
+            yield generate_layout_asserts(name, checks[name])
+
+
+def generate_function_bridge(fn, known_structs, handles="string", layouts=None, passing=None) -> str:
+    """
+    Emit the extern "C" bridge for a single parsed function. `passing` is
+    marshaling.function_arg_passing() for its args (JSON mode if omitted);
+    buffer-passed args arrive as a GameMaker buffer address.
+    """
+    fn_name     = fn["name"]
+    ret_meta = fn["return_meta"]
+    ret_ext  = ret_meta["extension_type"]
+    canon_rt = ret_meta["canonical_type"]
+
+    # pick return signature and default error return
+    if ret_ext == "void":
+        # we return a dummy double (GML will ignore it)
+        ret_sig, err_return = "double", "0.0"
+    elif ret_ext == "double":
+        ret_sig, err_return = "double", "std::numeric_limits<double>::quiet_NaN()"
+    elif ret_meta["is_ref"]:
+        ret_sig, err_return = REF_C_TYPE[handles], REF_ERROR_RET[handles]
+    elif ret_ext in ("ref", "string"):
+        ret_sig, err_return = "const char*", "\"\""
+    else:
+        # fallback – should rarely happen
+        ret_sig, err_return = "const char*", "\"\""
+
+
+
+    layouts = layouts or {}
+    arrays  = capacity_arrays(fn)
+    if passing is None:
+        passing = [arg_passing(arg, known_structs, layouts, arrays) for arg in fn["args"]]
+
+    # Build argument decls, conversions, and call_args (writebacks run after the call):
+    decls, converts, call_args, writebacks = [], [], [], []
+    for i, (arg, how) in enumerate(zip(fn["args"], passing)):
+        arg_name         = arg["name"]
+        base_type    = arg["base_type"]
+        canonical    = arg["canonical_type"].lower()
+
+        # 1) Big integers → receive as string, parse back
+        if how == "big":
+            decls.append(f"const char* {arg_name}_str")
+            # Use the real declared_type (e.g. XrInstance) for the local variable
+            if canonical.startswith("u"):
+                converts.append(f"// Parse big unsigned integer Argument{i} ({arg_name})")
+                converts.append(f"{arg['declared_type']} {arg_name} = static_cast<{arg['declared_type']}>(std::stoull({arg_name}_str));")
+            else:
+                converts.append(f"// Parse big signed integer Argument{i} ({arg_name})")
+                converts.append(f"{arg['declared_type']} {arg_name} = static_cast<{arg['declared_type']}>(std::stoll({arg_name}_str));")
+            call_args.append(arg_name)
+
+        # 2) Standard numerics (float, double, int32, bool, enum)
+        elif how == "double":
+            # always accept as double in the bridge signature
+            decls.append(f"double {arg_name}")
+            # cast back to the real C type if needed
+            cdecl = arg["declared_type"]
+            if cdecl == "float":
+                converts.append(
+                    f"float {arg_name}_val = static_cast<float>({arg_name});"
+                )
+                call_args.append(f"{arg_name}_val")
+            elif cdecl != "double":
+                # e.g. uint32_t propertyCapacityInput = static_cast<uint32_t>(propertyCapacityInput);
                 converts.append(
-                    f"    {base_type} {arg_name} = "
-                    f"nlohmann::json::parse({arg_name}_json).get<{base_type}>();"
+                    f"{cdecl} {arg_name}_val = static_cast<{cdecl}>({arg_name});"
                 )
+                call_args.append(f"{arg_name}_val")
+            else:
+                # it's already a true double
+                call_args.append(arg_name)
+        
+        # 4) Packed structs → receive the buffer address, unpack (and write back
+        #    through non-const pointers once the call returns)
+        elif how == "buffer":
+            if array_count(arg, arrays) not in (None, "1"):
+                raise ValueError(f"{fn_name}: {arg_name} holds several {base_type}, not a single struct")
+            decls.append(f"char* {arg_name}_buf")
+            converts.append(f"    // Unpack Argument{i} ({arg_name}) from its buffer")
+            if arg["has_pointer"]:
+                converts.append(f"    {base_type} {arg_name}_val{{}};")
+                converts.append(f"    __buffer_read_{base_type}({arg_name}_buf, {arg_name}_val);")
+                call_args.append(f"&{arg_name}_val")
+                if not arg["has_const"]:
+                    writebacks.append(f"    __buffer_write_{base_type}({arg_name}_buf, {arg_name}_val);")
+            else:
+                converts.append(f"    {base_type} {arg_name}{{}};")
+                converts.append(f"    __buffer_read_{base_type}({arg_name}_buf, {arg_name});")
                 call_args.append(arg_name)
 
-            # 5) Refs (opaque handles, function pointers, or buffers)
-            elif is_ref:
-                decls.append(f"const char* {arg_name}_ref")
-                converts.append(f"    // Convert Argument{i} ({arg_name}) to {arg['declared_type']}")
+        # 5) Capacity and fixed-size arrays → the caller's buffer holds `count`
+        #    elements. Numbers are used in place; packed structs go through a
+        #    per-thread scratch array (the packed layout has no padding) that
+        #    keeps its capacity between calls. A zero capacity passes nullptr.
+        elif how == "array":
+            count = array_count(arg, arrays)
+            fixed = arg_name not in arrays
+            decls.append(f"char* {arg_name}_buf")
+            if base_type in layouts:
+                size = layouts[base_type]["size"]
+                converts.append(f"    // Unpack Argument{i} ({arg_name}) from its buffer, {size} bytes per element")
+                converts.append(f"    static thread_local std::vector<{base_type}> {arg_name}_scratch;")
+                converts.append(f"    {arg_name}_scratch.assign({count}, {base_type}{{}});")
                 converts.append(
-                    f"    void* {arg_name}_ptr = RefManager::instance().retrieve({arg_name}_ref);"
+                    f"    for (uint32_t i = 0; i < {count}; ++i) "
+                    f"__buffer_read_{base_type}({arg_name}_buf + i * {size}, {arg_name}_scratch[i]);"
                 )
-                converts.append(f"    if (!{arg_name}_ptr) return {err_return};")
-
-                # detect how many levels of pointer were declared (e.g. "T**" → depth=2)
-                depth = arg["declared_type"].count("*")
-                if depth >= 2:
-                    # cast to the element type pointer, then take its address
-                    elem_type = base_type  # e.g. "XrVector3f"
-                    converts.append(
-                        f"    {elem_type}* {arg_name}_buf = "
-                        f"static_cast<{elem_type}*>({arg_name}_ptr);"
+                data = f"{arg_name}_scratch.data()"
+                call_args.append(data if fixed else f"({count} ? {data} : nullptr)")
+                if not arg["has_const"]:
+                    writebacks.append(
+                        f"    for (uint32_t i = 0; i < {count}; ++i) "
+                        f"__buffer_write_{base_type}({arg_name}_buf + i * {size}, {arg_name}_scratch[i]);"
                     )
-                    # use the original declared_type (e.g. "XrVector3f**") here
-                    converts.append(
-                        f"    {arg['declared_type']} {arg_name} = &{arg_name}_buf;"
-                    )
-                    call_args.append(arg_name)
-                else:
-                    # ordinary single-pointer
-                    converts.append(
-                        f"    {base_type}* {arg_name} = "
-                        f"static_cast<{base_type}*>({arg_name}_ptr);"
-                    )
-                    call_args.append(arg_name)
-
+            else:
+                data = f"reinterpret_cast<{base_type}*>({arg_name}_buf)"
+                call_args.append(data if fixed else f"({count} ? {data} : nullptr)")
+
+        # 6) Numeric out-params → written straight into the caller's buffer
+        elif how == "out":
+            decls.append(f"char* {arg_name}_buf")
+            call_args.append(f"reinterpret_cast<{base_type}*>({arg_name}_buf)")
+
+        # 7) Handle out-params → stored in the RefManager, handle written to the buffer
+        elif how == "handle_out":
+            decls.append(f"char* {arg_name}_buf")
+            converts.append(f"    {base_type} {arg_name}_val{{}};")
+            call_args.append(f"&{arg_name}_val")
+            writebacks.append(
+                f"    __buffer_put<uint64_t>({arg_name}_buf, {arg_name}_val ? "
+                f'RefManager::instance().store("{base_type}", {arg_name}_val) : 0);'
+            )
 
+        # 8) Structs passed by value → receive as JSON, deserialize
+        elif how == "json":
+            decls.append(f"const char* {arg_name}_json")
+            converts.append(f"    // Deserialize JSON into {base_type}")
+            converts.append(
+                f"    {base_type} {arg_name} = "
+                f"nlohmann::json::parse({arg_name}_json).get<{base_type}>();"
+            )
+            call_args.append(arg_name)
+
+        # 9) Refs (opaque handles, function pointers, or buffers)
+        elif how == "ref":
+            decls.append(f"{REF_C_TYPE[handles]} {arg_name}_ref")
+            converts.append(f"    // Convert Argument{i} ({arg_name}) to {arg['declared_type']}")
+            converts.append(
+                f"    void* {arg_name}_ptr = RefManager::instance().retrieve({arg_name}_ref);"
+            )
+            converts.append(f"    if (!{arg_name}_ptr) return {err_return};")
 
-            # 3) Plain strings (const char*, std::string)
-            elif ext == "string":
-                decls.append(f"const char* {arg_name}")
+            # detect how many levels of pointer were declared (e.g. "T**" → depth=2)
+            depth = arg["declared_type"].count("*")
+            if depth >= 2:
+                # cast to the element type pointer, then take its address
+                elem_type = base_type  # e.g. "XrVector3f"
+                converts.append(
+                    f"    {elem_type}* {arg_name}_buf = "
+                    f"static_cast<{elem_type}*>({arg_name}_ptr);"
+                )
+                # use the original declared_type (e.g. "XrVector3f**") here
+                converts.append(
+                    f"    {arg['declared_type']} {arg_name} = &{arg_name}_buf;"
+                )
                 call_args.append(arg_name)
-            
-            # 5) Fallback: treat as string
             else:
-                # we don’t know how to marshal this yet!
-                decls.append(f"// TODO: marshal argument '{arg_name}' of type {arg['type']}")
+                # ordinary single-pointer
+                converts.append(
+                    f"    {base_type}* {arg_name} = "
+                    f"static_cast<{base_type}*>({arg_name}_ptr);"
+                )
                 call_args.append(arg_name)
 
 
 
-        # assemble the function bridge
-        fb = [f"// Bridge for {fn_name}"]
-        fb.append(f'extern "C" {ret_sig} __{fn_name}({", ".join(decls)}) {{')
-
-        if debug:
-            fb.append(f'    std::cout << "[GMBridge] Called {fn_name}" << std::endl;')
-
-        fb += [f"    {line}" for line in converts if line.strip()]
+        # 10) Plain strings (const char*, std::string)
+        elif how == "string":
+            decls.append(f"const char* {arg_name}")
+            call_args.append(arg_name)
         
-        # If it's not a void return set up it's result value
-        if ret_ext == "void":
-            fb.append(f"    {fn_name}({', '.join(call_args)});")
+        # 11) Fallback: treat as string
         else:
-            fb.append(f"\n    {canon_rt} result = {fn_name}({', '.join(call_args)});")
+            # we don’t know how to marshal this yet!
+            decls.append(f"// TODO: marshal argument '{arg_name}' of type {arg['type']}")
+            call_args.append(arg_name)
 
-        if ret_ext == "void":
-            # just call it, then return our dummy
-            fb.append(f"    return 0.0;")
-        
-        # 1) Unsupported-width integer returns → serialize to string
-        elif ret_meta["is_unsupported_numeric"]:
-            fb.append(
-                "    _tmp_str = std::to_string(result);\n"
-                "    return _tmp_str.c_str();"
-            )
 
-        # 2) Standard-number returns
-        elif ret_ext == "double":
-            fb.append("    return static_cast<double>(result);")
 
-        # 3) Ref returns
-        elif ret_meta["is_ref"]:
-            fb.append(
-                f'    _tmp_str = RefManager::instance().store("{ret_meta["base_type"]}", result);\n'
-                "    return _tmp_str.c_str();"
-            )
+    # assemble the function bridge
+    fb = [f"// Bridge for {fn_name}"]
+    fb.append(f'extern "C" {ret_sig} __{fn_name}({", ".join(decls)}) {{')
 
-        # 4) Native-string returns
-        elif ret_ext == "string":
-            fb.append("    return result;")
+    fb.append(f'    GMBRIDGE_LOG_CALL("{fn_name}");')
+    fb.append(f'    GMBRIDGE_TIME_CALL("{fn_name}");')
 
-        # 5) Fallback error
-        else:
-            fb.append(f"    return {err_return};")
-        
-        fb.append("}\n")
-        function_bridges.append("\n".join(fb))
+    fb += [f"    {line}" for line in converts if line.strip()]
+    
+    # If it's not a void return set up it's result value
+    if ret_ext == "void":
+        fb.append(f"    {fn_name}({', '.join(call_args)});")
+    else:
+        fb.append(f"\n    {canon_rt} result = {fn_name}({', '.join(call_args)});")
+    fb += writebacks
+
+    if ret_ext == "void":
+        # just call it, then return our dummy
+        fb.append(f"    return 0.0;")
+    
+    # 1) Unsupported-width integer returns → serialize to string
+    elif ret_meta["is_unsupported_numeric"]:
+        fb.append("    return BridgeStrings::hold(std::to_string(result));")
+
+    # 2) Standard-number returns
+    elif ret_ext == "double":
+        fb.append("    return static_cast<double>(result);")
+
+    # 3) Ref returns
+    elif ret_meta["is_ref"]:
+        fb.append(
+            f'    return RefManager::to_gml(RefManager::instance().store("{ret_meta["base_type"]}", result));'
+        )
 
-    # 3) Fill in the header template
+    # 4) Native-string returns
+    elif ret_ext == "string":
+        fb.append("    return result;")
+
+    # 5) Fallback error
+    else:
+        fb.append(f"    return {err_return};")
+    
+    fb.append("}\n")
+    return "\n".join(fb)
+
+
+def bridge_include_header(config) -> str:
     # build a multi-line include block from every entry in config["include_files"]:
     include_lines = []
     for path in config.get("include_files", []):
@@ -464,17 +611,261 @@ extern "C" const char* __cpp_create_{name}() {{
     # if none were supplied, fall back to a single default include
     if not include_lines:
         include_lines = ['#include "openxr.h"']
-    include_header = "\n".join(include_lines)
-
-    bridge_cpp = BRIDGE_HEADER_TPL.substitute({
-        "INCLUDE_HEADER":         include_header,
-        "REF_MANAGER_BRIDGES": "",  
-        "STRUCT_CONSTRUCTORS": "\n".join(struct_constructors),
-        "FUNCTION_BRIDGES":    "\n".join(function_bridges)
-    })
-
-    return {
-        f"{config["project_name"]}.cpp": bridge_cpp,
-        "RefManager.h": REF_MANAGER_H,
-        "RefManager.cpp": REF_MANAGER_CPP
+    return "\n".join(include_lines)
+
+
+def struct_components(parse_result, filtered_structs) -> list[list[str]]:
+    """
+    Group structs into dependency components – a struct together with every
+    struct it nests or is nested in – each kept in `filtered_structs` order.
+    """
+    parent = {name: name for name in filtered_structs}
+
+    def find(name):
+        while parent[name] != name:
+            parent[name] = parent[parent[name]]
+            name = parent[name]
+        return name
+
+    for name, needed in struct_dependencies(parse_result).items():
+        if name not in parent:
+            continue
+        for dep in needed:
+            if dep in parent:
+                parent[find(dep)] = find(name)
+
+    components = {}
+    for name in filtered_structs:
+        components.setdefault(find(name), []).append(name)
+    return list(components.values())
+
+
+def plan_bridge_shards(parse_result, shard_count) -> list[tuple[list[str], list[dict]]]:
+    """
+    Split the bridge into `shard_count` (structs, functions) pairs. Struct
+    components are packed onto the lightest shard (by field count, largest
+    first) so nested structs stay together; functions are cut into
+    contiguous groups of equal size, which keeps each extension together.
+    """
+    filtered_structs = order_bridge_structs(parse_result)
+    struct_fields    = parse_result["struct_fields"]
+    position         = {name: i for i, name in enumerate(filtered_structs)}
+
+    def weight(component):
+        return sum(len(struct_fields[name]) + 1 for name in component)
+
+    struct_bins = [[] for _ in range(shard_count)]
+    loads       = [0] * shard_count
+    components  = struct_components(parse_result, filtered_structs)
+    for component in sorted(components, key=lambda c: (-weight(c), position[c[0]])):
+        lightest = loads.index(min(loads))
+        struct_bins[lightest].extend(component)
+        loads[lightest] += weight(component)
+    for bin_ in struct_bins:
+        bin_.sort(key=position.__getitem__)
+
+    functions = parse_result["functions"]
+    per_shard = max(1, ceil(len(functions) / shard_count))
+    function_groups = [functions[i * per_shard:(i + 1) * per_shard] for i in range(shard_count)]
+
+    return list(zip(struct_bins, function_groups))
+
+
+def _iter_template(template, placeholders, sections):
+    """Substitute `template`, streaming each ${SECTION} from its chunk generator."""
+    for text, section in split_template(template, sections):
+        yield Template(text).substitute(placeholders)
+        if section:
+            yield from joined(sections[section]())
+
+
+def iter_bridge_cpp(parse_result, config, structs=None, functions=None):
+    """
+    Yield the bridge translation unit chunk by chunk: template text, then one
+    chunk per struct and per function bridge. The concatenated chunks are
+    exactly the text BRIDGE_HEADER_TPL.substitute() would produce, but only
+    one bridge is ever held in memory. Pass empty `structs`/`functions` to
+    emit just the shared runtime (the sharded layout's main file).
+    """
+    handles       = ref_handle_mode(config)
+    known_structs = parse_result["struct_fields"].keys()
+    if structs is None:
+        structs = order_bridge_structs(parse_result)
+    if functions is None:
+        functions = parse_result["functions"]
+    layouts = buffer_layouts(parse_result, config)
+
+    placeholders = {
+        "INCLUDE_HEADER":      bridge_include_header(config),
+        "LOGGING":             int(profile_option(config, "log_calls")),
+        "STATS":               int(profile_option(config, "call_stats")),
+        "REF_MANAGER_BRIDGES": "",
     }
+    sections = {
+        # 1) Struct constructors + JSON I/O (import then export)
+        "STRUCT_CONSTRUCTORS": lambda: iter_struct_constructors(
+            parse_result, structs, handles=handles, layouts=layouts,
+            checks=layout_checks(parse_result, config),
+        ),
+        # 2) Function bridges
+        "FUNCTION_BRIDGES": lambda: (
+            generate_function_bridge(
+                fn, known_structs, handles, layouts,
+                function_arg_passing(fn, known_structs, layouts, config),
+            )
+            for fn in functions
+        ),
+    }
+
+    # 3) Fill in the header template around the streamed sections
+    yield from _iter_template(BRIDGE_HEADER_TPL, placeholders, sections)
+
+
+def iter_bridge_shard(parse_result, config, shared_header, index, count, structs, functions):
+    """Yield one shard: its structs' overloads (non-inline) and its function bridges."""
+    handles       = ref_handle_mode(config)
+    known_structs = parse_result["struct_fields"].keys()
+    layouts       = buffer_layouts(parse_result, config)
+
+    placeholders = {
+        "SHARD_INDEX":   index,
+        "SHARD_COUNT":   count,
+        "SHARED_HEADER": shared_header,
+    }
+    sections = {
+        "STRUCT_CONSTRUCTORS": lambda: iter_struct_constructors(
+            parse_result, structs, inline=False, handles=handles, layouts=layouts,
+            checks=layout_checks(parse_result, config),
+        ),
+        "FUNCTION_BRIDGES": lambda: (
+            generate_function_bridge(
+                fn, known_structs, handles, layouts,
+                function_arg_passing(fn, known_structs, layouts, config),
+            )
+            for fn in functions
+        ),
+    }
+    yield from _iter_template(BRIDGE_SHARD_TPL, placeholders, sections)
+
+
+def iter_bridge_shared_header(parse_result, config):
+    """Yield the header every shard includes: includes plus JSON/buffer overload declarations."""
+    layouts = buffer_layouts(parse_result, config)
+
+    def declarations():
+        for name in order_bridge_structs(parse_result):
+            yield (
+                f"void to_json(json& jsonValue, const {name}& o);\n"
+                f"void from_json(const json& jsonValue, {name}& o);"
+            )
+            if name in layouts:
+                yield (
+                    f"void __buffer_write_{name}(char* buf, const {name}& o);\n"
+                    f"void __buffer_read_{name}(const char* buf, {name}& o);"
+                )
+
+    placeholders = {
+        "INCLUDE_HEADER": bridge_include_header(config),
+        "LOGGING":        int(profile_option(config, "log_calls")),
+        "STATS":          int(profile_option(config, "call_stats")),
+    }
+    yield from _iter_template(BRIDGE_SHARED_TPL, placeholders, {"JSON_DECLARATIONS": declarations})
+
+
+# C type of each batch signature code (see marshaling.BATCH_CODES)
+BATCH_C_TYPE = {"d": "double", "s": "const char*", "p": "char*"}
+BATCH_READ   = {"d": "in.f64()", "s": "in.str()", "p": "in.ptr()"}
+
+
+def iter_bridge_batch(parse_result, config):
+    """
+    Yield "<project>_batch.cpp": a thunk per batchable bridge that reads its
+    args from the command buffer, calls the bridge and appends the result,
+    plus the jump table __bridge_batch dispatches through (index = function id).
+    """
+    functions  = parse_result["functions"]
+    signatures = batch_signatures(parse_result, config)
+
+    def prototypes():
+        for fn, sig in zip(functions, signatures):
+            if sig:
+                params = ", ".join(BATCH_C_TYPE[code] for code in sig[1:])
+                yield f'extern "C" {BATCH_C_TYPE[sig[0]]} __{fn["name"]}({params});'
+
+    def thunks():
+        for fn, sig in zip(functions, signatures):
+            if not sig:
+                continue
+            lines = [f'void batch_{fn["name"]}(BatchReader& in, BatchWriter& out) {{']
+            for i, code in enumerate(sig[1:]):
+                lines.append(f"    {BATCH_C_TYPE[code]} a{i} = {BATCH_READ[code]};")
+            lines.append("    if (!in.ok) return;")
+            args = ", ".join(f"a{i}" for i in range(len(sig) - 1))
+            lines.append(f'    out.{"f64" if sig[0] == "d" else "str"}(__{fn["name"]}({args}));')
+            lines.append("}")
+            yield "\n".join(lines)
+
+    def table():
+        entries = [
+            f'    batch_{fn["name"]},' if sig else f'    nullptr,  // {fn["name"]}'
+            for fn, sig in zip(functions, signatures)
+        ]
+        yield "\n".join(entries or ["    nullptr,"])
+
+    sections = {"BATCH_PROTOTYPES": prototypes, "BATCH_THUNKS": thunks, "BATCH_TABLE": table}
+    yield from _iter_template(BRIDGE_BATCH_TPL, {}, sections)
+
+
+def ref_manager_header(config) -> str:
+    """RefManager.h for the configured handle mode, locked if ref_thread_safe is set."""
+    header = REF_MANAGER_H[ref_handle_mode(config)]
+    if config.get("ref_thread_safe", False):
+        header = header.replace("#pragma once\n", "#pragma once\n#define REFMAN_THREAD_SAFE 1\n", 1)
+    return header
+
+
+def generate_cpp_bridge(parse_result, config, stream=False):
+    """
+    Return {filename: content} for the bridge sources. With stream=True each
+    value is an iterator of text chunks instead, for OutputWriter.write_stream().
+
+    config["bridge_shards"] > 1 splits the bridge into that many translation
+    units ("<project>_<n>.cpp") sharing "<project>_bridge.h", so MSBuild /MP can
+    compile them in parallel; "<project>.cpp" then only holds the runtime
+    helpers. 0 means one shard per CPU.
+
+    config["bridge_batch"] adds "<project>_batch.cpp" with __bridge_batch,
+    which runs a whole command buffer of bridge calls per DLL crossing.
+
+    Every bridge opens with GMBRIDGE_LOG_CALL and GMBRIDGE_TIME_CALL; the
+    build profile (config["profile"]) decides which of them compile to
+    anything: the "debug" call log or the "profiled" per-function counters
+    behind __bridge_stats_dump.
+    """
+    project_name = config["project_name"]
+    shard_count  = int(config.get("bridge_shards", 1) or os.cpu_count() or 1)
+
+    if shard_count > 1:
+        shared_header = f"{project_name}_bridge.h"
+        files = {
+            f"{project_name}.cpp": iter_bridge_cpp(parse_result, config, structs=[], functions=[]),
+            shared_header:         iter_bridge_shared_header(parse_result, config),
+        }
+        for i, (structs, functions) in enumerate(plan_bridge_shards(parse_result, shard_count), 1):
+            files[f"{project_name}_{i}.cpp"] = iter_bridge_shard(
+                parse_result, config, shared_header, i, shard_count, structs, functions
+            )
+    else:
+        files = {f"{project_name}.cpp": iter_bridge_cpp(parse_result, config)}
+
+    if config.get("bridge_batch", False):
+        files[f"{project_name}_batch.cpp"] = iter_bridge_batch(parse_result, config)
+
+    files["RefManager.h"]    = iter([ref_manager_header(config)])
+    files["RefManager.cpp"]  = iter([REF_MANAGER_CPP])
+    files["BridgeLog.h"]     = iter([BRIDGE_LOG_H])
+    files["BridgeStats.h"]   = iter([BRIDGE_STATS_H])
+    files["BridgeStrings.h"] = iter([BRIDGE_STRINGS_H])
+    if stream:
+        return files
+    return {fname: "".join(chunks) for fname, chunks in files.items()}
@@ -1,7 +1,61 @@
 # generator/gml_stub_gen.py
 import re
 
-def map_jsdoc_type(c_type, known_enums=None, namespace="", cull_enum=True):
+from generator.marshaling import BUFFER_ARGS, batch_signatures, buffer_layouts, function_arg_passing
+from generator.profiles import profile_option
+from generator.ref_handles import int_handles
+
+# How enums reach GML, selected with config["gml_enums"]:
+#   "static" – a struct literal per enum on the namespace (XR.Result.SUCCESS),
+#              all built when the script runs
+#   "enum"   – GML enum declarations, resolved at compile time (XR_Result.SUCCESS)
+#   "lazy"   – an accessor per enum whose table is built on first call
+#              (XR.Result().SUCCESS)
+GML_ENUM_MODES = ("static", "enum", "lazy")
+
+# How #define constants reach GML, selected with config["gml_constants"]:
+#   "static" – a static field each on the namespace (XR.TRUE)
+#   "macro"  – #macro per constant, resolved at compile time (XR_TRUE)
+#   "lazy"   – one table built on the first XR.constants() call (XR.constants().TRUE)
+GML_CONSTANT_MODES = ("static", "macro", "lazy")
+
+# ref_get's check for a "ref error" string (string ref_handles only)
+REF_GET_ERROR_CHECK = '''        if (string_pos("ref error", _ret)) { show_error(_ret, true); return undefined; }
+'''
+
+
+def gml_enum_mode(config) -> str:
+    mode = config.get("gml_enums", "static")
+    if mode not in GML_ENUM_MODES:
+        raise ValueError(
+            f"config['gml_enums'] must be one of {', '.join(GML_ENUM_MODES)}, got {mode!r}"
+        )
+    return mode
+
+
+def gml_constant_mode(config) -> str:
+    mode = config.get("gml_constants", "static")
+    if mode not in GML_CONSTANT_MODES:
+        raise ValueError(
+            f"config['gml_constants'] must be one of {', '.join(GML_CONSTANT_MODES)}, got {mode!r}"
+        )
+    return mode
+
+
+def gml_enum_short_name(enum_name, namespace="", cull_enum=True):
+    """XrResult → Result when culling enum names."""
+    if cull_enum and enum_name.lower().startswith(namespace.lower()):
+        return enum_name[len(namespace):]
+    return enum_name
+
+
+def gml_enum_global_name(enum_name, namespace="", cull_enum=True):
+    """Name of the enum in "enum" mode, where it is global: XrResult → XR_Result."""
+    short = gml_enum_short_name(enum_name, namespace, cull_enum)
+    return f"{namespace}_{short}" if short != enum_name else enum_name
+
+
+def map_jsdoc_type(c_type, known_enums=None, namespace="", cull_enum=True, enum_mode="static"):
     """
     Map a C type (possibly with const/*) to a GML JsDoc type.
     """
@@ -10,11 +64,9 @@ def map_jsdoc_type(c_type, known_enums=None, namespace="", cull_enum=True):
     # 1) Enums
     if known_enums and t in known_enums:
         enum_name = known_enums[t]
-        if cull_enum and enum_name.lower().startswith(namespace.lower()):
-            short = enum_name[len(namespace):]
-        else:
-            short = enum_name
-        return f"Constant.{namespace}.{short}"
+        if enum_mode == "enum":
+            return f"Enum.{gml_enum_global_name(enum_name, namespace, cull_enum)}"
+        return f"Constant.{namespace}.{gml_enum_short_name(enum_name, namespace, cull_enum)}"
 
     # 2) Primitives
     if t in ("bool", "_bool"):
@@ -50,6 +102,283 @@ def map_jsdoc_type(c_type, known_enums=None, namespace="", cull_enum=True):
     return "UNKNOWN"
 
 
+def gml_function_name(orig, cull_funcs=True):
+    """GML name of a bridged function: xrLocateSpace → locateSpace when culling."""
+    if cull_funcs and orig.startswith("xr"):
+        js_name = orig[2:]
+        return js_name[0].lower() + js_name[1:]
+    return orig
+
+
+def generate_batch_stubs(functions_dict, config):
+    """
+    Recording helpers for __bridge_batch: BatchOp ids, batchCall() to append a
+    call to a command buffer using that function's signature, batchSubmit()
+    to run the buffer in one DLL crossing and batchResult() to read results
+    back in order.
+    """
+    namespace  = config.get("namespace", "XR")
+    cull_funcs = config.get("cull_function_names", True)
+    signatures = batch_signatures(functions_dict, config)
+    functions  = functions_dict["functions"]
+
+    lines = ["    #region Batching"]
+    lines.append("    // Function ids for batchCall (index into the generated jump table)")
+    lines.append("    static BatchOp = {")
+    for i, (fn, sig) in enumerate(zip(functions, signatures)):
+        if sig:
+            lines.append(f"        {gml_function_name(fn['name'], cull_funcs)}: {i},")
+    lines.append("    };")
+    lines.append("")
+    lines.append("    // Per id: return code, then one code per argument")
+    lines.append("    // (d = real, s = string, p = buffer address; \"\" = not batchable)")
+    lines.append("    static __batch_signatures = [")
+    lines += [f'        "{sig or ""}",' for sig in signatures]
+    lines.append("    ];")
+    lines.append("""
+    #region JsDocs
+    /// @function batchCall(commands, op, ...args)
+    /// @desc Append a call to `commands` (a buffer_grow buffer, written at its seek position)
+    /// @param {Id.Buffer} commands
+    /// @param {Real} op A BatchOp id
+    /// @param {Any} args The function's arguments, as for the direct call
+    /// @returns {Undefined}
+    #endregion
+    static batchCall = function(_commands, _op) {
+        var _sig = @NS@.__batch_signatures[_op];
+        buffer_write(_commands, buffer_u32, _op);
+        for (var _i = 2; _i < argument_count; _i++) {
+            switch (string_char_at(_sig, _i)) {
+                case "d": buffer_write(_commands, buffer_f64, argument[_i]); break;
+                case "s": buffer_write(_commands, buffer_string, string(argument[_i])); break;
+                case "p": buffer_write(_commands, buffer_u64, int64(buffer_get_address(argument[_i]))); break;
+            }
+        }
+    };
+
+    #region JsDocs
+    /// @function batchSubmit(commands, results)
+    /// @desc Run every call recorded in `commands` in one DLL crossing, then rewind it.
+    ///       If dispatch stops early (results full or a malformed call), only the calls
+    ///       that ran are removed; the rest stay recorded for the next submit.
+    /// @param {Id.Buffer} commands
+    /// @param {Id.Buffer} results Receives each call's return value in order
+    /// @returns {Real} Number of calls executed, or -(calls executed + 1) if dispatch
+    ///          stopped early (when `results` filled up, the last call ran without a result)
+    #endregion
+    static batchSubmit = function(_commands, _results) {
+        var _end   = buffer_tell(_commands);
+        var _count = __bridge_batch(buffer_get_address(_commands), _end,
+                                    buffer_get_address(_results), buffer_get_size(_results));
+        buffer_seek(_commands, buffer_seek_start, 0);
+        buffer_seek(_results, buffer_seek_start, 0);
+        if (_count >= 0) return _count;
+
+        // Skip the calls that ran, then move the unexecuted tail to the front
+        repeat (-_count - 1) {
+            var _sig = @NS@.__batch_signatures[buffer_read(_commands, buffer_u32)];
+            for (var _i = 2; _i <= string_length(_sig); _i++) {
+                switch (string_char_at(_sig, _i)) {
+                    case "d": buffer_read(_commands, buffer_f64); break;
+                    case "s": buffer_read(_commands, buffer_string); break;
+                    case "p": buffer_read(_commands, buffer_u64); break;
+                }
+            }
+        }
+        var _ran  = buffer_tell(_commands);
+        var _tail = buffer_create(max(_end - _ran, 1), buffer_fixed, 1);
+        buffer_copy(_commands, _ran, _end - _ran, _tail, 0);
+        buffer_copy(_tail, 0, _end - _ran, _commands, 0);
+        buffer_delete(_tail);
+        buffer_seek(_commands, buffer_seek_start, _end - _ran);
+        return _count;
+    };
+
+    #region JsDocs
+    /// @function batchResult(results, op)
+    /// @desc Read the next return value of an `op` call from `results`
+    /// @param {Id.Buffer} results
+    /// @param {Real} op A BatchOp id
+    /// @returns {Any}
+    #endregion
+    static batchResult = function(_results, _op) {
+        if (string_char_at(@NS@.__batch_signatures[_op], 1) == "s") return buffer_read(_results, buffer_string);
+        return buffer_read(_results, buffer_f64);
+    };
+    #endregion
+""".replace("@NS@", namespace))
+    return lines
+
+
+def generate_struct_buffer_stubs(layouts, config):
+    """
+    GML accessors for the packed struct layouts: bufferSize<Name>, plus
+    write<Name>(buffer, offset, struct) and read<Name>(buffer, offset), which
+    buffer_poke/buffer_peek each field at its offset.
+    """
+    namespace    = config.get("namespace", "XR")
+    cull_structs = config.get("cull_struct_names", True)
+
+    def short_name(s):
+        short = s[len(namespace):] if cull_structs and s.lower().startswith(namespace.lower()) else s
+        return short[0].upper() + short[1:]
+
+    lines = ["    #region Struct Buffers"]
+    lines.append("    // Char arrays are fixed-size: truncate, then zero-fill the rest")
+    lines.append("    static __buffer_poke_chars = function(_buffer, _offset, _size, _string) {")
+    lines.append("        var _len = min(string_byte_length(_string), _size - 1);")
+    lines.append("        for (var _i = 0; _i < _len; _i++) buffer_poke(_buffer, _offset + _i, buffer_u8, string_byte_at(_string, _i + 1));")
+    lines.append("        for (var _i = _len; _i < _size; _i++) buffer_poke(_buffer, _offset + _i, buffer_u8, 0);")
+    lines.append("    };")
+    lines.append("")
+
+    for s in sorted(layouts):
+        layout = layouts[s]
+        base   = short_name(s)
+        writes, reads = [], []
+        for f in layout["fields"]:
+            nm, off, count = f["name"], f["offset"], f["count"]
+            at = f"_offset + {off}"
+            if f["kind"] == "char_array":
+                writes.append(f"        {namespace}.__buffer_poke_chars(_buffer, {at}, {count}, _value.{nm});")
+                reads.append(f"        _value.{nm} = buffer_peek(_buffer, {at}, buffer_string);")
+                continue
+            if f["kind"] == "struct":
+                inner = short_name(f["struct"])
+                poke  = lambda where, v: f"{namespace}.write{inner}(_buffer, {where}, {v});"
+                peek  = lambda where: f"{namespace}.read{inner}(_buffer, {where})"
+            else:
+                btype = f["buffer_type"]
+                poke  = lambda where, v, btype=btype: f"buffer_poke(_buffer, {where}, {btype}, {v});"
+                peek  = lambda where, btype=btype: f"buffer_peek(_buffer, {where}, {btype})"
+            if count == 1:
+                writes.append(f"        {poke(at, f'_value.{nm}')}")
+                reads.append(f"        _value.{nm} = {peek(at)};")
+            else:
+                elem = f"{at} + _i * {f['size']}"
+                writes.append(f"        for (var _i = 0; _i < {count}; _i++) {poke(elem, f'_value.{nm}[_i]')}")
+                reads.append(f"        _value.{nm} = array_create({count});")
+                reads.append(f"        for (var _i = 0; _i < {count}; _i++) _value.{nm}[_i] = {peek(elem)};")
+
+        lines.append(f"    static bufferSize{base} = {layout['size']};")
+        lines.append("")
+        lines.append("    #region JsDocs")
+        lines.append(f"    /// @function write{base}(buffer, offset, value)")
+        lines.append(f"    /// @desc Pack a `{s}` into `buffer` at `offset` ({layout['size']} bytes)")
+        lines.append("    /// @param {Id.Buffer} buffer")
+        lines.append("    /// @param {Real} offset")
+        lines.append(f"    /// @param {{Struct.{s}}} value")
+        lines.append("    /// @returns {Undefined}")
+        lines.append("    #endregion")
+        lines.append(f"    static write{base} = function(_buffer, _offset, _value) {{")
+        lines += writes
+        lines.append("    };")
+        lines.append("")
+        lines.append("    #region JsDocs")
+        lines.append(f"    /// @function read{base}(buffer, offset)")
+        lines.append(f"    /// @desc Unpack a `{s}` from `buffer` at `offset`")
+        lines.append("    /// @param {Id.Buffer} buffer")
+        lines.append("    /// @param {Real} offset")
+        lines.append(f"    /// @returns {{Struct.{s}}}")
+        lines.append("    #endregion")
+        lines.append(f"    static read{base} = function(_buffer, _offset) {{")
+        lines.append("        var _value = {};")
+        lines += reads
+        lines.append("        return _value;")
+        lines.append("    };")
+        lines.append("")
+    lines.append("    #endregion\n")
+    return lines
+
+
+def enum_members(data, cull_enums=True):
+    """(GML member name, value) of every enumerator, prefix/suffix culled if asked."""
+    meta     = data["_meta"]
+    pre, suf = meta["base_prefix"], meta.get("base_suffix", "")
+    for key, val in data.items():
+        if key == "_meta": continue
+        # clean name
+        if cull_enums:
+            clean = key[len(pre):] if key.startswith(pre) else key
+            if suf and clean.endswith(suf): clean = clean[:-len(suf)]
+        else:
+            clean = f"{pre}{key}{suf}"
+        if clean and clean[0].isdigit(): clean = "_" + clean
+        yield clean, val
+
+
+def generate_enum_tables(enums, cull_enums=True, lazy=False):
+    """
+    Enums as struct literals on the namespace. With `lazy`, each one sits in
+    a method-local static instead, which GML only initializes on the first
+    call, so untouched enums cost one method each at startup.
+    """
+    lines = ["    #region Enums"]
+    for enum_name, data in enums.items():
+        field = data["_meta"]["short_name"] if cull_enums else enum_name
+        if lazy:
+            lines.append(f"    static {field} = function() {{")
+            lines.append("        static table = {")
+            lines += [f"            {clean}: {val}," for clean, val in enum_members(data, cull_enums)]
+            lines.append("        };")
+            lines.append("        return table;")
+            lines.append("    };")
+        else:
+            lines.append(f"    static {field} = {{")
+            lines += [f"        {clean}: {val}," for clean, val in enum_members(data, cull_enums)]
+            lines.append("    };")
+        lines.append("")
+    lines.append("    #endregion\n")
+    return lines
+
+
+def generate_enum_declarations(enums, namespace, cull_enums=True):
+    """Enums as GML enum declarations: compile-time constants, nothing built at startup."""
+    lines = ["#region Enums"]
+    for enum_name, data in enums.items():
+        lines.append(f"enum {gml_enum_global_name(enum_name, namespace, cull_enums)} {{")
+        lines += [f"    {clean} = {val}," for clean, val in enum_members(data, cull_enums)]
+        lines.append("}")
+        lines.append("")
+    lines.append("#endregion\n")
+    return lines
+
+
+def generate_constant_table(constants, config, lazy=False):
+    """#define constants as static fields, or (`lazy`) one table built on first use."""
+    namespace   = config.get("namespace", "XR")
+    cull_consts = config.get("cull_constant_names", True)
+    ns_prefix   = f"{namespace}_" if cull_consts else ""
+    indent      = "            " if lazy else "    "
+
+    fields = []
+    for name, val in constants.items():
+        clean = name[len(ns_prefix):] if cull_consts and name.startswith(ns_prefix) else name
+        if clean and clean[0].isdigit(): clean = "_" + clean
+        fields.append(f"{indent}{clean}: {val}," if lazy else f"{indent}static {clean} = {val};")
+
+    lines = ["    #region Constants"]
+    if lazy:
+        lines.append("    static constants = function() {")
+        lines.append("        static table = {")
+        lines += fields
+        lines.append("        };")
+        lines.append("        return table;")
+        lines.append("    };")
+    else:
+        lines += fields
+    lines.append("    #endregion\n")
+    return lines
+
+
+def generate_constant_macros(constants):
+    """#define constants as GML macros under their C names: compile-time, nothing built at startup."""
+    lines = ["#region Constants"]
+    lines += [f"#macro {name} {val}" for name, val in constants.items()]
+    lines.append("#endregion\n")
+    return lines
+
+
 def generate_gml_stub(functions_dict, config):
     namespace      = config.get("namespace", "XR")
     enums          = functions_dict.get("enums", {})
@@ -57,8 +386,20 @@ def generate_gml_stub(functions_dict, config):
     known_enum_map = {k.lower(): k for k in enums.keys()}
     constants      = functions_dict.get("constants", {})
     known_structs  = functions_dict.get("known_structs", set())
-
-    lines = [
+    int_refs       = int_handles(config)
+    struct_names   = functions_dict.get("struct_fields", {}).keys()
+    layouts        = buffer_layouts(functions_dict, config)
+    enum_mode      = gml_enum_mode(config)
+    constant_mode  = gml_constant_mode(config)
+
+    # Compile-time enums and macros live outside the constructor
+    lines = []
+    if enum_mode == "enum":
+        lines += generate_enum_declarations(enums, namespace, cull_enums)
+    if constant_mode == "macro":
+        lines += generate_constant_macros(constants)
+
+    lines += [
         "/**",
         f" * @self {namespace}",
         " */",
@@ -66,7 +407,7 @@ def generate_gml_stub(functions_dict, config):
     ]
 
     # --- Cache Manager region ---
-    lines.append("""
+    cache_manager = """
     #region Cache Manager
     #region JsDocs
     /// @function ref_set(ref, key, value)
@@ -144,17 +485,61 @@ def generate_gml_stub(functions_dict, config):
         return __ref_manager_flush();
     };
     #endregion
+"""
+    if int_refs:
+        # Integer handles arrive as int64 reals, and a stale one never comes
+        # back as "ref error" text, so there is nothing to string-match
+        cache_manager = (
+            cache_manager
+            .replace("/// @param {String} ref\n", "/// @param {Int64} ref\n")
+            .replace(REF_GET_ERROR_CHECK, "")
+        )
+    lines.append(cache_manager)
+
+    # --- Call log (debug profile) ---
+    if profile_option(config, "log_calls"):
+        lines.append("""    #region Call Log
+    #region JsDocs
+    /// @function bridge_log_dump([clear])
+    /// @desc Recent bridge calls, oldest first, one "<microseconds> <function>" line each
+    /// @param {Bool} [clear] Forget the returned calls
+    /// @returns {String}
+    #endregion
+    static bridge_log_dump = function(_clear = false) {
+        return __bridge_log_dump(_clear);
+    };
+    #endregion
+""")
+
+    # --- Call counters (profiled profile) ---
+    if profile_option(config, "call_stats"):
+        lines.append("""    #region Bridge Stats
+    #region JsDocs
+    /// @function bridge_stats([reset])
+    /// @desc Call count and latency of every bridged function called so far
+    /// @param {Bool} [reset] Zero the counters after reading them
+    /// @returns {Array<Struct>} { name, calls, total_us, max_us } per function
+    #endregion
+    static bridge_stats = function(_reset = false) {
+        var _stats = [];
+        var _lines = string_split(__bridge_stats_dump(_reset), "\\n", true);
+        for (var _i = 0; _i < array_length(_lines); _i++) {
+            var _cols = string_split(_lines[_i], " ");
+            array_push(_stats, {
+                name:     _cols[0],
+                calls:    real(_cols[1]),
+                total_us: real(_cols[2]),
+                max_us:   real(_cols[3]),
+            });
+        }
+        return _stats;
+    };
+    #endregion
 """)
 
     # --- Constants ---
-    lines.append("    #region Constants")
-    cull_consts = config.get("cull_constant_names", True)
-    ns_prefix   = f"{namespace}_" if cull_consts else ""
-    for name, val in constants.items():
-        clean = name[len(ns_prefix):] if cull_consts and name.startswith(ns_prefix) else name
-        if clean and clean[0].isdigit(): clean = "_" + clean
-        lines.append(f"    static {clean} = {val};")
-    lines.append("    #endregion\n")
+    if constant_mode != "macro":
+        lines += generate_constant_table(constants, config, lazy=constant_mode == "lazy")
 
     # --- Struct Constructors ---
     if known_structs:
@@ -181,27 +566,13 @@ def generate_gml_stub(functions_dict, config):
             lines.append("")
         lines.append("    #endregion\n")
 
+    # --- Struct Buffers (struct_marshaling "buffer") ---
+    if layouts:
+        lines += generate_struct_buffer_stubs(layouts, config)
+
     # --- Enums ---
-    lines.append("    #region Enums")
-    for enum_name, data in enums.items():
-        meta       = data["_meta"]
-        pre, suf   = meta["base_prefix"], meta.get("base_suffix", "")
-        field      = meta["short_name"] if cull_enums else enum_name
-
-        lines.append(f"    static {field} = {{")
-        for key, val in data.items():
-            if key == "_meta": continue
-            # clean name
-            if cull_enums:
-                clean = key[len(pre):] if key.startswith(pre) else key
-                if suf and clean.endswith(suf): clean = clean[:-len(suf)]
-            else:
-                clean = f"{pre}{key}{suf}"
-            if clean and clean[0].isdigit(): clean = "_" + clean
-            lines.append(f"        {clean}: {val},")
-        lines.append("    };")
-        lines.append("")
-    lines.append("    #endregion\n")
+    if enum_mode != "enum":
+        lines += generate_enum_tables(enums, cull_enums, lazy=enum_mode == "lazy")
 
     # --- Functions ---
     lines.append("    #region Functions")
@@ -213,22 +584,22 @@ def generate_gml_stub(functions_dict, config):
         ret_meta  = fn["return_meta"]
 
         # build GML name
-        if cull_funcs and orig.startswith("xr"):
-            js_name = orig[2:]
-            js_name = js_name[0].lower() + js_name[1:]
-        else:
-            js_name = orig
+        js_name = gml_function_name(orig, cull_funcs)
 
         # doc + code args (drop buffer if present)
         doc_args  = [a["name"] for a in args]
         code_args = [f"_{n}" for n in doc_args]
+        passing   = function_arg_passing(fn, struct_names, layouts, config)
 
         # JsDocs
         lines.append("    #region JsDocs")
         lines.append(f"    /// @function {js_name}({', '.join(doc_args)})")
         lines.append(f"    /// @desc Bridges to {orig}")
-        for a, nm in zip(args, doc_args):
-            js_t = map_jsdoc_type(a["type"], known_enum_map, namespace, cull_enums)
+        for a, nm, how in zip(args, doc_args, passing):
+            if how in BUFFER_ARGS:
+                js_t = "Id.Buffer"
+            else:
+                js_t = map_jsdoc_type(a["type"], known_enum_map, namespace, cull_enums, enum_mode)
             lines.append(f"    /// @param {{{js_t}}} {nm}")
         
         # JsDoc return
@@ -238,7 +609,7 @@ def generate_gml_stub(functions_dict, config):
         else:
             # use the declared_type from return_meta for accurate mapping
             declared = fn["return_type"]
-            js_rt = map_jsdoc_type(declared, known_enum_map, namespace, cull_enums)
+            js_rt = map_jsdoc_type(declared, known_enum_map, namespace, cull_enums, enum_mode)
             lines.append(f"    /// @returns {{{js_rt}}}")
         
         lines.append("    #endregion")
@@ -246,14 +617,14 @@ def generate_gml_stub(functions_dict, config):
         # Stub
         lines.append(f"    static {js_name} = function({', '.join(code_args)}) {{")
 
-        # 1) Convert any big-number args to strings
+        # 1) Convert any big-number args to strings, pass buffers by address
         call_args = []
-        for a in args:
-            nm          = a["name"]
-            is_big_arg  = a.get("is_unsupported_numeric", False)
-            if is_big_arg:
+        for nm, how in zip(code_args, passing):
+            if how == "big":
                 lines.append(f"        var {nm}_str = string({nm});")
                 call_args.append(f"{nm}_str")
+            elif how in BUFFER_ARGS:
+                call_args.append(f"buffer_get_address({nm})")
             else:
                 call_args.append(nm)
 
@@ -265,9 +636,12 @@ def generate_gml_stub(functions_dict, config):
         else:
             lines.append(f"        var _res = __{orig}({', '.join(call_args)});")
 
-            # 3) Wrap big-number returns in int64(), otherwise pass through
+            # 3) Wrap big-number returns (and integer handles, so they
+            #    json_stringify exactly) in int64(), otherwise pass through
             if ret_meta.get("is_unsupported_numeric", False):
                 lines.append("        return int64(_res);")
+            elif int_refs and ret_meta.get("is_ref", False):
+                lines.append("        return int64(_res);")
             else:
                 lines.append("        return _res;")
 
@@ -275,6 +649,11 @@ def generate_gml_stub(functions_dict, config):
         lines.append("")
 
     lines.append("    #endregion\n")
+
+    # --- Batching (bridge_batch) ---
+    if config.get("bridge_batch", False):
+        lines += generate_batch_stubs(functions_dict, config)
+
     lines.append("}")
     lines.append(f"{namespace}();")
 
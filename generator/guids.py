@@ -0,0 +1,15 @@
+# generator/guids.py
+import uuid
+
+# Root namespace of every GUID the generator emits. Never change it: the ids
+# in existing .yy/.sln/.vcxproj files are derived from it.
+GMBRIDGE_NAMESPACE = uuid.UUID("c8fea13f-7716-49b4-91a6-f6984a2417bf")
+
+
+def stable_guid(*parts) -> str:
+    """
+    Upper-case GUID derived (uuid5) from `parts`, e.g. (project, "function",
+    name): the same resource gets the same id on every run, so regenerating
+    an unchanged API rewrites nothing.
+    """
+    return str(uuid.uuid5(GMBRIDGE_NAMESPACE, "/".join(map(str, parts)))).upper()
@@ -0,0 +1,343 @@
+# generator/marshaling.py
+import re
+
+from generator.ref_handles import int_handles
+
+# How structs cross the extension boundary, selected with config["struct_marshaling"]:
+#   "json"   – JSON text through to_json/from_json (the original bridge)
+#   "buffer" – packed little-endian bytes in a GameMaker buffer, passed by
+#              address; structs that cannot be packed still fall back to JSON
+STRUCT_MARSHALING_MODES = ("json", "buffer")
+
+# Canonical C scalar → (GML buffer type, fixed-width C type, size in bytes).
+# Widths follow the MSVC x64 ABI the bridge is built for (long is 4 bytes);
+# the emitted static_asserts catch any header that disagrees.
+BUFFER_SCALARS = {
+    "float":              ("buffer_f32", "float",    4),
+    "double":             ("buffer_f64", "double",   8),
+    "bool":               ("buffer_u8",  "uint8_t",  1),
+    "_bool":              ("buffer_u8",  "uint8_t",  1),
+    "char":               ("buffer_s8",  "int8_t",   1),
+    "signed char":        ("buffer_s8",  "int8_t",   1),
+    "int8_t":             ("buffer_s8",  "int8_t",   1),
+    "unsigned char":      ("buffer_u8",  "uint8_t",  1),
+    "uint8_t":            ("buffer_u8",  "uint8_t",  1),
+    "short":              ("buffer_s16", "int16_t",  2),
+    "int16_t":            ("buffer_s16", "int16_t",  2),
+    "unsigned short":     ("buffer_u16", "uint16_t", 2),
+    "uint16_t":           ("buffer_u16", "uint16_t", 2),
+    "int":                ("buffer_s32", "int32_t",  4),
+    "long":               ("buffer_s32", "int32_t",  4),
+    "int32_t":            ("buffer_s32", "int32_t",  4),
+    "unsigned int":       ("buffer_u32", "uint32_t", 4),
+    "unsigned long":      ("buffer_u32", "uint32_t", 4),
+    "uint32_t":           ("buffer_u32", "uint32_t", 4),
+    # GML has no signed 64-bit buffer type; buffer_u64 round-trips the bits
+    "long long":          ("buffer_u64", "int64_t",  8),
+    "int64_t":            ("buffer_u64", "int64_t",  8),
+    "unsigned long long": ("buffer_u64", "uint64_t", 8),
+    "uint64_t":           ("buffer_u64", "uint64_t", 8),
+}
+# Spelled-out forms ("unsigned long int", "signed int" …) that platform
+# headers typedef the fixed-width types to (glibc: signed int __int32_t)
+BUFFER_SCALARS["signed"]   = BUFFER_SCALARS["int"]
+BUFFER_SCALARS["unsigned"] = BUFFER_SCALARS["unsigned int"]
+for _name in ("short", "int", "long", "long long"):
+    BUFFER_SCALARS[f"signed {_name}"] = BUFFER_SCALARS[_name]
+for _name in list(BUFFER_SCALARS):
+    if _name.endswith(("short", "long")):
+        BUFFER_SCALARS[f"{_name} int"] = BUFFER_SCALARS[_name]
+ENUM_SCALAR   = ("buffer_s32", "int32_t",  4)
+HANDLE_SCALAR = ("buffer_u64", "uint64_t", 8)
+
+# arg_passing() kinds that take a GameMaker buffer address
+BUFFER_ARGS = ("buffer", "array", "out", "handle_out")
+
+
+def struct_marshaling(config) -> str:
+    mode = config.get("struct_marshaling", "json")
+    if mode not in STRUCT_MARSHALING_MODES:
+        raise ValueError(
+            f"config['struct_marshaling'] must be one of {', '.join(STRUCT_MARSHALING_MODES)}, got {mode!r}"
+        )
+    return mode
+
+
+def resolve_type(type_name: str, typedef_map: dict[str,str]) -> str:
+    """Chase typedefs until we find the underlying type."""
+    seen = set()
+    result = type_name.strip()
+    while result in typedef_map and result not in seen:
+        seen.add(result)
+        result = typedef_map[result].strip()
+    return result
+
+def classify_field(field: dict,
+                   typedef_map: dict[str,str],
+                   struct_set: set[str],
+                   enum_set: set[str]) -> str:
+    # 0) nested/anonymous structs and unions, unions, multi-dimensional
+    #    arrays and unnamed bitfields have no per-field converter
+    if ("members" in field or field.get("is_union") or not field["name"]
+            or len(field.get("array_dims", ())) > 1):
+        return "unmarshaled"
+
+    raw        = field["type"].strip()
+    canonical  = field["canonical_type"].lower()
+    array_size = field.get("array_size")
+
+    # 1) fixed-size char arrays
+    if array_size and raw.rstrip("*").endswith("char"):
+        return "char_array"
+    # 2) all other C-arrays
+    if array_size:
+        return "array"
+    # 3) any raw pointer (T*, const T*, T**…) → handle
+    if raw.endswith("*"):
+        return "ref_handle"
+    # 4) function-pointer typedefs → handle
+    if field.get("is_function_ptr", False):
+        return "ref_handle"
+    # 5) nested structs
+    if field["canonical_type"] in struct_set:
+        return "struct"
+    # 6) numeric & enums
+    integer_types = {
+        "bool","int","float","double",
+        "int8_t","uint8_t","int16_t","uint16_t",
+        "int32_t","uint32_t","int64_t","uint64_t"
+    }
+    if canonical in integer_types or field["is_enum"]:
+        return "numeric"
+    # 7) strings
+    if field["extension_type"] == "string" and not field["is_ref"]:
+        return "string"
+    # 8) refs caught here (in case classify_c_type set is_ref on some pointer-like)
+    if field.get("is_ref", False):
+        return "ref_handle"
+    # fallback
+    return "numeric"
+
+
+def scalar_type(entry):
+    """
+    BUFFER_SCALARS entry for a field's or pointer arg's element type, else
+    None. The declared fixed-width name (int64_t) wins over the spelling the
+    platform headers resolved it to (glibc: signed long int).
+    """
+    declared = " ".join(re.sub(r'\bconst\b', ' ', entry["type"]).replace("*", " ").split())
+    return BUFFER_SCALARS.get(declared.lower()) or BUFFER_SCALARS.get(entry["canonical_type"].lower())
+
+
+def _field_scalar(field, kind, handles_fit):
+    """(buffer type, C type, size) of one element of a packable field, else None."""
+    if kind == "ref_handle":
+        return HANDLE_SCALAR if handles_fit else None
+    if kind == "char_array":
+        return BUFFER_SCALARS["char"]
+    if field["is_enum"]:
+        return ENUM_SCALAR
+    return scalar_type(field)
+
+
+def buffer_layouts(parse_result, config) -> dict[str, dict]:
+    """
+    Packed (unpadded) buffer layout of every struct that can travel as bytes:
+    {struct: {"size": n, "fields": [{name, offset, kind, count, buffer_type,
+    c_type, size, struct}]}}. Nested structs are laid out inline; pointer and
+    handle fields become 64-bit RefManager handles, so they only fit with
+    ref_handles "int". Empty unless struct_marshaling is "buffer".
+    """
+    if struct_marshaling(config) != "buffer":
+        return {}
+
+    typedef_map   = parse_result["typedef_map"]
+    struct_fields = parse_result["struct_fields"]
+    struct_set    = set(struct_fields)
+    enum_set      = set(parse_result["enums"])
+    handles_fit   = int_handles(config)
+
+    layouts = {}
+    visiting = set()
+
+    def layout(name):
+        if name in layouts:
+            return layouts[name]
+        if name in visiting or name not in struct_fields or not struct_fields[name]:
+            return None
+        visiting.add(name)
+        offset, fields = 0, []
+        for field in struct_fields[name]:
+            kind  = classify_field(field, typedef_map, struct_set, enum_set)
+            count = field.get("array_size") or 1
+            if not isinstance(count, int):
+                break  # symbolic array size: layout unknown, stays JSON
+            if "bit_width" in field:
+                break  # bitfields have no address to copy through
+            entry = {"name": field["name"], "offset": offset, "kind": kind, "count": count,
+                     "buffer_type": None, "c_type": None, "size": 0, "struct": None}
+            if kind == "struct" or (kind == "array" and field["canonical_type"] in struct_set):
+                inner = layout(field["canonical_type"])
+                if inner is None:
+                    break
+                entry.update(kind="struct", struct=field["canonical_type"], size=inner["size"])
+            elif kind in ("numeric", "array", "char_array", "ref_handle"):
+                scalar = _field_scalar(field, kind, handles_fit)
+                if scalar is None:
+                    break
+                entry["buffer_type"], entry["c_type"], entry["size"] = scalar
+                if kind == "array":
+                    entry["kind"] = "numeric"
+            else:
+                break
+            fields.append(entry)
+            offset += entry["size"] * count
+        else:
+            layouts[name] = {"size": offset, "fields": fields}
+        visiting.discard(name)
+        return layouts.get(name)
+
+    for name in struct_fields:
+        if resolve_type(name, typedef_map) == name:
+            layout(name)
+    return layouts
+
+
+def capacity_arrays(fn) -> dict[str, str]:
+    """
+    {array arg: capacity arg} for the two-call idiom
+    (xCapacityInput, xCountOutput, array): those pointers are arrays, not
+    single structs.
+    """
+    args   = fn["args"]
+    arrays = {}
+    for i, arg in enumerate(args[:-2]):
+        name = arg["name"]
+        if name.endswith("CapacityInput"):
+            stem = name[:-len("CapacityInput")]
+            if args[i + 1]["name"] == f"{stem}CountOutput":
+                arrays[args[i + 2]["name"]] = name
+    return arrays
+
+
+def array_count(arg, arrays):
+    """
+    C++ expression for the element count of an array argument: its capacity
+    arg's value, or the fixed extent of a declared array (float m[16]).
+    None for a plain pointer.
+    """
+    if arg["name"] in arrays:
+        return f"{arrays[arg['name']]}_val"
+    if arg.get("array_size") is not None:
+        return str(arg["array_size"])
+    return None
+
+
+def _scalar_pointee(arg) -> bool:
+    """True if the arg points at a plain number or enum (char counts: a byte array)."""
+    return arg["is_enum"] or scalar_type(arg) is not None
+
+
+def array_element(arg, layouts):
+    """
+    How a capacity array's elements sit in the caller's buffer: "scalar"
+    (native layout, passed straight through), "struct" (packed, converted
+    element by element) or None if they cannot be buffered.
+    """
+    if arg["base_type"] in layouts:
+        return "struct"
+    if _scalar_pointee(arg):
+        return "scalar"
+    return None
+
+
+def arg_passing(arg, known_structs, layouts, arrays=(), buffers=False, int_refs=False) -> str:
+    """
+    How a function argument crosses the boundary, so the C++ bridge, the
+    .yy signature and the GML stub agree: "big", "double", "buffer", "array",
+    "out", "handle_out", "json", "ref", "string" or "unknown".
+
+    With `buffers` (struct_marshaling "buffer"), pointer arguments travel as
+    GameMaker buffer addresses: packed structs ("buffer"), capacity and
+    fixed-size arrays ("array"), numeric out-params written in place ("out")
+    and, with integer handles, opaque-handle out-params ("handle_out").
+    """
+    base_type = arg["base_type"]
+    depth     = arg["declared_type"].count("*")
+    count     = array_count(arg, arrays)
+    if arg["is_unsupported_numeric"]:
+        return "big"
+    if arg["extension_type"] == "double":
+        return "double"
+    if buffers and arg["is_ref"] and count is not None:
+        if depth == 1 and array_element(arg, layouts):
+            return "array"
+    elif arg["is_ref"] and base_type in layouts and count in (None, "1"):
+        # a pointer known to cover several elements is never a single struct
+        if depth == 0 and not arg["has_pointer"] or depth == 1:
+            return "buffer"
+    elif buffers and arg["is_ref"] and depth == 1 and not arg["has_const"]:
+        if _scalar_pointee(arg) and "char" not in arg["canonical_type"]:
+            return "out"
+        if int_refs and arg["canonical_type"].endswith("*"):
+            return "handle_out"
+    if arg["is_ref"] and not arg["has_pointer"] and base_type in known_structs:
+        return "json"
+    if arg["is_ref"]:
+        return "ref"
+    if arg["extension_type"] == "string":
+        return "string"
+    return "unknown"
+
+
+def function_arg_passing(fn, known_structs, layouts, config) -> list[str]:
+    """arg_passing() for every argument of `fn` under `config`."""
+    arrays   = capacity_arrays(fn)
+    buffers  = struct_marshaling(config) == "buffer"
+    int_refs = int_handles(config)
+    return [
+        arg_passing(arg, known_structs, layouts, arrays, buffers, int_refs)
+        for arg in fn["args"]
+    ]
+
+
+# Batch command encoding of each arg_passing() kind: "d" f64, "s" NUL-terminated
+# text, "p" u64 buffer address ("ref" depends on the handle mode)
+BATCH_CODES = {
+    "double": "d", "big": "s", "string": "s", "json": "s",
+    "buffer": "p", "array": "p", "out": "p", "handle_out": "p",
+}
+
+
+def batch_signature(fn, passing, int_refs=False):
+    """
+    Batch signature of a bridge: its return code followed by one code per
+    argument (see BATCH_CODES), or None if an argument cannot be batched.
+    """
+    ref_code = "d" if int_refs else "s"
+    codes = []
+    for how in passing:
+        code = ref_code if how == "ref" else BATCH_CODES.get(how)
+        if code is None:
+            return None
+        codes.append(code)
+
+    ret_meta = fn["return_meta"]
+    if ret_meta["extension_type"] in ("void", "double"):
+        ret = "d"
+    elif ret_meta["is_ref"]:
+        ret = ref_code
+    else:
+        ret = "s"
+    return ret + "".join(codes)
+
+
+def batch_signatures(parse_result, config) -> list:
+    """batch_signature() of every function, in function-id order."""
+    known_structs = parse_result["struct_fields"].keys()
+    layouts       = buffer_layouts(parse_result, config)
+    int_refs      = int_handles(config)
+    return [
+        batch_signature(fn, function_arg_passing(fn, known_structs, layouts, config), int_refs)
+        for fn in parse_result["functions"]
+    ]
@@ -0,0 +1,233 @@
+# generator/output_writer.py
+import os
+import shutil
+import fnmatch
+import hashlib
+import tempfile
+from pathlib import Path
+
+# Never swept: VCS files, Visual Studio state and MSBuild intermediate/output
+# folders (deleting those would force a full rebuild every run).
+DEFAULT_PRESERVE = [".gitignore", ".vs", "x64", "Win32", "Debug", "Release", "*.user"]
+
+# mkstemp creates 0600 files; give replacements the permissions open() would
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+FILE_MODE = 0o666 & ~_UMASK
+
+
+def atomic_write_bytes(path: Path, data: bytes):
+    """Write via a temp file in the same folder, then rename over the target."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.chmod(tmp, FILE_MODE)
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.unlink(tmp)
+        raise
+
+
+def write_if_changed(path, data) -> bool:
+    """
+    Write `data` (str or bytes) to `path` only if the file's current content
+    differs. Returns True when the file was (re)written.
+    """
+    path = Path(path)
+    if isinstance(data, str):
+        # Same newline translation open(path, "w") would apply
+        if os.linesep != "\n":
+            data = data.replace("\n", os.linesep)
+        data = data.encode("utf-8")
+    try:
+        if path.stat().st_size == len(data) and path.read_bytes() == data:
+            return False
+    except OSError:
+        pass
+    atomic_write_bytes(path, data)
+    return True
+
+
+def joined(items, sep="\n"):
+    """Lazy sep.join(items): yield each item, separated, without building the result."""
+    for i, item in enumerate(items):
+        if i:
+            yield sep
+        yield item
+
+
+def split_template(template, sections):
+    """
+    Split a string.Template at the ${NAME} placeholders listed in `sections`.
+    Returns [(text, name), …] where `name` is the placeholder that follows
+    `text` (None after the last piece); each text is still a template for the
+    remaining placeholders.
+    """
+    pieces, start = [], 0
+    for m in template.pattern.finditer(template.template):
+        name = m.group("named") or m.group("braced")
+        if name in sections:
+            pieces.append((template.template[start:m.start()], name))
+            start = m.end()
+    pieces.append((template.template[start:], None))
+    return pieces
+
+
+def _file_sha256(path: Path):
+    h = hashlib.sha256()
+    try:
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                h.update(chunk)
+    except OSError:
+        return None
+    return h.digest()
+
+
+def write_stream_if_changed(path, chunks) -> bool:
+    """
+    Streaming write_if_changed(): str chunks go straight to a temp file (hashed
+    on the way), which replaces `path` only if the content differs. Peak memory
+    is one chunk, however large the file.
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    h, size = hashlib.sha256(), 0
+    try:
+        with os.fdopen(fd, "wb") as f:
+            for chunk in chunks:
+                if os.linesep != "\n":
+                    chunk = chunk.replace("\n", os.linesep)
+                data = chunk.encode("utf-8")
+                h.update(data)
+                size += len(data)
+                f.write(data)
+        try:
+            unchanged = path.stat().st_size == size and _file_sha256(path) == h.digest()
+        except OSError:
+            unchanged = False
+        if unchanged:
+            os.unlink(tmp)
+            return False
+        os.chmod(tmp, FILE_MODE)
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.unlink(tmp)
+        raise
+    return True
+
+
+def _same_file(src: Path, dest: Path) -> bool:
+    try:
+        s, d = src.stat(), dest.stat()
+    except OSError:
+        return False
+    if s.st_size != d.st_size:
+        return False
+    # copy2 preserves mtimes, so an untouched source matches without reading it
+    if s.st_mtime_ns == d.st_mtime_ns:
+        return True
+    with open(src, "rb") as a, open(dest, "rb") as b:
+        while True:
+            chunk = a.read(1 << 20)
+            if chunk != b.read(1 << 20):
+                return False
+            if not chunk:
+                return True
+
+
+class OutputWriter:
+    """
+    Write-if-changed layer over the output folder. Every generated or copied
+    file goes through write()/copy_file(); anything under the folder that was
+    not produced this run is removed by sweep(). A no-op regeneration leaves
+    every file (and its mtime) untouched.
+    """
+    def __init__(self, root, preserve=None):
+        self.root     = Path(root)
+        self.preserve = list(DEFAULT_PRESERVE if preserve is None else preserve)
+        self.produced = set()
+        self.changed  = []
+
+    def _claim(self, rel_path) -> Path:
+        rel = Path(rel_path)
+        self.produced.add(rel.as_posix())
+        return self.root / rel
+
+    def write(self, rel_path, data) -> bool:
+        dest = self._claim(rel_path)
+        if write_if_changed(dest, data):
+            self.changed.append(Path(rel_path).as_posix())
+            return True
+        return False
+
+    def write_stream(self, rel_path, chunks) -> bool:
+        """write() for an iterable of str chunks, never joined in memory."""
+        dest = self._claim(rel_path)
+        if write_stream_if_changed(dest, chunks):
+            self.changed.append(Path(rel_path).as_posix())
+            return True
+        return False
+
+    def copy_file(self, src, rel_path) -> bool:
+        src  = Path(src)
+        dest = self._claim(rel_path)
+        if _same_file(src, dest):
+            return False
+        dest.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=dest.parent, prefix=f".{dest.name}.", suffix=".tmp")
+        os.close(fd)
+        try:
+            shutil.copy2(src, tmp)
+            os.replace(tmp, dest)
+        except BaseException:
+            if os.path.exists(tmp):
+                os.unlink(tmp)
+            raise
+        self.changed.append(Path(rel_path).as_posix())
+        return True
+
+    def copy_tree(self, src_dir, rel_dir):
+        src_dir = Path(src_dir)
+        for item in sorted(src_dir.rglob("*")):
+            if item.is_file():
+                self.copy_file(item, Path(rel_dir) / item.relative_to(src_dir))
+
+    def files(self, pattern="*") -> list[Path]:
+        """Absolute paths of every file produced this run matching a glob (sorted)."""
+        return [self.root / rel for rel in sorted(self.produced) if fnmatch.fnmatch(rel, pattern)]
+
+    def _preserved(self, rel: Path) -> bool:
+        return any(fnmatch.fnmatch(part, pat) for part in rel.parts for pat in self.preserve)
+
+    def sweep(self) -> list[str]:
+        """Delete stale files (and then-empty folders) not produced this run."""
+        removed = []
+        if not self.root.exists():
+            return removed
+        for item in sorted(self.root.rglob("*"), reverse=True):
+            rel = item.relative_to(self.root)
+            if self._preserved(rel):
+                continue
+            try:
+                if item.is_dir():
+                    if not any(item.iterdir()):
+                        item.rmdir()
+                elif rel.as_posix() not in self.produced:
+                    item.unlink()
+                    removed.append(rel.as_posix())
+            except PermissionError:
+                print(f"[warning] Skipped locked item: {item}")
+        return removed
+
+    def report(self, removed=()):
+        print(
+            f"[GMBridge] Output: {len(self.changed)} written, "
+            f"{len(self.produced) - len(self.changed)} unchanged, {len(removed)} removed"
+        )
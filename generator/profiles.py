@@ -0,0 +1,37 @@
+# generator/profiles.py
+
+# Build profiles, selected with config["profile"]. Each one switches the
+# debugging aids together rather than leaving them to separate flags:
+#   "debug"    – per-call log compiled into the bridge (GMBRIDGE_LOGGING),
+#                parser/.yy debug dumps and verbose generator output
+#   "release"  – none of it
+#   "profiled" – release plus per-function call counts and latency compiled
+#                into the bridge (GMBRIDGE_STATS), read with __bridge_stats_dump
+# Without "profile", the legacy "debug" flag picks "debug" or "release".
+PROFILES = {
+    "debug":    {"log_calls": True,  "call_stats": False, "debug_dumps": True,  "verbose": True},
+    "release":  {"log_calls": False, "call_stats": False, "debug_dumps": False, "verbose": False},
+    "profiled": {"log_calls": False, "call_stats": True,  "debug_dumps": False, "verbose": False},
+}
+# A config with neither key keeps the pre-profile defaults: the bridge's
+# debug code was on unless "debug" said otherwise, but the parser only
+# dumped debug_parser.json / *_expanded.h and talked verbosely when asked to
+UNSET_PROFILE = dict(PROFILES["debug"], debug_dumps=False, verbose=False)
+
+
+def build_profile(config) -> str:
+    name = config.get("profile")
+    if name is None:
+        return "debug" if config.get("debug", True) else "release"
+    if name not in PROFILES:
+        raise ValueError(
+            f"config['profile'] must be one of {', '.join(PROFILES)}, got {name!r}"
+        )
+    return name
+
+
+def profile_option(config, option) -> bool:
+    """One setting ("log_calls", "call_stats", "debug_dumps", "verbose") of the active profile."""
+    if "profile" not in config and "debug" not in config:
+        return UNSET_PROFILE[option]
+    return PROFILES[build_profile(config)][option]
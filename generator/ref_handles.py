@@ -0,0 +1,27 @@
+# generator/ref_handles.py
+
+# How refs (opaque handles, pointers, struct instances) cross the extension
+# boundary, selected with config["ref_handles"]:
+#   "string" – "ref Type id" strings (the original RefManager)
+#   "int"    – packed 64-bit slot-map handles, passed to GML as reals
+REF_HANDLE_MODES = ("string", "int")
+
+# C type of a ref argument/return, and what a bridge returns on failure
+REF_C_TYPE    = {"string": "const char*", "int": "double"}
+REF_ERROR_RET = {"string": '""',          "int": "0.0"}
+
+# RefManager template emitted as RefManager.h for each mode
+REF_MANAGER_TEMPLATE = {"string": "RefManager.h", "int": "RefManagerSlots.h"}
+
+
+def ref_handle_mode(config) -> str:
+    mode = config.get("ref_handles", "string")
+    if mode not in REF_HANDLE_MODES:
+        raise ValueError(
+            f"config['ref_handles'] must be one of {', '.join(REF_HANDLE_MODES)}, got {mode!r}"
+        )
+    return mode
+
+
+def int_handles(config) -> bool:
+    return ref_handle_mode(config) == "int"
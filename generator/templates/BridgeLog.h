@@ -0,0 +1,76 @@
+// BridgeLog.h
+#pragma once
+#include <atomic>
+#include <chrono>
+#include <cstdint>
+#include <string>
+
+// Per-call log for the generated bridges. GMBRIDGE_LOGGING (set by the
+// generation profile, overridable with /D) compiles GMBRIDGE_LOG_CALL in or
+// out; when in, each call costs one relaxed fetch_add and two stores into a
+// fixed ring buffer: no locks, no allocation, no I/O. GML reads the most
+// recent calls back with __bridge_log_dump.
+#ifndef GMBRIDGE_LOGGING
+#define GMBRIDGE_LOGGING 0
+#endif
+
+class BridgeLog {
+public:
+    static constexpr std::size_t CAPACITY = 4096;   // power of two
+
+    static BridgeLog& instance() {
+        static BridgeLog log;
+        return log;
+    }
+
+    // `name` must outlive the log (the bridges pass string literals)
+    void record(const char* name) noexcept {
+        std::uint64_t seq = next.fetch_add(1, std::memory_order_relaxed);
+        Entry& entry = entries[seq & (CAPACITY - 1)];
+        entry.ns.store(now_ns(), std::memory_order_relaxed);
+        entry.name.store(name, std::memory_order_release);
+    }
+
+    // Oldest-first "<microseconds since start> <function>" lines for the
+    // calls still in the ring; `clear` forgets them afterwards
+    std::string dump(bool clear) {
+        std::uint64_t end   = next.load(std::memory_order_acquire);
+        std::uint64_t begin = end > CAPACITY ? end - CAPACITY : 0;
+        if (begin < cleared) begin = cleared;
+
+        std::string out;
+        for (std::uint64_t seq = begin; seq < end; ++seq) {
+            const Entry& entry = entries[seq & (CAPACITY - 1)];
+            const char* name = entry.name.load(std::memory_order_acquire);
+            if (!name) continue;
+            out += std::to_string(entry.ns.load(std::memory_order_relaxed) / 1000);
+            out += ' ';
+            out += name;
+            out += '\n';
+        }
+        if (clear) cleared = end;
+        return out;
+    }
+
+private:
+    struct Entry {
+        std::atomic<const char*>  name{nullptr};
+        std::atomic<std::int64_t> ns{0};
+    };
+
+    std::int64_t now_ns() const noexcept {
+        return std::chrono::duration_cast<std::chrono::nanoseconds>(
+            std::chrono::steady_clock::now() - started).count();
+    }
+
+    std::atomic<std::uint64_t> next{0};
+    std::uint64_t cleared = 0;
+    const std::chrono::steady_clock::time_point started = std::chrono::steady_clock::now();
+    Entry entries[CAPACITY];
+};
+
+#if GMBRIDGE_LOGGING
+#define GMBRIDGE_LOG_CALL(name) BridgeLog::instance().record(name)
+#else
+#define GMBRIDGE_LOG_CALL(name) ((void)0)
+#endif
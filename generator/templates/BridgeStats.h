@@ -0,0 +1,95 @@
+// BridgeStats.h
+#pragma once
+#include <atomic>
+#include <chrono>
+#include <cstdint>
+#include <string>
+
+// Per-function call counts and latency for the generated bridges.
+// GMBRIDGE_STATS (set by the generation profile, overridable with /D)
+// compiles GMBRIDGE_TIME_CALL in or out; when in, each bridge owns a static
+// counter and every call adds two steady_clock reads and a few relaxed atomic
+// adds: no locks, no allocation. GML reads the table with __bridge_stats_dump.
+#ifndef GMBRIDGE_STATS
+#define GMBRIDGE_STATS 0
+#endif
+
+class BridgeStats {
+public:
+    // One per bridge; links itself into the table on the bridge's first call
+    struct Counter {
+        explicit Counter(const char* name) noexcept : name(name) {
+            next = head().load(std::memory_order_relaxed);
+            while (!head().compare_exchange_weak(next, this, std::memory_order_release,
+                                                 std::memory_order_relaxed)) {}
+        }
+
+        const char*                name;
+        Counter*                   next = nullptr;
+        std::atomic<std::uint64_t> calls{0};
+        std::atomic<std::uint64_t> total_ns{0};
+        std::atomic<std::uint64_t> max_ns{0};
+    };
+
+    // Times the enclosing bridge, from declaration to return
+    class Timer {
+    public:
+        explicit Timer(Counter& counter) noexcept
+            : counter(counter), started(std::chrono::steady_clock::now()) {}
+
+        ~Timer() {
+            std::uint64_t ns = static_cast<std::uint64_t>(
+                std::chrono::duration_cast<std::chrono::nanoseconds>(
+                    std::chrono::steady_clock::now() - started).count());
+            counter.calls.fetch_add(1, std::memory_order_relaxed);
+            counter.total_ns.fetch_add(ns, std::memory_order_relaxed);
+            std::uint64_t seen = counter.max_ns.load(std::memory_order_relaxed);
+            while (ns > seen && !counter.max_ns.compare_exchange_weak(seen, ns, std::memory_order_relaxed)) {}
+        }
+
+        Timer(const Timer&) = delete;
+        Timer& operator=(const Timer&) = delete;
+
+    private:
+        Counter& counter;
+        std::chrono::steady_clock::time_point started;
+    };
+
+    // "<function> <calls> <total us> <max us>" per bridge called so far;
+    // `reset` zeroes the counters as they are read
+    static std::string dump(bool reset) {
+        std::string out;
+        for (Counter* c = head().load(std::memory_order_acquire); c; c = c->next) {
+            std::uint64_t calls = reset ? c->calls.exchange(0, std::memory_order_relaxed)
+                                        : c->calls.load(std::memory_order_relaxed);
+            std::uint64_t total = reset ? c->total_ns.exchange(0, std::memory_order_relaxed)
+                                        : c->total_ns.load(std::memory_order_relaxed);
+            std::uint64_t max   = reset ? c->max_ns.exchange(0, std::memory_order_relaxed)
+                                        : c->max_ns.load(std::memory_order_relaxed);
+            if (!calls) continue;
+            out += c->name;
+            out += ' ';
+            out += std::to_string(calls);
+            out += ' ';
+            out += std::to_string(total / 1000);
+            out += ' ';
+            out += std::to_string(max / 1000);
+            out += '\n';
+        }
+        return out;
+    }
+
+private:
+    static std::atomic<Counter*>& head() noexcept {
+        static std::atomic<Counter*> first{nullptr};
+        return first;
+    }
+};
+
+#if GMBRIDGE_STATS
+#define GMBRIDGE_TIME_CALL(name)                                  \
+    static BridgeStats::Counter bridge_stats_counter_{name};      \
+    BridgeStats::Timer bridge_stats_timer_{bridge_stats_counter_}
+#else
+#define GMBRIDGE_TIME_CALL(name) ((void)0)
+#endif
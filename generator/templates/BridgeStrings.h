@@ -0,0 +1,38 @@
+// BridgeStrings.h
+#pragma once
+#include <cstddef>
+#include <string>
+#include <string_view>
+
+// Return-string arena for the generated bridges. Every `const char*` a bridge
+// hands back to GML (refs, JSON, dumps, wide integers) is copied into the
+// next slot of a small per-thread ring, so it stays valid across the next
+// SLOTS - 1 string returns on that thread instead of dangling or being
+// clobbered by the very next one. Slots keep their capacity between calls:
+// a bridge returning the same large JSON every frame stops reallocating
+// after the first call.
+class BridgeStrings {
+public:
+    static constexpr std::size_t SLOTS = 8;                   // power of two
+    static constexpr std::size_t RETAIN_LIMIT = 1 << 20;      // bytes kept per slot
+
+    static const char* hold(std::string_view text) {
+        Ring& ring = local();
+        std::string& slot = ring.slots[ring.next++ & (SLOTS - 1)];
+        if (slot.capacity() > RETAIN_LIMIT && text.size() <= RETAIN_LIMIT)
+            std::string().swap(slot);   // drop a one-off huge buffer
+        slot.assign(text.data(), text.size());
+        return slot.c_str();
+    }
+
+private:
+    struct Ring {
+        std::string slots[SLOTS];
+        std::size_t next = 0;
+    };
+
+    static Ring& local() {
+        static thread_local Ring ring;
+        return ring;
+    }
+};
@@ -4,14 +4,63 @@
 #include <sstream>
 #include <functional>
 #include <type_traits>
+#include <mutex>
+#include <shared_mutex>
+#include <vector>
 #include <nlohmann/json.hpp>
+#include "BridgeStrings.h"
 using json = nlohmann::json;
 
+// REFMAN_THREAD_SAFE=1 ("ref_thread_safe": true) guards the registry with
+// sharded reader/writer locks so bridges and native callbacks may run on any
+// thread. Otherwise the locks compile to nothing.
+#ifndef REFMAN_THREAD_SAFE
+#define REFMAN_THREAD_SAFE 0
+#endif
+
+#if REFMAN_THREAD_SAFE
+using RefMutex = std::shared_mutex;
+#else
+struct RefMutex {
+    void lock() {}
+    void unlock() {}
+    bool try_lock() { return true; }
+    void lock_shared() {}
+    void unlock_shared() {}
+    bool try_lock_shared() { return true; }
+};
+#endif
+using RefWriteLock = std::unique_lock<RefMutex>;
+using RefReadLock  = std::shared_lock<RefMutex>;
+
+// The type a ref has when it crosses the extension boundary
+using GMRef = const char*;
+
 class RefManager {
+public:
+    using Ref = std::string;
+
+    // Independent lock shards for the per-type registry and the pointer index
+    static constexpr std::size_t SHARDS = 16;
+
 private:
-    std::unordered_map<std::string, std::unordered_map<int, void*>> registry;
-    std::unordered_map<std::string, std::unordered_map<void*, std::string>> reverse_registry;
-    std::unordered_map<std::string, int> counters;
+    struct TypeShard {
+        mutable RefMutex mutex;
+        std::unordered_map<std::string, std::unordered_map<int, void*>> registry;
+        std::unordered_map<std::string, int> counters;
+    };
+    struct PointerShard {
+        mutable RefMutex mutex;
+        std::unordered_map<void*, std::string> refs;
+    };
+
+    TypeShard type_shards[SHARDS];
+    // One global pointer → ref index (sharded by pointer), so get_ref_for_ptr()
+    // is a single lookup no matter how many types are registered
+    PointerShard reverse_registry[SHARDS];
+
+    // Registration callbacks: written rarely, read on every export/release
+    mutable RefMutex callbacks_mutex;
     std::unordered_map<std::string, std::function<void(void*)>> destroy_map;
     std::unordered_map<std::string, std::function<std::string(void*)>> json_exporter;
     std::unordered_map<std::string, std::function<void(void*, const std::string&)>> json_importer;
@@ -21,12 +70,39 @@ private:
     RefManager(const RefManager&) = delete;
     RefManager& operator=(const RefManager&) = delete;
 
+    TypeShard& shard_for(const std::string& type) {
+        return type_shards[std::hash<std::string>{}(type) % SHARDS];
+    }
+    const TypeShard& shard_for(const std::string& type) const {
+        return type_shards[std::hash<std::string>{}(type) % SHARDS];
+    }
+    PointerShard& shard_for(void* ptr) {
+        return reverse_registry[std::hash<void*>{}(ptr) % SHARDS];
+    }
+    const PointerShard& shard_for(void* ptr) const {
+        return reverse_registry[std::hash<void*>{}(ptr) % SHARDS];
+    }
+
+    // Copy a callback out under the lock, so it runs without holding it
+    template <typename Map>
+    typename Map::mapped_type callback(const Map& map, const std::string& type) const {
+        RefReadLock lock(callbacks_mutex);
+        auto it = map.find(type);
+        return it != map.end() ? it->second : typename Map::mapped_type{};
+    }
+
 public:
     static RefManager& instance() {
         static RefManager inst;
         return inst;
     }
 
+    // Hand a ref back to GML through the return-string arena
+    static GMRef to_gml(const Ref& ref) {
+        return BridgeStrings::hold(ref);
+    }
+    static const Ref& to_text(const Ref& ref) { return ref; }
+
     // Parse "ref Type id"
     static bool parse_ref(const std::string& ref,
                           std::string& out_type,
@@ -43,8 +119,8 @@ public:
         if (!parse_ref(ref, type, id)) return "{}";
         void* ptr = retrieve(ref);
         if (!ptr) return "{}";
-        if (auto it = json_exporter.find(type); it != json_exporter.end()) {
-            return it->second(ptr);
+        if (auto exporter = callback(json_exporter, type)) {
+            return exporter(ptr);
         }
         return "{}";
     }
@@ -56,8 +132,8 @@ public:
         void* ptr = retrieve(ref);
         if (!ptr) return false;
         // NEW: dispatch via importer map
-        if (auto it = json_importer.find(type); it != json_importer.end()) {
-            it->second(ptr, data);
+        if (auto importer = callback(json_importer, type)) {
+            importer(ptr, data);
             return true;
         }
         return false;
@@ -71,6 +147,7 @@ public:
         std::function<std::string(void*)> exporter = {},
         std::function<void(void*, const std::string&)> importer = {}
     ) {
+        RefWriteLock lock(callbacks_mutex);
         destroy_map[name] = std::move(deleter);
         if (exporter) json_exporter[name] = std::move(exporter);
         if (importer) json_importer[name] = std::move(importer);
@@ -78,61 +155,85 @@ public:
 
     // Store / retrieve / release
     std::string store(const std::string& type, void* ptr) {
-        int id = counters[type]++;
-        registry[type][id] = ptr;
-        std::string ref = "ref " + type + " " + std::to_string(id);
-        reverse_registry[type][ptr] = ref;
+        std::string ref;
+        {
+            TypeShard& shard = shard_for(type);
+            RefWriteLock lock(shard.mutex);
+            int id = shard.counters[type]++;
+            shard.registry[type][id] = ptr;
+            ref = "ref " + type + " " + std::to_string(id);
+        }
+        {
+            PointerShard& index = shard_for(ptr);
+            RefWriteLock lock(index.mutex);
+            index.refs[ptr] = ref;
+        }
         return ref;
     }
     void* retrieve(const std::string& ref) const {
-        std::istringstream ss(ref);
-        std::string tag, type; int id;
-        ss >> tag >> type >> id;
-        if (tag != "ref") return nullptr;
-        
-        auto rit = registry.find(type);
-        if (rit == registry.end()) return nullptr;
+        std::string type; int id;
+        if (!parse_ref(ref, type, id)) return nullptr;
+
+        const TypeShard& shard = shard_for(type);
+        RefReadLock lock(shard.mutex);
+        auto rit = shard.registry.find(type);
+        if (rit == shard.registry.end()) return nullptr;
 
         auto it = rit->second.find(id);
         return it != rit->second.end() ? it->second : nullptr;
     }
     void release(const std::string& ref) {
-        std::istringstream ss(ref);
-        std::string tag, type; int id;
-        ss >> tag >> type >> id;
-        if (tag != "ref") return;
+        std::string type; int id;
+        if (!parse_ref(ref, type, id)) return;
 
-        auto rit = registry.find(type);
-        if (rit == registry.end()) return;
+        void* ptr = nullptr;
+        {
+            TypeShard& shard = shard_for(type);
+            RefWriteLock lock(shard.mutex);
+            auto rit = shard.registry.find(type);
+            if (rit == shard.registry.end()) return;
 
-        auto it = rit->second.find(id);
-        if (it == rit->second.end()) return;
+            auto it = rit->second.find(id);
+            if (it == rit->second.end()) return;
+            ptr = it->second;
+            rit->second.erase(it);
+        }
+        {
+            // Only drop the index entry if a later store() has not claimed the pointer
+            PointerShard& index = shard_for(ptr);
+            RefWriteLock lock(index.mutex);
+            if (auto rev = index.refs.find(ptr); rev != index.refs.end()
+                && rev->second == "ref " + type + " " + std::to_string(id))
+                index.refs.erase(rev);
+        }
 
-        void* ptr = it->second;
-        auto dit = destroy_map.find(type);
-        if (dit != destroy_map.end()) {
-            dit->second(ptr);
+        // The ref is already unreachable, so no other thread can retrieve ptr now
+        if (auto deleter = callback(destroy_map, type)) {
+            deleter(ptr);
         }
-        
-        rit->second.erase(it);
-        reverse_registry[type].erase(ptr);
     }
 
 
     // Get the original ref string for a live pointer
     std::string get_ref_for_ptr(void* ptr) const {
-        for (auto& [type, map] : reverse_registry) {
-            if (auto it = map.find(ptr); it != map.end())
-                return it->second;
-        }
-        return {};
+        const PointerShard& index = shard_for(ptr);
+        RefReadLock lock(index.mutex);
+        auto it = index.refs.find(ptr);
+        return it != index.refs.end() ? it->second : std::string{};
     }
 
     // Clear everything
     void flush() {
-        registry.clear();
-        reverse_registry.clear();
-        counters.clear();
+        std::vector<RefWriteLock> locks;
+        for (auto& shard : type_shards) locks.emplace_back(shard.mutex);
+        for (auto& index : reverse_registry) locks.emplace_back(index.mutex);
+        locks.emplace_back(callbacks_mutex);
+
+        for (auto& shard : type_shards) {
+            shard.registry.clear();
+            shard.counters.clear();
+        }
+        for (auto& index : reverse_registry) index.refs.clear();
         destroy_map.clear();
         json_exporter.clear();
         json_importer.clear();
@@ -0,0 +1,341 @@
+#pragma once
+#include <atomic>
+#include <cstdint>
+#include <unordered_map>
+#include <vector>
+#include <string>
+#include <functional>
+#include <type_traits>
+#include <mutex>
+#include <shared_mutex>
+#include <nlohmann/json.hpp>
+using json = nlohmann::json;
+
+// Integer-handle RefManager ("ref_handles": "int").
+//
+// A handle packs [type:10][generation:19][slot:24] into the low 53 bits of a
+// uint64, so it survives the round trip through a GML real (double) exactly.
+// Handle 0 is never issued and always means "no object".
+//
+// Slots live in fixed-size chunks that never move, and each slot publishes
+// the handle it currently holds atomically, so retrieve() takes no lock: it
+// is an index plus two atomic loads. Released slots are recycled with a
+// bumped generation, so stale handles resolve to nullptr instead of to
+// whatever reuses the slot.
+//
+// REFMAN_THREAD_SAFE=1 ("ref_thread_safe": true) makes store/release and
+// type registration take real locks; otherwise they compile to nothing.
+// Either way, deleting an object another thread is still using remains the
+// caller's problem.
+#ifndef REFMAN_THREAD_SAFE
+#define REFMAN_THREAD_SAFE 0
+#endif
+
+#if REFMAN_THREAD_SAFE
+using RefMutex = std::shared_mutex;
+#else
+struct RefMutex {
+    void lock() {}
+    void unlock() {}
+    bool try_lock() { return true; }
+    void lock_shared() {}
+    void unlock_shared() {}
+    bool try_lock_shared() { return true; }
+};
+#endif
+using RefWriteLock = std::unique_lock<RefMutex>;
+using RefReadLock  = std::shared_lock<RefMutex>;
+
+// The type a handle has when it crosses the extension boundary
+using GMRef = double;
+
+class RefManager {
+public:
+    using Ref = std::uint64_t;
+
+    static constexpr int SLOT_BITS       = 24;
+    static constexpr int GENERATION_BITS = 19;
+    static constexpr int TYPE_BITS       = 10;
+
+    // Independent lock shards for the pointer → handle index
+    static constexpr std::size_t SHARDS = 16;
+
+private:
+    static constexpr std::uint64_t SLOT_MASK       = (1ull << SLOT_BITS) - 1;
+    static constexpr std::uint64_t GENERATION_MASK = (1ull << GENERATION_BITS) - 1;
+    static constexpr std::uint64_t TYPE_MASK       = (1ull << TYPE_BITS) - 1;
+
+    static constexpr int         CHUNK_BITS = 12;
+    static constexpr std::size_t CHUNK_SIZE = std::size_t(1) << CHUNK_BITS;
+    static constexpr std::size_t MAX_CHUNKS = (SLOT_MASK + 1) >> CHUNK_BITS;
+
+    struct Slot {
+        std::atomic<Ref>   live{0};         // handle stored here, 0 while free
+        std::atomic<void*> ptr{nullptr};
+        std::uint32_t      generation = 1;  // guarded by slots_mutex
+    };
+
+    // Slot storage: chunks are allocated on demand and never moved or freed
+    // while the manager lives, so readers can index them without a lock
+    std::atomic<Slot*>         chunks[MAX_CHUNKS] = {};
+    RefMutex                   slots_mutex;
+    std::uint32_t              slot_count = 0;
+    std::vector<std::uint32_t> free_slots;
+
+    // Per-type data, indexed by the type field of a handle
+    mutable RefMutex types_mutex;
+    std::unordered_map<std::string, std::uint32_t> type_ids;
+    std::vector<std::string> type_names;
+    std::vector<std::function<void(void*)>> destroy_map;
+    std::vector<std::function<std::string(void*)>> json_exporter;
+    std::vector<std::function<void(void*, const std::string&)>> json_importer;
+
+    struct PointerShard {
+        mutable RefMutex mutex;
+        std::unordered_map<void*, Ref> refs;
+    };
+    PointerShard reverse_registry[SHARDS];
+
+    RefManager() = default;
+    ~RefManager() {
+        for (auto& chunk : chunks) delete[] chunk.load(std::memory_order_relaxed);
+    }
+    RefManager(const RefManager&) = delete;
+    RefManager& operator=(const RefManager&) = delete;
+
+    static Ref pack(std::uint32_t type, std::uint32_t generation, std::uint32_t slot) {
+        return (Ref(type) << (GENERATION_BITS + SLOT_BITS))
+             | (Ref(generation) << SLOT_BITS)
+             | Ref(slot);
+    }
+    static std::uint32_t type_of(Ref ref) {
+        return static_cast<std::uint32_t>((ref >> (GENERATION_BITS + SLOT_BITS)) & TYPE_MASK);
+    }
+
+    Slot* slot_at(std::uint64_t index) const {
+        if (index > SLOT_MASK) return nullptr;
+        Slot* chunk = chunks[index >> CHUNK_BITS].load(std::memory_order_acquire);
+        return chunk ? &chunk[index & (CHUNK_SIZE - 1)] : nullptr;
+    }
+
+    PointerShard& shard_for(void* ptr) {
+        return reverse_registry[std::hash<void*>{}(ptr) % SHARDS];
+    }
+    const PointerShard& shard_for(void* ptr) const {
+        return reverse_registry[std::hash<void*>{}(ptr) % SHARDS];
+    }
+
+    std::uint32_t type_id(const std::string& name) {
+        {
+            RefReadLock lock(types_mutex);
+            if (auto it = type_ids.find(name); it != type_ids.end())
+                return it->second;
+        }
+        RefWriteLock lock(types_mutex);
+        if (auto it = type_ids.find(name); it != type_ids.end())
+            return it->second;
+        // Type 0 is reserved so that a null handle never decodes to a live type
+        if (type_names.empty()) {
+            type_names.emplace_back();
+            destroy_map.emplace_back();
+            json_exporter.emplace_back();
+            json_importer.emplace_back();
+        }
+        auto id = static_cast<std::uint32_t>(type_names.size());
+        if (id > TYPE_MASK) return 0;
+        type_ids.emplace(name, id);
+        type_names.push_back(name);
+        destroy_map.emplace_back();
+        json_exporter.emplace_back();
+        json_importer.emplace_back();
+        return id;
+    }
+
+    // Copy a callback out under the lock, so it runs without holding it
+    template <typename Table>
+    typename Table::value_type callback(const Table& table, Ref ref) const {
+        RefReadLock lock(types_mutex);
+        std::uint32_t type = type_of(ref);
+        return type < table.size() ? table[type] : typename Table::value_type{};
+    }
+
+public:
+    static RefManager& instance() {
+        static RefManager inst;
+        return inst;
+    }
+
+    // GML reals carry handles exactly (53-bit mantissa)
+    static GMRef to_gml(Ref ref) { return static_cast<GMRef>(ref); }
+    static Ref from_gml(GMRef ref) { return ref > 0 ? static_cast<Ref>(ref) : 0; }
+    static std::string to_text(Ref ref) { return std::to_string(ref); }
+
+    // Bridge entry for JSON serialization
+    std::string to_string(Ref ref) const {
+        void* ptr = retrieve(ref);
+        if (!ptr) return "{}";
+        if (auto exporter = callback(json_exporter, ref)) return exporter(ptr);
+        return "{}";
+    }
+    std::string to_string(GMRef ref) const { return to_string(from_gml(ref)); }
+
+    // Bridge entry for JSON deserialization
+    bool from_string(Ref ref, const std::string& data) const {
+        void* ptr = retrieve(ref);
+        if (!ptr) return false;
+        if (auto importer = callback(json_importer, ref)) {
+            importer(ptr, data);
+            return true;
+        }
+        return false;
+    }
+    bool from_string(GMRef ref, const std::string& data) const { return from_string(from_gml(ref), data); }
+
+
+    // Type registration for destruction
+    void register_type_custom(
+        const std::string& name,
+        std::function<void(void*)> deleter,
+        std::function<std::string(void*)> exporter = {},
+        std::function<void(void*, const std::string&)> importer = {}
+    ) {
+        std::uint32_t id = type_id(name);
+        if (!id) return;
+        RefWriteLock lock(types_mutex);
+        destroy_map[id] = std::move(deleter);
+        if (exporter) json_exporter[id] = std::move(exporter);
+        if (importer) json_importer[id] = std::move(importer);
+    }
+
+    // Store / retrieve / release
+    Ref store(const std::string& type, void* ptr) {
+        std::uint32_t id = type_id(type);
+        if (!id || !ptr) return 0;
+
+        Ref ref;
+        {
+            RefWriteLock lock(slots_mutex);
+            std::uint32_t index;
+            if (!free_slots.empty()) {
+                index = free_slots.back();
+                free_slots.pop_back();
+            } else {
+                if (slot_count > SLOT_MASK) return 0;
+                index = slot_count++;
+                auto& chunk = chunks[index >> CHUNK_BITS];
+                if (!chunk.load(std::memory_order_relaxed))
+                    chunk.store(new Slot[CHUNK_SIZE], std::memory_order_release);
+            }
+
+            Slot& slot = *slot_at(index);
+            ref = pack(id, slot.generation, index);
+            slot.ptr.store(ptr, std::memory_order_relaxed);
+            slot.live.store(ref, std::memory_order_release);   // publishes ptr
+        }
+        {
+            PointerShard& index = shard_for(ptr);
+            RefWriteLock lock(index.mutex);
+            index.refs[ptr] = ref;
+        }
+        return ref;
+    }
+    void* retrieve(Ref ref) const {
+        if (!ref) return nullptr;
+        const Slot* slot = slot_at(ref & SLOT_MASK);
+        if (!slot || slot->live.load(std::memory_order_acquire) != ref) return nullptr;
+        void* ptr = slot->ptr.load(std::memory_order_acquire);
+        // Re-check: the slot may have been released and reused in between
+        return slot->live.load(std::memory_order_acquire) == ref ? ptr : nullptr;
+    }
+    void* retrieve(GMRef ref) const { return retrieve(from_gml(ref)); }
+    void release(Ref ref) {
+        if (!ref) return;
+        Slot* slot = slot_at(ref & SLOT_MASK);
+        Ref expected = ref;
+        // Exactly one caller wins the handle; everyone else sees it as stale
+        if (!slot || !slot->live.compare_exchange_strong(expected, 0, std::memory_order_acq_rel))
+            return;
+        void* ptr = slot->ptr.load(std::memory_order_relaxed);
+
+        {
+            PointerShard& index = shard_for(ptr);
+            RefWriteLock lock(index.mutex);
+            if (auto it = index.refs.find(ptr); it != index.refs.end() && it->second == ref)
+                index.refs.erase(it);
+        }
+        if (auto deleter = callback(destroy_map, ref)) {
+            deleter(ptr);
+        }
+
+        RefWriteLock lock(slots_mutex);
+        slot->generation = (slot->generation + 1) & GENERATION_MASK;
+        if (!slot->generation) slot->generation = 1;
+        free_slots.push_back(static_cast<std::uint32_t>(ref & SLOT_MASK));
+    }
+    void release(GMRef ref) { release(from_gml(ref)); }
+
+
+    // Get the live handle for a stored pointer (0 if none)
+    Ref get_ref_for_ptr(void* ptr) const {
+        const PointerShard& index = shard_for(ptr);
+        RefReadLock lock(index.mutex);
+        auto it = index.refs.find(ptr);
+        return it != index.refs.end() ? it->second : 0;
+    }
+
+    // Clear everything. Chunks stay allocated (lock-free readers may still be
+    // looking at them); every slot is freed and its generation bumped, so
+    // handles issued before the flush never alias new objects.
+    void flush() {
+        RefWriteLock slots_lock(slots_mutex);
+        RefWriteLock types_lock(types_mutex);
+        std::vector<RefWriteLock> locks;
+        for (auto& index : reverse_registry) locks.emplace_back(index.mutex);
+
+        // Whoever moves a slot from live to 0 owns returning it to free_slots,
+        // so a release() racing with the flush never frees a slot twice
+        for (std::uint32_t i = slot_count; i-- > 0;) {
+            Slot& slot = *slot_at(i);
+            if (slot.live.exchange(0, std::memory_order_acq_rel)) {
+                slot.generation = (slot.generation + 1) & GENERATION_MASK;
+                if (!slot.generation) slot.generation = 1;
+                free_slots.push_back(i);
+            }
+        }
+        type_ids.clear();
+        type_names.clear();
+        destroy_map.clear();
+        json_exporter.clear();
+        json_importer.clear();
+        for (auto& index : reverse_registry) index.refs.clear();
+    }
+};
+
+
+// === RefManager Macros ===
+// For any TYPE that has global to_json/from_json and uses `new` allocation
+#define REFMAN_REGISTER_TYPE(NAME, ...)                                    \
+static bool _refman_registered_##NAME = []{                                 \
+    auto& managerInstance = RefManager::instance();                         \
+    managerInstance.register_type_custom(                                   \
+        std::string(#NAME),                                                 \
+        [](void* pointer){ delete static_cast<__VA_ARGS__*>(pointer); },    \
+        [](void* pointer){                                                  \
+            return json(*static_cast<__VA_ARGS__*>(pointer)).dump();       \
+        },                                                                  \
+        [](void* pointer, const std::string& str){                          \
+            json::parse(str).get_to(*static_cast<__VA_ARGS__*>(pointer));  \
+        }                                                                   \
+    );                                                                      \
+    return true;                                                            \
+}();
+
+// If you need a custom deleter/export/import
+#define REFMAN_REGISTER_TYPE_CUSTOM(NAME, ...)                             \
+static bool _refman_registered_##NAME = []{                                 \
+    auto& managerInstance = RefManager::instance();                         \
+    managerInstance.register_type_custom(                                   \
+        std::string(#NAME), __VA_ARGS__                                     \
+    );                                                                      \
+    return true;                                                            \
+}();
@@ -0,0 +1,103 @@
+// Auto-generated GMBridge batch dispatcher
+//
+// __bridge_batch runs many bridge calls in one DLL crossing. The command
+// buffer holds, per call, a u32 function id followed by its arguments in
+// order: f64 for numbers and integer handles, NUL-terminated text for
+// strings/JSON/string refs, u64 for buffer addresses. Each call appends its
+// return value to the result buffer the same way (f64 or NUL-terminated
+// text). The return value is the number of calls executed when every
+// command ran. Dispatch stops early at the first malformed command or once
+// a result does not fit. It then returns -(calls executed + 1), and when
+// the results filled up, the last call executed has no result.
+#include <cstdint>
+#include <cstring>
+
+namespace {
+
+struct BatchReader {
+    const char* at;
+    const char* end;
+    bool ok = true;
+
+    double f64() {
+        double v = 0.0;
+        if (end - at < static_cast<std::ptrdiff_t>(sizeof v)) { ok = false; return v; }
+        std::memcpy(&v, at, sizeof v);
+        at += sizeof v;
+        return v;
+    }
+    const char* str() {
+        const char* nul = ok ? static_cast<const char*>(std::memchr(at, '\0', end - at)) : nullptr;
+        if (!nul) { ok = false; return ""; }
+        const char* s = at;
+        at = nul + 1;
+        return s;
+    }
+    char* ptr() {
+        std::uint64_t v = 0;
+        if (end - at < static_cast<std::ptrdiff_t>(sizeof v)) { ok = false; return nullptr; }
+        std::memcpy(&v, at, sizeof v);
+        at += sizeof v;
+        return reinterpret_cast<char*>(static_cast<std::uintptr_t>(v));
+    }
+    std::uint32_t id() {
+        std::uint32_t v = 0;
+        if (end - at < static_cast<std::ptrdiff_t>(sizeof v)) { ok = false; return v; }
+        std::memcpy(&v, at, sizeof v);
+        at += sizeof v;
+        return v;
+    }
+};
+
+struct BatchWriter {
+    char* at;
+    char* end;
+    bool ok = true;
+
+    void f64(double v) {
+        if (end - at < static_cast<std::ptrdiff_t>(sizeof v)) { ok = false; return; }
+        std::memcpy(at, &v, sizeof v);
+        at += sizeof v;
+    }
+    void str(const char* s) {
+        std::size_t n = std::strlen(s) + 1;
+        if (static_cast<std::size_t>(end - at) < n) { ok = false; return; }
+        std::memcpy(at, s, n);
+        at += n;
+    }
+};
+
+using BatchThunk = void (*)(BatchReader&, BatchWriter&);
+
+} // namespace
+
+// Bridges dispatched by the batch (defined in the bridge sources)
+${BATCH_PROTOTYPES}
+
+namespace {
+
+${BATCH_THUNKS}
+
+// Jump table indexed by function id (nullptr: not batchable)
+const BatchThunk batch_table[] = {
+${BATCH_TABLE}
+};
+
+} // namespace
+
+extern "C" double __bridge_batch(char* commands, double command_bytes, char* results, double result_bytes) {
+    BatchReader in{commands, commands + static_cast<std::size_t>(command_bytes)};
+    BatchWriter out{results, results + static_cast<std::size_t>(result_bytes)};
+    double executed = 0.0;
+    while (in.at < in.end) {
+        std::uint32_t id = in.id();
+        if (!in.ok || id >= sizeof(batch_table) / sizeof(batch_table[0]) || !batch_table[id]) {
+            return -(executed + 1.0);
+        }
+        batch_table[id](in, out);
+        if (!in.ok) return -(executed + 1.0);   // truncated arguments: the bridge did not run
+        executed += 1.0;
+        if (!out.ok) return -(executed + 1.0);  // it ran, but its result did not fit
+    }
+    return executed;
+}
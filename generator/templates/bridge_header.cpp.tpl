@@ -1,8 +1,29 @@
 // Auto-generated GMBridge.cpp
+// Per-call logging (BridgeLog.h): on in the "debug" build profile, override with /DGMBRIDGE_LOGGING=0|1
+#ifndef GMBRIDGE_LOGGING
+#define GMBRIDGE_LOGGING ${LOGGING}
+#endif
+// Call counts and latency (BridgeStats.h): on in the "profiled" build profile, override with /DGMBRIDGE_STATS=0|1
+#ifndef GMBRIDGE_STATS
+#define GMBRIDGE_STATS ${STATS}
+#endif
+// Struct layout checks (config "layout_asserts"): the parsed layouts follow the MSVC x64 ABI
+#ifndef GMBRIDGE_LAYOUT_CHECKS
+#if defined(_WIN64)
+#define GMBRIDGE_LAYOUT_CHECKS 1
+#else
+#define GMBRIDGE_LAYOUT_CHECKS 0
+#endif
+#endif
 #include <iostream>
 #include <limits>
 #include "RefManager.h"
+#include "BridgeLog.h"
+#include "BridgeStats.h"
+#include "BridgeStrings.h"
+#include <cstddef>
 #include <cstdlib>
+#include <cstring>
 #include <string>
 #include <string_view>
 #include <vector>
@@ -17,29 +38,26 @@
 using json = nlohmann::json;
 ${INCLUDE_HEADER}
 
-// Shared buffer for JSON/ref returns
-static thread_local std::string _tmp_str;
+// Packed struct fields (struct_marshaling "buffer"): unaligned, native byte order
+template <typename W, typename T>
+inline void __buffer_put(char* at, T value) { W w = static_cast<W>(value); std::memcpy(at, &w, sizeof(W)); }
+template <typename W>
+inline W __buffer_get(const char* at) { W w; std::memcpy(&w, at, sizeof(W)); return w; }
 
 // Cache Manager functions...
-extern "C" const char* __cpp_to_json(const char* ref_cstr) {
-    std::string ref(ref_cstr);
-
+extern "C" const char* __cpp_to_json(GMRef ref) {
     // 1) Lookup the raw pointer from the GML ref
     void* ptr = RefManager::instance().retrieve(ref);
     if (!ptr) {
-        std::string _tmp_str = "{}";
-        return _tmp_str.c_str();
+        return BridgeStrings::hold("{}");
     }
 
     // 2) Delegate to RefManager’s converter (which does json(obj).dump())
-    std::string _tmp_str = RefManager::instance().to_string(ref);
-
-    // 3) Return the JSON text back to GML
-    return _tmp_str.c_str();
+    //    and return the JSON text back to GML through the arena
+    return BridgeStrings::hold(RefManager::instance().to_string(ref));
 }
 
-extern "C" double __cpp_from_json(const char* ref_cstr, const char* json_cstr) {
-    std::string ref(ref_cstr);
+extern "C" double __cpp_from_json(GMRef ref, const char* json_cstr) {
     std::string js(json_cstr);
 
     // Delegate to RefManager’s converter registry:
@@ -49,7 +67,7 @@ extern "C" double __cpp_from_json(const char* ref_cstr, const char* json_cstr) {
     return ok ? 1.0 : 0.0;
 }
 
-extern "C" double __ref_destroy(const char* ref) {
+extern "C" double __ref_destroy(GMRef ref) {
     RefManager::instance().release(ref);
     return 1.0;
 }
@@ -59,62 +77,67 @@ extern "C" double __ref_manager_flush() {
     return 1.0;
 }
 
+// Recent calls from the call log, oldest first; empty unless built with GMBRIDGE_LOGGING
+extern "C" const char* __bridge_log_dump(double clear) {
+    return BridgeStrings::hold(BridgeLog::instance().dump(clear != 0.0));
+}
+
+// Per-bridge "<function> <calls> <total us> <max us>" lines; empty unless built with GMBRIDGE_STATS
+extern "C" const char* __bridge_stats_dump(double reset) {
+    return BridgeStrings::hold(BridgeStats::dump(reset != 0.0));
+}
+
 
 #pragma region CreateFunctions
 
 // === String ===
 using GMString = std::string;
-extern "C" const char* __cpp_create_string() {
+extern "C" GMRef __cpp_create_string() {
     REFMAN_REGISTER_TYPE(string, GMString);
     
     auto* stringPtr = new GMString;
-    std::string _tmp_str = RefManager::instance().store("string", stringPtr);
-    return _tmp_str.c_str();
+    return RefManager::to_gml(RefManager::instance().store("string", stringPtr));
 }
 
 // === String View ===
 using GMStringView = std::string_view;
-extern "C" const char* __cpp_create_string_view() {
+extern "C" GMRef __cpp_create_string_view() {
     REFMAN_REGISTER_TYPE(string_view, GMStringView);
     
     auto* stringViewPtr = new GMStringView{};
-    std::string _tmp_str = RefManager::instance().store("string_view", stringViewPtr);
-    return _tmp_str.c_str();
+    return RefManager::to_gml(RefManager::instance().store("string_view", stringViewPtr));
 }
 
 // === Vector<double> ===
 using GMVectorOfDouble = std::vector<double>;
-extern "C" const char* __cpp_create_vector() {
+extern "C" GMRef __cpp_create_vector() {
     REFMAN_REGISTER_TYPE(vector, GMVectorOfDouble);
     
     auto* vecPtr = new GMVectorOfDouble{};
-    std::string _tmp_str = RefManager::instance().store("vector", vecPtr);
-    return _tmp_str.c_str();
+    return RefManager::to_gml(RefManager::instance().store("vector", vecPtr));
 }
 
 // === Map<string,double> ===
 using GMMapOfStringDouble = std::unordered_map<std::string, double>;
-extern "C" const char* __cpp_create_map() {
+extern "C" GMRef __cpp_create_map() {
     REFMAN_REGISTER_TYPE(map, GMMapOfStringDouble);
 
     auto* mapPtr = new GMMapOfStringDouble{};
-    std::string _tmp_str = RefManager::instance().store("map", mapPtr);
-    return _tmp_str.c_str();
+    return RefManager::to_gml(RefManager::instance().store("map", mapPtr));
 }
 
 // === Set<string> ===
 using GMSetOfString = std::unordered_set<std::string>;
-extern "C" const char* __cpp_create_set() {
+extern "C" GMRef __cpp_create_set() {
     REFMAN_REGISTER_TYPE(set, GMSetOfString);
 
     auto* setPtr = new GMSetOfString{};
-    std::string _tmp_str = RefManager::instance().store("set", setPtr);
-    return _tmp_str.c_str();
+    return RefManager::to_gml(RefManager::instance().store("set", setPtr));
 }
 
 // === Queue<double> ===
 using GMQueueOfDouble = std::queue<double>;
-extern "C" const char* __cpp_create_queue() {
+extern "C" GMRef __cpp_create_queue() {
     REFMAN_REGISTER_TYPE_CUSTOM(
         queue,
         // deleter
@@ -145,13 +168,12 @@ extern "C" const char* __cpp_create_queue() {
     );
     
     auto* queuePtr = new GMQueueOfDouble{};
-    std::string _tmp_str = RefManager::instance().store("queue", queuePtr);
-    return _tmp_str.c_str();
+    return RefManager::to_gml(RefManager::instance().store("queue", queuePtr));
 }
 
 // === Stack<double> ===
 using GMStackOfDouble = std::stack<double>;
-extern "C" const char* __cpp_create_stack() {
+extern "C" GMRef __cpp_create_stack() {
     REFMAN_REGISTER_TYPE_CUSTOM(
         stack,
         /* deleter */ [](void* p) { delete static_cast<GMStackOfDouble*>(p); },
@@ -173,13 +195,12 @@ extern "C" const char* __cpp_create_stack() {
     
 
     auto* stackPtr = new GMStackOfDouble{};
-    std::string _tmp_str = RefManager::instance().store("stack", stackPtr);
-    return _tmp_str.c_str();
+    return RefManager::to_gml(RefManager::instance().store("stack", stackPtr));
 }
 
 // === Buffer (uint8_t*) ===
 using GMBufferPtr = uint8_t*;
-extern "C" const char* __cpp_create_buffer() {
+extern "C" GMRef __cpp_create_buffer() {
     REFMAN_REGISTER_TYPE_CUSTOM(
         buffer,
         /* deleter */ [](void* p) {
@@ -193,30 +214,28 @@ extern "C" const char* __cpp_create_buffer() {
     );
 
     auto* buffPtr = new GMBufferPtr{};
-    std::string _tmp_str = RefManager::instance().store("buffer", buffPtr);
-    return _tmp_str.c_str();
+    return RefManager::to_gml(RefManager::instance().store("buffer", buffPtr));
 }
 
 // === Raw Ref (void*) ===
-extern "C" const char* __cpp_create_ref() {
+extern "C" GMRef __cpp_create_ref() {
     REFMAN_REGISTER_TYPE_CUSTOM(
         ref,
         /*deleter*/    [](void* p) { delete static_cast<void**>(p); },
         /*exporter*/   [](void* p) {
             // get the already‐registered GML ref for the inner pointer
-            return RefManager::instance().get_ref_for_ptr(*static_cast<void**>(p));
+            return RefManager::to_text(RefManager::instance().get_ref_for_ptr(*static_cast<void**>(p)));
         },
         /*importer*/   nullptr
     );
 
     auto* refPtr = new void* {};
-    std::string _tmp_str = RefManager::instance().store("ref", refPtr);
-    return _tmp_str.c_str();
+    return RefManager::to_gml(RefManager::instance().store("ref", refPtr));
 }
 
 // === Shared<T> ===
 using GMSharedVoid = std::shared_ptr<void>;
-extern "C" const char* __cpp_create_shared() {
+extern "C" GMRef __cpp_create_shared() {
     REFMAN_REGISTER_TYPE_CUSTOM(
         shared,
         /* deleter: delete the holder itself */
@@ -228,20 +247,19 @@ extern "C" const char* __cpp_create_shared() {
             // get the shared_ptr<void>*
             auto sp = static_cast<GMSharedVoid*>(p);
             void* held = sp->get();  // NOT *sp!
-            return RefManager::instance().get_ref_for_ptr(held);
+            return RefManager::to_text(RefManager::instance().get_ref_for_ptr(held));
         },
         /* importer: not needed here */
         nullptr
     );
 
     auto* sharedPtr = new GMSharedVoid{};
-    std::string _tmp_str = RefManager::instance().store("shared", sharedPtr);
-    return _tmp_str.c_str();
+    return RefManager::to_gml(RefManager::instance().store("shared", sharedPtr));
 }
 
 // === Optional<double> ===
 using GMOptionalOfDouble = std::optional<double>;
-extern "C" const char* __cpp_create_optional() {
+extern "C" GMRef __cpp_create_optional() {
     REFMAN_REGISTER_TYPE_CUSTOM(
         optional,
         /*deleter=*/[](void* p) { delete static_cast<GMOptionalOfDouble*>(p); },
@@ -262,13 +280,12 @@ extern "C" const char* __cpp_create_optional() {
     );
 
     auto* optnPtr = new GMOptionalOfDouble{};
-    std::string _tmp_str = RefManager::instance().store("optional", optnPtr);
-    return _tmp_str.c_str();
+    return RefManager::to_gml(RefManager::instance().store("optional", optnPtr));
 }
 
 // === Variant<int,double,string> ===
 using GMVariantIntDoubleStr = std::variant<int, double, std::string>;
-extern "C" const char* __cpp_create_variant() {
+extern "C" GMRef __cpp_create_variant() {
     REFMAN_REGISTER_TYPE_CUSTOM(
         variant,
 
@@ -304,18 +321,16 @@ extern "C" const char* __cpp_create_variant() {
     );
 
     auto* variantPtr = new GMVariantIntDoubleStr{};
-    std::string _tmp_str = RefManager::instance().store("variant", variantPtr);
-    return _tmp_str.c_str();
+    return RefManager::to_gml(RefManager::instance().store("variant", variantPtr));
 }
 
 // === Pair<double,double> ===
 using GMPairDoubleDouble = std::pair<double, double>;
-extern "C" const char* __cpp_create_pair() {
+extern "C" GMRef __cpp_create_pair() {
     REFMAN_REGISTER_TYPE(pair, GMPairDoubleDouble);
 
     auto* pairPtr = new GMPairDoubleDouble{};
-    std::string _tmp_str = RefManager::instance().store("pair", pairPtr);
-    return _tmp_str.c_str();
+    return RefManager::to_gml(RefManager::instance().store("pair", pairPtr));
 }
 
 #pragma endregion
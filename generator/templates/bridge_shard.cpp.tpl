@@ -0,0 +1,10 @@
+// Auto-generated GMBridge shard ${SHARD_INDEX} of ${SHARD_COUNT}
+#include "${SHARED_HEADER}"
+
+#pragma region StructConstructors
+${STRUCT_CONSTRUCTORS}
+#pragma endregion
+
+#pragma region FunctionsBridges
+${FUNCTION_BRIDGES}
+#pragma endregion
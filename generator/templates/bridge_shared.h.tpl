@@ -0,0 +1,42 @@
+// Auto-generated shared header for the sharded GMBridge sources
+#pragma once
+// Per-call logging (BridgeLog.h): on in the "debug" build profile, override with /DGMBRIDGE_LOGGING=0|1
+#ifndef GMBRIDGE_LOGGING
+#define GMBRIDGE_LOGGING ${LOGGING}
+#endif
+// Call counts and latency (BridgeStats.h): on in the "profiled" build profile, override with /DGMBRIDGE_STATS=0|1
+#ifndef GMBRIDGE_STATS
+#define GMBRIDGE_STATS ${STATS}
+#endif
+// Struct layout checks (config "layout_asserts"): the parsed layouts follow the MSVC x64 ABI
+#ifndef GMBRIDGE_LAYOUT_CHECKS
+#if defined(_WIN64)
+#define GMBRIDGE_LAYOUT_CHECKS 1
+#else
+#define GMBRIDGE_LAYOUT_CHECKS 0
+#endif
+#endif
+#include <iostream>
+#include <limits>
+#include "RefManager.h"
+#include "BridgeLog.h"
+#include "BridgeStats.h"
+#include "BridgeStrings.h"
+#include <cstddef>
+#include <cstdlib>
+#include <cstring>
+#include <algorithm>
+#include <string>
+#include <vector>
+#include <nlohmann/json.hpp>
+using json = nlohmann::json;
+${INCLUDE_HEADER}
+
+// Packed struct fields (struct_marshaling "buffer"): unaligned, native byte order
+template <typename W, typename T>
+inline void __buffer_put(char* at, T value) { W w = static_cast<W>(value); std::memcpy(at, &w, sizeof(W)); }
+template <typename W>
+inline W __buffer_get(const char* at) { W w; std::memcpy(&w, at, sizeof(W)); return w; }
+
+// JSON overloads and buffer accessors are defined once, in whichever shard owns the struct
+${JSON_DECLARATIONS}
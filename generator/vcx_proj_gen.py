@@ -1,24 +1,28 @@
 import os
 import json
-import shutil
-import uuid
 from pathlib import Path
 from string import Template
 
+from generator.guids import stable_guid
+
 # Load templates…
 TEMPLATES_DIR    = Path(__file__).parent / "templates"
 VCXPROJ_TEMPLATE = Template((TEMPLATES_DIR / "vcxproj.tpl").read_text(encoding="utf-8"))
 SLN_TEMPLATE     = Template((TEMPLATES_DIR / "sln.tpl").read_text(encoding="utf-8"))
 
-def generate_vs_project(config):
+def generate_vs_project(config, writer):
+    """
+    Lay out src/ (input tree, bundled deps, libraries) and write the .vcxproj
+    and .sln. Everything goes through `writer`, so unchanged files are left
+    alone; the generated bridge sources must already have been written to
+    src/ through the same writer.
+    """
     output_folder = Path(config["output_folder"])
-    src_dir       = output_folder / "src"
-    include_dir   = src_dir / "include"
 
     # derive everything from a single project_name
     project_name  = config["project_name"]
     dll_name      = f"{project_name}.dll"
-    project_guid  = str(uuid.uuid4()).upper()
+    project_guid  = stable_guid(project_name, "vcxproj")
 
     library_dirs  = config.get("library_dirs", [])
     libraries     = config.get("libraries", [])
@@ -40,63 +44,42 @@ def generate_vs_project(config):
     input_root = Path("input").resolve()
     if not input_root.exists():
         raise RuntimeError(f"Input folder not found: {input_root}")
-    src_dir.mkdir(parents=True, exist_ok=True)
-    for item in input_root.iterdir():
-        dest = src_dir / item.name
-        if item.is_dir():
-            shutil.copytree(item, dest, dirs_exist_ok=True)
-        else:
-            shutil.copy2(item, dest)
+    writer.copy_tree(input_root, "src")
     
     # --- 3) Copy internal bridge deps as before ---
     internal_deps_src = Path(__file__).parent / "dependencies" / "include"
     if internal_deps_src.exists():
-        for item in internal_deps_src.rglob("*"):
-            if item.is_file():
-                rel_path  = item.relative_to(internal_deps_src)
-                dest_path = include_dir / rel_path
-                dest_path.parent.mkdir(parents=True, exist_ok=True)
-                shutil.copy2(item, dest_path)
-
-    # --- 4) Move generated bridge + RefManager files to src/ ---
-    bridge_cpp = output_folder / f"{config["project_name"]}.cpp"
-    if bridge_cpp.exists():
-        src_dir.mkdir(parents=True, exist_ok=True)
-        shutil.move(str(bridge_cpp), str(src_dir / bridge_cpp.name))
-
-    for fname in ("RefManager.cpp", "RefManager.h"):
-        fpath = output_folder / fname
-        if fpath.exists():
-            shutil.move(str(fpath), str(src_dir / fname))
+        writer.copy_tree(internal_deps_src, "src/include")
+
+    # --- 4) Generated bridge + RefManager files are written straight to src/ ---
 
     # --- 5) Write config.json for your own record ---
-    (output_folder / "config.json").write_text(json.dumps(config, indent=2))
+    writer.write("config.json", json.dumps(config, indent=2))
 
     # --- 6) Copy each .lib into src/lib and prepare linker paths ---
-    lib_dest = src_dir / "lib"
-    lib_dest.mkdir(parents=True, exist_ok=True)
-
-    # Copy the actual .lib files into src/lib
-    lib_dest = src_dir / "lib"
-    lib_dest.mkdir(parents=True, exist_ok=True)
     for lib_dir in library_dirs:
         for lib_name in libraries:
             src_lib = Path(lib_dir) / lib_name
             if not src_lib.exists():
                 raise RuntimeError(f"Library not found: {src_lib}")
-            shutil.copy2(src_lib, lib_dest / lib_name)
+            writer.copy_file(src_lib, f"src/lib/{Path(lib_name).name}")
 
-    # Gather .cpp / .h for the vcxproj
-    cpp_files = list(src_dir.rglob("*.cpp"))
-    h_files   = list(include_dir.rglob("*.h"))
+    # Gather .cpp / .h for the vcxproj from what this run produced
+    src_dir     = writer.root / "src"
+    include_dir = src_dir / "include"
+    # (every bridge shard, plus the generated headers directly in src/;
+    # fnmatch's "*" crosses "/", so src/include headers are filtered out here)
+    cpp_files = writer.files("src/*.cpp")
+    h_files   = [f for f in writer.files("src/*.h") if f.parent == src_dir]
+    inc_files = writer.files("src/include/*.h")
 
     cpp_tags = "\n    ".join(
         f'<ClCompile Include="{f.relative_to(src_dir)}" />'
         for f in cpp_files
     )
     h_tags = "\n    ".join(
-        f'<ClInclude Include="include\\{f.relative_to(include_dir)}" />'
-        for f in h_files
+        [f'<ClInclude Include="{f.relative_to(src_dir)}" />' for f in h_files] +
+        [f'<ClInclude Include="include\\{f.relative_to(include_dir)}" />' for f in inc_files]
     )
 
     # Now point the linker at our local lib folder and list only .lib names
@@ -113,13 +96,13 @@ def generate_vs_project(config):
         "LIBRARY_DIRS":              lib_dirs_tag,
         "LIBRARIES":                 libs_tag,
     })
-    (src_dir / f"{project_name}.vcxproj").write_text(vcxproj_content)
+    writer.write(f"src/{project_name}.vcxproj", vcxproj_content)
 
     # --- 8) Fill & write .sln ---
     sln_content = SLN_TEMPLATE.substitute({
         "PROJECT_NAME": project_name,
         "PROJECT_GUID": project_guid
     })
-    (output_folder / f"{project_name}.sln").write_text(sln_content)
+    writer.write(f"{project_name}.sln", sln_content)
 
     return f"VS project created under: {output_folder}"
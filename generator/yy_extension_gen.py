@@ -2,7 +2,135 @@
 
 import re
 import json
-import uuid
+import time
+from pathlib import Path
+
+from generator.guids import stable_guid
+from generator.marshaling import BUFFER_ARGS, buffer_layouts, function_arg_passing
+from generator.output_writer import write_if_changed
+from generator.profiles import profile_option
+from generator.ref_handles import int_handles
+
+def function_entry(name, arg_types, return_code, project_name):
+    """One GMExtensionFunction entry (arg/return codes: 1=string, 2=double)."""
+    return {
+        "$GMExtensionFunction": "",
+        "%Name":                name,
+        "argCount":             len(arg_types),
+        "args":                 arg_types,
+        "documentation":        "",
+        "externalName":         name,
+        "help":                 "",
+        "hidden":               False,
+        "kind":                 1,
+        "name":                 name,
+        "resourceType":         "GMExtensionFunction",
+        "resourceVersion":      "2.0",
+        "returnType":           return_code,
+        "id":                   stable_guid(project_name, "function", name)
+    }
+
+
+# How the .yy is written, selected with config["yy_format"]:
+#   "indented" – json.dumps(indent=4) of the whole extension (the original)
+#   "compact"  – minified, one function entry per line; the function list is
+#                serialized once and spliced into both places it appears
+YY_FORMATS = ("indented", "compact")
+
+# Function-entry fields the generator owns; everything else (documentation,
+# help, hidden, id…) is left as the user or GameMaker last saved it when
+# config["yy_patch"] updates an existing .yy
+GENERATED_FUNCTION_FIELDS = (
+    "$GMExtensionFunction", "%Name", "argCount", "args", "externalName",
+    "kind", "name", "resourceType", "resourceVersion", "returnType",
+)
+
+# Stands in for the function list while the rest of the extension is dumped
+FUNCTIONS_PLACEHOLDER = "@GMBRIDGE_FUNCTIONS@"
+TRAILING_COMMA_RE     = re.compile(r",(\s*[}\]])")
+
+
+def yy_format(config) -> str:
+    fmt = config.get("yy_format", "indented")
+    if fmt not in YY_FORMATS:
+        raise ValueError(
+            f"config['yy_format'] must be one of {', '.join(YY_FORMATS)}, got {fmt!r}"
+        )
+    return fmt
+
+
+def load_yy(path: Path):
+    """An existing .yy as a dict (GameMaker writes trailing commas), or None if absent."""
+    if not path.is_file():
+        return None
+    text = path.read_text(encoding="utf-8")
+    try:
+        return json.loads(text)
+    except json.JSONDecodeError:
+        return json.loads(TRAILING_COMMA_RE.sub(r"\1", text))
+
+
+def patch_functions(existing_entries, generated_entries):
+    """
+    Merge freshly generated function entries into an existing list: entries
+    are matched by name, only GENERATED_FUNCTION_FIELDS are overwritten and
+    functions the API no longer has are dropped. Returns (entries, counts).
+    """
+    by_name = {entry.get("name"): entry for entry in existing_entries}
+    counts  = {"added": 0, "changed": 0, "unchanged": 0, "removed": 0}
+    merged  = []
+    for entry in generated_entries:
+        old = by_name.pop(entry["name"], None)
+        if old is None:
+            counts["added"] += 1
+            merged.append(entry)
+            continue
+        if all(old.get(key) == entry[key] for key in GENERATED_FUNCTION_FIELDS):
+            counts["unchanged"] += 1
+        else:
+            counts["changed"] += 1
+            old.update((key, entry[key]) for key in GENERATED_FUNCTION_FIELDS)
+        merged.append(old)
+    counts["removed"] = len(by_name)
+    return merged, counts
+
+
+def patch_extension(existing, extension):
+    """
+    Apply `extension`'s generated parts (function list, init function) to the
+    existing .yy dict, keeping every other field the user or GameMaker set.
+    Returns (extension, counts); the function list stays shared between the
+    file entry and the top-level "functions" key.
+    """
+    file_entry = extension["files"][0]
+    old_files  = existing.get("files") or []
+    old_file   = next((f for f in old_files if f.get("filename") == file_entry["filename"]), None)
+    if old_file is None:
+        old_file = file_entry
+        existing["files"] = old_files + [file_entry]
+
+    functions, counts = patch_functions(old_file.get("functions", []), file_entry["functions"])
+    old_file["functions"] = functions
+    old_file["init"]      = file_entry["init"]
+    if "functions" in existing:
+        existing["functions"] = functions
+    return existing, counts
+
+
+def dump_yy(extension, fmt) -> str:
+    if fmt == "indented":
+        return json.dumps(extension, indent=4)
+
+    # Compact: dump the function list once, then splice it into the minified
+    # skeleton wherever the shared list appeared
+    functions = extension["files"][0]["functions"]
+    listing   = "[\n" + ",\n".join(json.dumps(entry, separators=(",", ":")) for entry in functions) + "\n]"
+    skeleton  = dict(extension, files=[dict(extension["files"][0], functions=FUNCTIONS_PLACEHOLDER)]
+                     + extension["files"][1:])
+    if extension.get("functions") is functions:
+        skeleton["functions"] = FUNCTIONS_PLACEHOLDER
+    return json.dumps(skeleton, separators=(",", ":")).replace(f'"{FUNCTIONS_PLACEHOLDER}"', listing)
+
 
 def generate_yy_extension(parse_result, config):
     """
@@ -12,11 +140,14 @@ def generate_yy_extension(parse_result, config):
     typedef_map   = parse_result["typedef_map"]
     known_structs = parse_result["struct_fields"].keys()
     enum_names    = set(parse_result["enums"].keys())
+    layouts       = buffer_layouts(parse_result, config)
 
     project_name  = config.get("project_name", "ProjectName")
     init_name     = config.get("init_function", "YYExtensionInitialise")
     cleanup_name  = config.get("cleanup_function", "YYExtensionCleanup")
     dll_name = f"{project_name}.dll"
+    # Integer handles travel as GML reals
+    ref_code = 2 if int_handles(config) else 1
 
     func_entries = []
     count_success = count_warning = count_failure = 0
@@ -27,21 +158,25 @@ def generate_yy_extension(parse_result, config):
         valid          = True
 
         # === Process arguments ===
-        for arg in fn["args"]:
+        passings = function_arg_passing(fn, known_structs, layouts, config)
+        for arg, passing in zip(fn["args"], passings):
             ext_type    = arg["extension_type"]       # "string" or "double"
-            is_big_arg  = arg.get("is_unsupported_numeric", False)
             valid       = True
 
             # Big numerics always come in as strings now
-            if is_big_arg:
+            if passing == "big":
                 type_code = 1
 
-            # Standard strings
-            elif ext_type == "string":
+            # Refs: "ref Type id" strings or integer handles
+            elif passing == "ref":
+                type_code = ref_code
+
+            # Standard strings, JSON structs and buffer addresses
+            elif passing in ("string", "json") or passing in BUFFER_ARGS:
                 type_code = 1
 
             # Standard numerics (float, double, int32, bool, enums)
-            elif ext_type == "double":
+            elif passing == "double":
                 type_code = 2
 
             else:
@@ -69,7 +204,9 @@ def generate_yy_extension(parse_result, config):
         canon_rt   = ret_meta["canonical_type"]
 
         # Map to GML return codes: 1=string, 2=double
-        if ext_type == "string":
+        if ret_meta.get("is_ref", False) and ext_type == "string":
+            return_code = ref_code
+        elif ext_type == "string":
             return_code = 1
         elif ext_type == "double" or canon_rt == "void":
             return_code = 2
@@ -82,22 +219,7 @@ def generate_yy_extension(parse_result, config):
             continue
         
         # === Build the function entry ===
-        func_entries.append({
-            "$GMExtensionFunction": "",
-            "%Name":                fn["name"],
-            "argCount":             len(arg_types),
-            "args":                 arg_types,
-            "documentation":        "",
-            "externalName":         fn["name"],
-            "help":                 "",
-            "hidden":               False,
-            "kind":                 1,
-            "name":                 fn["name"],
-            "resourceType":         "GMExtensionFunction",
-            "resourceVersion":      "2.0",
-            "returnType":           return_code,
-            "id":                   str(uuid.uuid4()).upper()
-        })
+        func_entries.append(function_entry(fn["name"], arg_types, return_code, project_name))
 
         # update counters
         if local_warnings:
@@ -105,6 +227,21 @@ def generate_yy_extension(parse_result, config):
         else:
             count_success += 1
 
+    # === Batch dispatcher (bridge_batch) ===
+    if config.get("bridge_batch", False):
+        # __bridge_batch(commands ptr, command bytes, results ptr, result bytes) → calls run (negative: stopped early)
+        func_entries.append(function_entry("__bridge_batch", [1, 2, 1, 2], 2, project_name))
+
+    # === Call log (debug profile) ===
+    if profile_option(config, "log_calls"):
+        # __bridge_log_dump(clear) → "<microseconds> <function>" lines
+        func_entries.append(function_entry("__bridge_log_dump", [2], 1, project_name))
+
+    # === Call counters (profiled profile) ===
+    if profile_option(config, "call_stats"):
+        # __bridge_stats_dump(reset) → "<function> <calls> <total us> <max us>" lines
+        func_entries.append(function_entry("__bridge_stats_dump", [2], 1, project_name))
+
     # === File entry ===
     file_entry = {
         "$GMExtensionFile":   "",
@@ -122,7 +259,7 @@ def generate_yy_extension(parse_result, config):
         "resourceVersion":    "2.0",
         "uncompress":         False,
         "usesRunnerInterface":False,
-        "id":                  str(uuid.uuid4()).upper()
+        "id":                  stable_guid(project_name, "file", dll_name)
     }
 
     # === Extension entry ===
@@ -138,23 +275,40 @@ def generate_yy_extension(parse_result, config):
         "resourceType":      "GMExtension",
         "resourceVersion":   "2.0",
         "files":             [file_entry],
-        "id":                str(uuid.uuid4()).upper()
+        "id":                stable_guid(project_name, "extension")
     }
 
+    # === Patch the existing .yy (yy_patch) and serialize ===
+    started = time.perf_counter()
+    if config.get("yy_patch", False):
+        yy_path  = Path(config["output_folder"]) / f"{project_name}.yy"
+        existing = load_yy(yy_path)
+        if existing is not None:
+            extension, counts = patch_extension(existing, extension)
+            print(
+                f"[GMBridge] Patched {yy_path}: {counts['added']} added, {counts['changed']} changed, "
+                f"{counts['removed']} removed, {counts['unchanged']} unchanged"
+            )
+    text = dump_yy(extension, yy_format(config))
+    print(
+        f"[GMBridge] .yy: {len(func_entries)} functions, {len(text) // 1024} KB "
+        f"in {time.perf_counter() - started:.3f}s"
+    )
+
     # === Summary ===
     print("\nSummary:")
     print(f"  success: {count_success}")
     print(f"  warnings: {count_warning}")
     print(f"  failure: {count_failure}")
 
-    # === Debug dump of what we resolved ===
-    debug_dump = {
-        "functions": parse_result["functions"],
-        "typedef_map": typedef_map,
-        "known_structs":   list(known_structs),
-        "enums":           parse_result["enums"]
-    }
-    with open("debug_yy.json", "w", encoding="utf-8") as dbg:
-        json.dump(debug_dump, dbg, indent=4)
+    # === Debug dump of what we resolved (debug profile) ===
+    if profile_option(config, "debug_dumps"):
+        debug_dump = {
+            "functions": parse_result["functions"],
+            "typedef_map": typedef_map,
+            "known_structs":   list(known_structs),
+            "enums":           parse_result["enums"]
+        }
+        write_if_changed("debug_yy.json", json.dumps(debug_dump, indent=4))
 
-    return json.dumps(extension, indent=4)
+    return text
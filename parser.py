@@ -2,47 +2,29 @@ import os
 import re
 import sys
 import json
+import time
 import shutil
+import tempfile
 import subprocess
 from pathlib import Path
-
-# ——— Module-scope regexes ———
-LINE_CONTINUATION_RE = re.compile(r'\\\r?\n\s*')
-# We no longer need MACRO_DEF_RE or manual expand_macros once we invoke cpp.
-FUNC_PTR_RE = re.compile(r'''
-    typedef
-    \s+ (?P<ret>.*?)           # return type
-    \(\s* (?:[^(]*?) \* \s*     # skip qualifiers then "*"
-    (?P<alias>\w+)\)\s*        # alias name
-    \((?P<args>[^)]*)\)\s*;     # parameter list
-''', re.VERBOSE | re.DOTALL)
-ENUM_RE = re.compile(r'typedef\s+enum\s+(\w+)?\s*{([^}]+)}\s*(\w+)?\s*;', re.DOTALL)
-CONST_RE = re.compile(
-    r'^#define\s+([A-Za-z_]\w*)\s+("(?:[^"\\]|\\.)*"|-?\d+|0x[0-9A-Fa-f]+)\s*$',
-    re.MULTILINE
-)
-TYPEDEF_RE = re.compile(r'typedef\s+([^\s]+(?:\s+\w+)*)\s+(\w+)\s*;')
-USING_RE   = re.compile(r'using\s+(\w+)\s*=\s*([^;]+);')
-HANDLE_RE = re.compile(r'typedef\s+struct\s+(\w+)_T\s*\*\s*(\w+);')
-STRUCT_RE  = re.compile(
-    r'\btypedef\s+struct\b'
-    r'(?:\s+[A-Za-z_]\w*)*'
-    r'\s*\{(?P<body>(?:[^{}]|\{[^{}]*\})*)\}'
-    r'\s*(?P<name>[A-Za-z_]\w*)\s*;',
-    re.DOTALL
+from functools import lru_cache
+from concurrent.futures import ProcessPoolExecutor
+
+from cache import (
+    preprocess_key, load_preprocessed, store_preprocessed,
+    dependency_flags, parse_make_deps, parse_show_includes,
+    parse_cache_key, load_parse_result, store_parse_result,
+    symbols_key, load_symbols, store_symbols
 )
+from const_eval import ConstantEvaluator
+from decl_scanner import scan_declarations
+from struct_layout import compute_layouts
+from generator.output_writer import write_if_changed
+from generator.profiles import profile_option
+from symbol_reader import read_exported_symbols, UnsupportedLibrary, SYMBOL_READER_VERSION
 
-# Generic function-declaration regex (drops XRAPI specifics)
-FUNC_RE = re.compile(
-    r'^\s*'                            # start of line, maybe whitespace
-    r'(?P<ret>[A-Za-z_]\w*(?:\s+[\w\*\:<>]+)*)'  # return type (no newlines!)
-    r'\s+'                             # at least one space
-    r'(?P<name>[A-Za-z_]\w*)'          # function name
-    r'\s*\('                           # opening paren
-    r'(?P<args>[^)]*)'                 # argument list (no parentheses inside)
-    r'\)\s*;'                          # closing paren + semicolon
-    , re.MULTILINE
-)
+# `dumpbin /EXPORTS` lists one indented symbol name per line
+EXPORT_LINE_RE = re.compile(r'^\s+([A-Za-z_]\w+)$')
 
 def flatten_parse_data(all_results: dict) -> dict:
     """
@@ -50,26 +32,33 @@ def flatten_parse_data(all_results: dict) -> dict:
     all_results is expected to have the shape:
         { "files": { filename1: parse_result1, filename2: parse_result2, … } }
     Returns a dict with keys:
-        "functions", "typedef_map", "struct_fields",
+        "functions", "typedef_map", "struct_fields", "union_fields",
         "function_ptr_aliases", "enums", "constants", "using_map"
     """
     unified = {
         "functions":            [],
         "typedef_map":          {},
         "struct_fields":        {},
+        "union_fields":         {},
         "function_ptr_aliases": [],
         "enums":                {},
         "constants":            {},
         "using_map":            {}
     }
 
+    seen_functions = set()
     for file_res in all_results.get("files", {}).values():
-        # 1) append all functions
-        unified["functions"].extend(file_res.get("functions", []))
+        # 1) append all functions (headers that include each other re-declare
+        #    the same prototypes; the first declaration wins)
+        for fn in file_res.get("functions", []):
+            if fn["name"] not in seen_functions:
+                seen_functions.add(fn["name"])
+                unified["functions"].append(fn)
 
         # 2) merge all maps (later files win on name collisions)
         unified["typedef_map"].update(file_res.get("typedef_map", {}))
         unified["struct_fields"].update(file_res.get("struct_fields", {}))
+        unified["union_fields"].update(file_res.get("union_fields", {}))
         unified["enums"].update(file_res.get("enums", {}))
         unified["constants"].update(file_res.get("constants", {}))
         unified["using_map"].update(file_res.get("using_map", {}))
@@ -104,102 +93,584 @@ def get_enum_prefix_suffix_cleanup(enum_keys):
             suffix = f"_{sfx}"
     return prefix, suffix
 
-def classify_c_type(parse_result, c_type, config):
+# Integer widths GML doubles cannot round-trip
+BIG_INTS = {"int64_t","uint64_t","size_t","uintptr_t"}
+EXTERN_RE = re.compile(r'\bextern\b\s*', re.IGNORECASE)
+
+# ——— Struct members ———
+# One plain member: base type, declarator (absent for an unnamed padding
+# bitfield), array extents and bitfield width
+MEMBER_RE = re.compile(r'''
+    (?P<type>.+?)
+    (?:\s+(?P<name>\**\w+))?
+    (?P<dims>(?:\s*\[[^\]]*\])*)
+    (?:\s*:\s*(?P<bits>[^:]+?))?
+    \s*$
+''', re.VERBOSE | re.DOTALL)
+DIM_RE = re.compile(r'\[([^\]]*)\]')
+MEMBER_BREAK_RE = re.compile(r'[{};]')
+# A nested struct/union member, named ("} inner[2]") or anonymous ("}")
+AGGREGATE_MEMBER_RE = re.compile(
+    r'\s*(?P<kind>struct|union)\b[^{]*\{(?P<body>.*)\}(?P<declarators>[^{}]*)$', re.DOTALL
+)
+# Words that end a type rather than name a member ("unsigned int : 4")
+C_TYPE_WORDS = {"char", "short", "int", "long", "signed", "unsigned", "float", "double", "_Bool", "bool"}
+
+
+def split_members(body: str) -> list[str]:
+    """Member declarations of a struct/union body, split at top-level ";"."""
+    members, depth, start = [], 0, 0
+    for m in MEMBER_BREAK_RE.finditer(body):
+        ch = m.group()
+        if ch == "{":
+            depth += 1
+        elif ch == "}":
+            depth -= 1
+        elif depth == 0:
+            if body[start:m.start()].strip():
+                members.append(body[start:m.start()].strip())
+            start = m.end()
+    return members
+
+class TypeIndex:
     """
-    Given a raw C type (possibly via typedef/using), classify it:
-    - is_ref: opaque handle
-    - is_unsupported_numeric: big integer round-trip
-    - is_standard_numeric: float/int32/bool
-    - extension_type: "string" or "double"
+    Everything classify_c_type needs, built once per parse instead of per call:
+    the known-name sets, a fully resolved typedef/using closure and an LRU of
+    the struct-independent part of each declared type string.
+
+    The struct set is live: structs are registered as the struct stage parses
+    them, so a field only sees structs declared before it (as it always has).
     """
-    typedef_map      = parse_result["typedef_map"]
-    using_map        = parse_result["using_map"]
-    known_structs    = set(parse_result["struct_fields"].keys())
-    function_ptrs    = set(parse_result["function_ptr_aliases"])
-    enum_names       = set(parse_result["enums"].keys())
+    def __init__(self, parse_result, cache_size=4096):
+        self.typedef_map   = parse_result["typedef_map"]
+        self.using_map     = parse_result["using_map"]
+        self.known_structs = set(parse_result["struct_fields"].keys())
+        self.function_ptrs = set(parse_result["function_ptr_aliases"])
+        self.enum_names    = set(parse_result["enums"].keys())
+        self.resolved      = {
+            name: self._chase(name)
+            for name in (*self.using_map, *self.typedef_map)
+        }
+        self._shape   = lru_cache(maxsize=cache_size)(self._compute_shape)
+        self._records = {}
 
-    def resolve_full(name):
+    def _chase(self, name):
         seen = set()
         t = name
         # chase using and typedef chains
         while True:
-            if t in using_map and t not in seen:
+            if t in self.using_map and t not in seen:
                 seen.add(t)
-                t = using_map[t]
+                t = self.using_map[t]
                 continue
-            if t in typedef_map and t not in seen:
+            if t in self.typedef_map and t not in seen:
                 seen.add(t)
-                t = typedef_map[t]
+                t = self.typedef_map[t]
                 continue
             break
         return t
 
-    cleaned = re.sub(r'\bextern\b\s*', '', c_type, flags=re.IGNORECASE)
-
-    original = cleaned.strip()
-    outer    = resolve_full(original)
-    # peel const & pointers
-    has_const   = outer.startswith("const ")
-    has_ptr     = outer.endswith("*")
-    no_const    = re.sub(r'^const\s+', '', outer).rstrip('*').strip()
-    canonical   = resolve_full(no_const).strip()
-
-    rec = {
-        "declared_type": original,
-        "base_type":     no_const,
-        "canonical_type": canonical,
-        "has_const":     has_const,
-        "has_pointer":   has_ptr,
-        "is_enum":       no_const in enum_names,
-        "is_struct":     no_const in known_structs,
-        "is_function_ptr": outer in function_ptrs,
-        "is_standard_numeric": False,
-        "is_unsupported_numeric": False,
-        "is_ref": False,
-        "extension_type": ""
-    }
-
-    # 1) Pointers
-    if has_ptr or rec["is_struct"] or rec["is_function_ptr"]:
-        rec["is_ref"] = True
-        rec["extension_type"] = "string"
-        return rec
-    
-    # 2) Any alias of a big integer *where the alias name differs* → handle
-    big_ints = {"int64_t","uint64_t","size_t","uintptr_t"}
-    if canonical in big_ints and original != canonical:
-        rec["is_ref"] = True
-        rec["extension_type"] = "string"
-        return rec
-
-    # 3) Raw big integers → strings
-    if canonical in big_ints:
-        rec["is_unsupported_numeric"] = True
-        rec["extension_type"] = "string"
-        return rec
+    def resolve(self, name):
+        return self.resolved.get(name, name)
+
+    def add_struct(self, name):
+        self.known_structs.add(name)
+
+    def _compute_shape(self, c_type):
+        cleaned = EXTERN_RE.sub('', c_type)
+
+        original = cleaned.strip()
+        outer    = self.resolve(original)
+        # peel const & pointers
+        has_const   = outer.startswith("const ")
+        has_ptr     = outer.endswith("*")
+        no_const    = re.sub(r'^const\s+', '', outer).rstrip('*').strip()
+        canonical   = self.resolve(no_const).strip()
+        return original, outer, has_const, has_ptr, no_const, canonical
+
+    def classify(self, c_type):
+        """Return a fresh classification record (callers are free to mutate it)."""
+        shape = self._shape(c_type)
+        key   = (c_type, shape[4] in self.known_structs)
+        rec   = self._records.get(key)
+        if rec is None:
+            rec = self._records[key] = self._build_record(*shape)
+        return dict(rec)
+
+    def _build_record(self, original, outer, has_const, has_ptr, no_const, canonical):
+        rec = {
+            "declared_type": original,
+            "base_type":     no_const,
+            "canonical_type": canonical,
+            "has_const":     has_const,
+            "has_pointer":   has_ptr,
+            "is_enum":       no_const in self.enum_names,
+            "is_struct":     no_const in self.known_structs,
+            "is_function_ptr": outer in self.function_ptrs,
+            "is_standard_numeric": False,
+            "is_unsupported_numeric": False,
+            "is_ref": False,
+            "extension_type": ""
+        }
 
-    # 4) Enums → double
-    if rec["is_enum"]:
+        # 1) Pointers
+        if has_ptr or rec["is_struct"] or rec["is_function_ptr"]:
+            rec["is_ref"] = True
+            rec["extension_type"] = "string"
+            return rec
+        
+        # 2) Any alias of a big integer *where the alias name differs* → handle
+        if canonical in BIG_INTS and original != canonical:
+            rec["is_ref"] = True
+            rec["extension_type"] = "string"
+            return rec
+
+        # 3) Raw big integers → strings
+        if canonical in BIG_INTS:
+            rec["is_unsupported_numeric"] = True
+            rec["extension_type"] = "string"
+            return rec
+
+        # 4) Enums → double
+        if rec["is_enum"]:
+            rec["is_standard_numeric"] = True
+            rec["extension_type"] = "double"
+            return rec
+
+        # 0) Void‐returning functions → no bridge return value
+        if canonical == "void":
+            rec["extension_type"] = "void"
+            return rec
+        
+        # 5) Everything else numeric → double
         rec["is_standard_numeric"] = True
         rec["extension_type"] = "double"
         return rec
 
-    # 0) Void‐returning functions → no bridge return value
-    if canonical == "void":
-        rec["extension_type"] = "void"
-        return rec
+def classify_c_type(parse_result, c_type, config, type_index=None):
+    """
+    Given a raw C type (possibly via typedef/using), classify it:
+    - is_ref: opaque handle
+    - is_unsupported_numeric: big integer round-trip
+    - is_standard_numeric: float/int32/bool
+    - extension_type: "string" or "double"
+    Pass a TypeIndex when classifying many types against the same parse_result.
+    """
+    if type_index is None:
+        type_index = TypeIndex(parse_result)
+    return type_index.classify(c_type)
+
+def run_preprocessor(full_cmd, tool_path, include_files, config):
+    """
+    Run the preprocessor and return its stdout. Output is cached on disk, keyed
+    by the command line and every header the preprocessor reported opening, so
+    an unchanged header set skips the subprocess entirely.
+    """
+    key = preprocess_key(full_cmd, tool_path)
+    cached = load_preprocessed(config, key)
+    if cached is not None:
+        print(f"[GMBridge] Preprocessor cache hit ({key[:12]})")
+        return cached
+
+    print(f"[GMBridge] Running preprocessor: {full_cmd!r}")
+    dep_fd, dep_file = tempfile.mkstemp(suffix=".d")
+    os.close(dep_fd)
+    try:
+        try:
+            proc = subprocess.run(
+                full_cmd + dependency_flags(full_cmd, dep_file),
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+                check=True,
+                encoding="utf-8"
+            )
+        except subprocess.CalledProcessError as err:
+            print(f"[GMBridge] Preprocessor failed (exit {err.returncode}). stderr:\n{err.stderr}")
+            raise
+
+        with open(dep_file, "r", encoding="utf-8", errors="replace") as f:
+            deps = parse_make_deps(f.read())
+    finally:
+        os.unlink(dep_file)
+
+    deps += parse_show_includes(proc.stderr)
+    # The inputs themselves are always dependencies, even if the tool omitted them
+    store_preprocessed(config, key, proc.stdout, include_files + deps)
+    return proc.stdout
+
+def parse_preprocessed(content, config):
+    """
+    Parse one header's preprocessed text into a per-file parse_result.
+    Returns (parse_result, content); the content is what the debug dump writes out.
+    """
+    namespace = config.get("namespace", "")
+
+    # 2) One pass over the text sorts every declaration by kind
+    records = scan_declarations(content)
+
+    parse_result = {
+        "functions":            [],
+        "enums":                {},
+        "constants":            {},
+        "typedef_map":          {},
+        "using_map":            {},
+        "struct_fields":        {},
+        "union_fields":         {},
+        "function_ptr_aliases": []
+    }
+
+    # 3) Function-pointer typedefs
+    ptr_aliases = {m.group("alias") for m in records["function_ptr"]}
+    parse_result["function_ptr_aliases"] = sorted(ptr_aliases)
+
+    # 4) Constants (first, so enumerators may refer to them)
+    for name, val in (m.groups() for m in records["constant"]):
+        parse_result["constants"][name] = (val if val.startswith('"') else int(val,0))
+
+    # 5) Enums: initializers are folded as C constant expressions, so they
+    #    can use earlier enumerators, constants, shifts, casts and suffixes
+    typedefs  = {alias: full.strip() for full, alias in (m.groups() for m in records["typedef"])}
+    evaluator = ConstantEvaluator(parse_result["constants"], typedefs)
+    for m in records["enum"]:
+        raw, body, alias = m.group(1), m.group(2), m.group(3)
+        name = alias or raw or "unnamed_enum"
+        entries, val = {}, 0
+        for line in body.split(','):
+            line = line.strip()
+            if not line: continue
+            if '=' in line:
+                k,v = map(str.strip, line.split('=',1))
+                val = evaluator.evaluate(v)
+                if val is None:
+                    print(f"[GMBridge] Warning: cannot evaluate enumerator {k} = {v}; using 0")
+                    val = 0
+            else:
+                k = line
+            entries[k] = val; evaluator.define(k, val); val += 1
+
+        # strip prefixes/suffixes
+        short = name[len(namespace):] if name.lower().startswith(namespace.lower()) else name
+        pre, suf = get_enum_prefix_suffix_cleanup(entries.keys())
+        cleaned = {}
+        for k,v in entries.items():
+            ck = (k[len(pre):] if pre and k.startswith(pre) else k)
+            if suf and ck.endswith(suf): ck = ck[:-len(suf)]
+            cleaned[ck] = v
+        cleaned["_meta"] = {"namespace":namespace,"short_name":short,"base_prefix":pre,"base_suffix":suf}
+        parse_result["enums"][name] = cleaned
+
+    # 6) Typedefs & usings & struct‐handle typedefs
+    for full, alias in (m.groups() for m in records["typedef"]):
+        parse_result["typedef_map"][alias] = full.strip()
+    for alias, target in (m.groups() for m in records["using"]):
+        parse_result["using_map"][alias] = target.strip()
+    for struct_name, alias in (m.groups() for m in records["handle"]):
+        # e.g. struct_name="XrSpace", alias="XrSpace"
+        parse_result["typedef_map"][alias] = f"struct {struct_name}_T *"
+        
+    # Types are fully known from here on (apart from the structs themselves)
+    type_index = TypeIndex(parse_result)
+
+    # 7) Structs and unions. Members are split at top-level ";", so nested
+    #    structs/unions (named or anonymous) keep their own member lists;
+    #    array extents and bitfield widths are folded like enumerators
+    union_names = set()
+
+    def array_dims(text):
+        dims = []
+        for extent in DIM_RE.findall(text):
+            value = evaluator.evaluate(extent) if extent.strip() else None
+            dims.append(extent.strip() if value is None else value)
+        return dims
+
+    def parse_members(body):
+        fields = []
+        for member in split_members(body):
+            am = AGGREGATE_MEMBER_RE.match(member)
+            if am:
+                kind    = am.group("kind")
+                members = parse_members(am.group("body"))
+                for declarator in am.group("declarators").split(","):
+                    fields.append({
+                        "name":       re.match(r'\s*\**(\w*)', declarator).group(1),
+                        "type":       kind,
+                        "aggregate":  kind,
+                        "members":    members,
+                        "array_dims": array_dims(declarator),
+                    })
+                continue
+
+            # — Handle comma-separated declarations (e.g. "unsigned short _Byte, _State")
+            parts = [p.strip() for p in member.split(',')]
+            first = MEMBER_RE.match(parts[0])
+            if not first:
+                continue
+            # the first part has the full "type name"; the rest reuse its type
+            decls = [parts[0]] + [f"{first.group('type').strip()} {extra}" for extra in parts[1:]]
+
+            # now parse each small declaration separately
+            for decl in decls:
+                fm = MEMBER_RE.match(decl)
+                if not fm:
+                    continue
+                raw_base, nm, bits = fm.group("type").strip(), fm.group("name"), fm.group("bits")
+                if nm in C_TYPE_WORDS and bits is not None:
+                    raw_base, nm = f"{raw_base} {nm}", None
+                if nm is None and bits is None:
+                    continue
+                clean_base = re.sub(r'\b[A-Z_][A-Z0-9_]*\b', '', raw_base).replace('  ', ' ').strip()
+
+                field = {"name": nm or "", "type": clean_base}
+                extents = DIM_RE.findall(fm.group("dims"))
+                if extents:
+                    sz = extents[0].strip()
+                    try:
+                        field["array_size"] = int(sz)
+                    except ValueError:
+                        field["array_size"] = sz
+                    field["array_dims"] = array_dims(fm.group("dims"))
+                if bits is not None:
+                    width = evaluator.evaluate(bits)
+                    field["bit_width"] = bits.strip() if width is None else width
+
+                meta = type_index.classify(clean_base)
+                field.update(meta)
+                if meta["canonical_type"] in union_names:
+                    field["is_union"] = True
+
+                fields.append(field)
+        return fields
+
+    for m in records["struct"]:
+        name   = m.group("name")
+        fields = parse_members(m.group("body"))
+        if m.group("kind") == "union":
+            parse_result["union_fields"][name] = fields
+            union_names.add(name)
+            continue
+        parse_result["struct_fields"][name] = fields
+        type_index.add_struct(name)
+
+
+    # 7a) Promote typedef aliases into struct_fields
+    def _resolve_type(t):
+        seen = set()
+        while t in parse_result["typedef_map"] and t not in seen:
+            seen.add(t)
+            t = parse_result["typedef_map"][t]
+        return t
+
+    for alias in list(parse_result["typedef_map"]):
+        root = _resolve_type(alias)
+        if root in parse_result["struct_fields"]:
+            parse_result["struct_fields"][alias] = parse_result["struct_fields"][root]
+            type_index.add_struct(alias)
+        elif root in parse_result["union_fields"]:
+            parse_result["union_fields"][alias] = parse_result["union_fields"][root]
+
+    # 8) Prototypes were already stripped of calling conventions and collapsed
+    #    onto one line by the scanner
+    # Helper: collapse C-style array syntax into pointer + size
+    def normalize_array(tp, nm):
+        # e.g. "float vals[16]" → ("float*", "vals", "16")
+        if '[' in nm and nm.endswith(']'):
+            idx      = nm.index('[')
+            size     = nm[idx+1:-1]
+            nm_clean = nm[:idx]
+            tp_ptr   = (tp + '*').strip()
+            return tp_ptr, nm_clean, size
+        return tp, nm, None
     
-    # 5) Everything else numeric → double
-    rec["is_standard_numeric"] = True
-    rec["extension_type"] = "double"
-    return rec
+    # 9) Functions
+    for m in records["function"]:
+        fn_name = m.group("name")
+        raw_args = m.group("args").strip()
+        # split args by commas *outside* nested angle brackets or parentheses:
+        args = re.split(r',\s*(?![^<]*>)', raw_args) if raw_args else []
+        arg_list = []
+        for a in args:
+            a = a.strip()
+            if not a or a.lower() == "void":
+                continue
+            # split into type and name
+            parts = a.rsplit(' ', 1)
+            if len(parts) == 2:
+                tp, nm = parts
+            else:
+                tp, nm = parts[0], f"arg{len(arg_list)}"
+            
+            # normalize C-style arrays → pointers + capture size
+            tp, nm, array_size = normalize_array(tp, nm)
+
+            meta = type_index.classify(tp)
+
+            if array_size is not None:
+                meta["is_ref"]         = True
+                meta["extension_type"] = "string"
+
+            entry = {"name": nm, "type": tp, **meta}
+            if array_size and array_size.strip():
+                # keep the fixed extent: the pointer stands for that many elements
+                value = evaluator.evaluate(array_size)
+                entry["array_size"] = array_size.strip() if value is None else value
+            arg_list.append(entry)
+
+        ret_meta = type_index.classify(m.group("ret").strip())
+        parse_result["functions"].append({
+            "name":        fn_name,
+            "return_type": ret_meta["canonical_type"],
+            "return_meta": ret_meta,
+            "args":        arg_list
+        })
+
+    skip_prefixes = config.get("skip_function_prefixes", [])
+    if skip_prefixes:
+        filtered = []
+        for fn in parse_result["functions"]:
+            name = fn.get("name", "")
+            # if it matches any of the skip-prefixes, drop it
+            if any(name.startswith(pref) for pref in skip_prefixes):
+                if profile_option(config, "verbose"):
+                    print(f"[GMBridge] Skipping function '{name}' (prefix filter)")
+                continue
+            filtered.append(fn)
+        parse_result["functions"] = filtered
+
+    return parse_result, content
+
+
+def parse_one_header(hdr, full_cmd, tool_path, config):
+    """
+    Preprocess and parse a single header. Top-level so it can run inside a
+    ProcessPoolExecutor worker.
+    Returns (parse_result, cache_hit, seconds_spent, seconds_uncached).
+    """
+    # 5) Run it (or reuse cached output), capturing stdout for parsing
+    content = run_preprocessor(full_cmd, tool_path, [full_cmd[-1]], config)
+
+    # In the debug profile, dump the preprocessed content – on parse cache
+    # hits too, since the parse cache key does not include the profile
+    if profile_option(config, "debug_dumps"):
+        # Compute a safe filename: <originalbasename>_expanded.h
+        base_name = os.path.splitext(os.path.basename(hdr))[0]
+        dump_name = f"{base_name}_expanded.h"
+        write_if_changed(dump_name, content)
+        print(f"[GMBridge] Wrote expanded macros to: {dump_name}")
+
+    # 6) Parse it, reusing the cached per-file result when the text is unchanged
+    parse_key = parse_cache_key(content, config)
+    started   = time.perf_counter()
+    cached    = load_parse_result(config, parse_key)
+    if cached is not None:
+        parse_result, parse_seconds = cached
+        print(f"[GMBridge] Parse cache hit for {hdr} ({parse_key[:12]})")
+        return parse_result, 1, time.perf_counter() - started, parse_seconds
+
+    parse_result, _ = parse_preprocessed(content, config)
+    parse_seconds = time.perf_counter() - started
+    store_parse_result(config, parse_key, parse_result, parse_seconds)
+
+    return parse_result, 0, parse_seconds, parse_seconds
+
+
+def read_library_exports(lib_path, config):
+    """
+    Exported symbol names for one library. COFF .lib, ELF .a and ELF .so files
+    are read natively (and cached by file hash); anything else falls back to
+    `dumpbin /EXPORTS` where that tool exists.
+    """
+    try:
+        key = symbols_key(lib_path, SYMBOL_READER_VERSION)
+        cached = load_symbols(config, key)
+        if cached is not None:
+            print(f"[GMBridge] Export cache hit for {lib_path!r}")
+            return cached
+        names = read_exported_symbols(lib_path)
+        store_symbols(config, key, names)
+        return names
+    except UnsupportedLibrary as err:
+        print(f"[GMBridge] {err}; falling back to dumpbin")
+    except OSError as err:
+        print(f"[GMBridge] Could not read {lib_path!r}: {err}")
+        return []
+
+    try:
+        proc = subprocess.run(
+            ["dumpbin", "/EXPORTS", str(lib_path)],
+            stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+            encoding="utf-8", check=True
+        )
+    except FileNotFoundError:
+        print(f"[GMBridge] dumpbin not found; no exports read from {lib_path!r}")
+        return []
+    except subprocess.CalledProcessError as err:
+        print(f"[GMBridge] dumpbin failed on {lib_path!r}: {err.stderr.strip()}")
+        return []
+
+    names = []
+    for line in proc.stdout.splitlines():
+        m = EXPORT_LINE_RE.match(line)
+        if m:
+            names.append(m.group(1))
+    return names
+
+def collect_exports(libraries, config):
+    """
+    Return {symbol: library} for every symbol exported by `libraries`, in the
+    order the libraries list them. The first library to export a name wins.
+    """
+    export_sources = {}
+    for lib_path_str in libraries:
+        lib_path = Path(lib_path_str)
+        print(f"[GMBridge] Reading exports from {lib_path!r}")
+        for name in read_library_exports(lib_path, config):
+            export_sources.setdefault(name, lib_path.as_posix())
+    return export_sources
+
+def prune_to_exports(parse_result, export_sources, config):
+    """
+    Keep only functions some library actually exports, and only exports that
+    correspond to a parsed function. Everything is a hashed lookup, so this is
+    linear in functions + exports.
+    Adds "export_sources" (symbol -> library) and "missing_exports" (header
+    functions no library provides) to parse_result.
+    """
+    funcs = parse_result.get("functions", [])
+    parse_result["exports"]         = list(export_sources)
+    parse_result["export_sources"]  = {}
+    parse_result["missing_exports"] = []
+    if not export_sources:
+        return
+
+    kept, missing = [], []
+    for fn in funcs:
+        (kept if fn["name"] in export_sources else missing).append(fn)
+    kept_names = {fn["name"] for fn in kept}
+
+    parse_result["functions"]       = kept
+    parse_result["exports"]         = [name for name in export_sources if name in kept_names]
+    parse_result["export_sources"]  = {name: export_sources[name] for name in parse_result["exports"]}
+    parse_result["missing_exports"] = [fn["name"] for fn in missing]
+
+    # Per-library attribution
+    per_lib = {}
+    for lib in export_sources.values():
+        per_lib.setdefault(lib, [0, 0])[0] += 1
+    for lib in parse_result["export_sources"].values():
+        per_lib[lib][1] += 1
+    for lib, (total, used) in per_lib.items():
+        print(f"[GMBridge]   {lib}: {total} exports, {used} bridged")
+
+    if missing:
+        print(f"[GMBridge] {len(missing)} header functions are not exported by any library")
+        if profile_option(config, "verbose"):
+            for fn in missing:
+                print(f"[GMBridge]   missing export: {fn['name']}")
 
 def parse_header(config):
     """
     Fully preprocesses and parses *any* C/C++ header.
     """
-    namespace = config.get("namespace", "")
-    
     header_files = [Path(p).as_posix() for p in config["include_files"]]
     # throw error for missing files
     for hdr in header_files:
@@ -220,327 +691,102 @@ def parse_header(config):
             define_flags.append(f"-D{d}")
 
     all_results = {"files": {}}
+    cache_stats = {"hits": 0, "actual": 0.0, "uncached": 0.0}
+
+    # 2) Pick a preprocessor (user override first, then platform defaults)
+    candidates = []
+    if "preprocessor" in config:
+        candidates.append(config["preprocessor"])
+    if sys.platform.startswith("win"):
+        candidates += [
+            ["clang", "-E", "-dD", "-P"],
+            ["gcc",   "-E", "-dD", "-P"],
+            ["cl", "/E", "/nologo"],
+        ]
+    else:
+        candidates += [
+            ["cpp", "-P", "-dD", "-std=c99"],   # <-- preserve conditionals
+            ["clang", "-E", "-dD", "-P"],
+            ["gcc", "-E", "-dD", "-P"]
+        ]
+
+
+    cpp_cmd = None
+    for cmd in candidates:
+        tool = cmd[0]
+        path = shutil.which(tool)
+        print(f"[GMBridge] Checking for preprocessor '{tool}': {path}")
+        if path:
+            cpp_cmd = cmd + define_flags
+            print(f"[GMBridge] → Using preprocessor: {cmd!r} (resolved to {path})")
+            break
 
-    for hdr in header_files:
-        # 2) Pick a preprocessor (user override first, then platform defaults)
-        candidates = []
-        if "preprocessor" in config:
-            candidates.append(config["preprocessor"])
-        if sys.platform.startswith("win"):
-            candidates += [
-                ["clang", "-E", "-dD", "-P"],
-                ["gcc",   "-E", "-dD", "-P"],
-                ["cl", "/E", "/nologo"],
-            ]
-        else:
-            candidates += [
-                ["cpp", "-P", "-dD", "-std=c99"],   # <-- preserve conditionals
-                ["clang", "-E", "-dD", "-P"],
-                ["gcc", "-E", "-dD", "-P"]
-            ]
-
-
-        cpp_cmd = None
-        for cmd in candidates:
-            tool = cmd[0]
-            path = shutil.which(tool)
-            print(f"[GMBridge] Checking for preprocessor '{tool}': {path}")
-            if path:
-                cpp_cmd = cmd + define_flags
-                print(f"[GMBridge] → Using preprocessor: {cmd!r} (resolved to {path})")
-                break
-
-        if cpp_cmd is None:
-            tried = ", ".join(c[0] for c in candidates)
-            raise RuntimeError(f"No C preprocessor found. Tried: {tried}")
-
-        # 3) Decide include-flag syntax
-        inc_flag = "/I" if cpp_cmd[0].lower() == "cl" else "-I"
-
-        # 4) Build and log the full command with absolute paths
-        full_cmd = cpp_cmd + [f"{inc_flag}{folder}" for folder in include_folders] + include_files
-        print(f"[GMBridge] Running preprocessor: {full_cmd!r}")
-
-        # 5) Run it, capturing stdout for parsing
-        try:
-            proc = subprocess.run(
-                full_cmd,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                check=True,
-                encoding="utf-8"
-            )
-            content = proc.stdout
-
-        except subprocess.CalledProcessError as err:
-            print(f"[GMBridge] Preprocessor failed (exit {err.returncode}). stderr:\n{err.stderr}")
-            raise
-
-
-
-        # 2) Collapse continuations
-        content = LINE_CONTINUATION_RE.sub(' ', content)
-
-        parse_result = {
-            "functions":            [],
-            "enums":                {},
-            "constants":            {},
-            "typedef_map":          {},
-            "using_map":            {},
-            "struct_fields":        {},
-            "function_ptr_aliases": []
-        }
-
-        # 3) Function-pointer typedefs
-        ptr_aliases = {m.group("alias") for m in FUNC_PTR_RE.finditer(content)}
-        parse_result["function_ptr_aliases"] = sorted(ptr_aliases)
-
-        # 4) Enums
-        for m in ENUM_RE.finditer(content):
-            raw, body, alias = m.group(1), m.group(2), m.group(3)
-            name = alias or raw or "unnamed_enum"
-            entries, val = {}, 0
-            for line in body.split(','):
-                line = line.strip()
-                if not line: continue
-                if '=' in line:
-                    k,v = map(str.strip, line.split('=',1))
-                    try: val = int(v,0)
-                    except: val = 0
-                else:
-                    k = line
-                entries[k] = val; val += 1
-
-            # strip prefixes/suffixes
-            short = name[len(namespace):] if name.lower().startswith(namespace.lower()) else name
-            pre, suf = get_enum_prefix_suffix_cleanup(entries.keys())
-            cleaned = {}
-            for k,v in entries.items():
-                ck = (k[len(pre):] if pre and k.startswith(pre) else k)
-                if suf and ck.endswith(suf): ck = ck[:-len(suf)]
-                cleaned[ck] = v
-            cleaned["_meta"] = {"namespace":namespace,"short_name":short,"base_prefix":pre,"base_suffix":suf}
-            parse_result["enums"][name] = cleaned
-
-        # 5) Constants
-        for name, val in CONST_RE.findall(content):
-            parse_result["constants"][name] = (val if val.startswith('"') else int(val,0))
-
-        # 6) Typedefs & usings & struct‐handle typedefs
-        for full, alias in TYPEDEF_RE.findall(content):
-            parse_result["typedef_map"][alias] = full.strip()
-        for alias, target in USING_RE.findall(content):
-            parse_result["using_map"][alias] = target.strip()
-        for struct_name, alias in HANDLE_RE.findall(content):
-            # e.g. struct_name="XrSpace", alias="XrSpace"
-            parse_result["typedef_map"][alias] = f"struct {struct_name}_T *"
-            
-        # 7) Structs
-        for m in STRUCT_RE.finditer(content):
-            name = m.group("name")
-            body = m.group("body")
-            fields = []
-            for line in body.split(';'):
-                line = line.strip()
-                if not line:
-                    continue
-
-                # — Handle comma-separated declarations (e.g. "unsigned short _Byte, _State")
-                parts = [p.strip() for p in line.split(',')]
-                if len(parts) > 1:
-                    # first part has full “type name”
-                    decls = [parts[0]]
-                    # extract base type (everything before the last space)
-                    base, _ = parts[0].rsplit(None, 1)
-                    # rebuild the remaining names with that base
-                    for extra in parts[1:]:
-                        decls.append(f"{base} {extra}")
-                else:
-                    decls = [line]
-
-                # now parse each small declaration separately
-                for decl in decls:
-                    am = re.match(r'''
-                        (.+?)             # group(1): the raw base type
-                        \s+
-                        (\**\w+)          # group(2): the field name
-                        (?:\s*\[\s*       # optionally an array
-                            ([^\]]+)
-                        \s*\]
-                        )?
-                        $
-                    ''', decl, re.VERBOSE)
-                    if not am:
-                        continue
-
-                    raw_base, nm, sz = am.group(1).strip(), am.group(2).strip(), am.group(3)
-                    clean_base = re.sub(r'\b[A-Z_][A-Z0-9_]*\b', '', raw_base).replace('  ', ' ').strip()
-
-                    field = {"name": nm, "type": clean_base}
-                    if sz is not None:
-                        try:
-                            field["array_size"] = int(sz)
-                        except ValueError:
-                            field["array_size"] = sz
-
-                    meta = classify_c_type(parse_result, clean_base, config)
-                    field.update(meta)
-
-                    fields.append(field)
-
-            parse_result["struct_fields"][name] = fields
-
-
-        # 7a) Promote typedef aliases into struct_fields
-        def _resolve_type(t):
-            seen = set()
-            while t in parse_result["typedef_map"] and t not in seen:
-                seen.add(t)
-                t = parse_result["typedef_map"][t]
-            return t
-
-        for alias in list(parse_result["typedef_map"]):
-            root = _resolve_type(alias)
-            if root in parse_result["struct_fields"]:
-                parse_result["struct_fields"][alias] = parse_result["struct_fields"][root]
-
-        # 8) Cleanup
-        # Strip calling conventions
-        content = re.sub(r'\b__stdcall\b', '', content)
-        content = re.sub(r'\b__cdecl\b',   '', content)
-        content = re.sub(r'\b__fastcall\b','', content)
-        
-        # Collapse multi-line prototypes into single lines:
-        #   - join any lines that are inside parentheses
-        def _collapse_proto(match):
-            inner = match.group(1).replace('\n', ' ').strip()
-            return "(" + inner + ")"
-
-        # This will find the first "(" up to the matching ")" and flatten interior newlines
-        content = re.sub(r'\(\s*(.*?)\s*\)', _collapse_proto, content, flags=re.DOTALL)
-        
-        # Finally, ensure each prototype ends on its own line
-        content = re.sub(r'\)\s*;\s*', ');' + '\n', content)
-        
-        # Helper: collapse C-style array syntax into pointer + size
-        def normalize_array(tp, nm):
-            # e.g. "float vals[16]" → ("float*", "vals", "16")
-            if '[' in nm and nm.endswith(']'):
-                idx      = nm.index('[')
-                size     = nm[idx+1:-1]
-                nm_clean = nm[:idx]
-                tp_ptr   = (tp + '*').strip()
-                return tp_ptr, nm_clean, size
-            return tp, nm, None
-        
-        # 9) Functions
-        for m in FUNC_RE.finditer(content):
-            fn_name = m.group("name")
-            raw_args = m.group("args").strip()
-            # split args by commas *outside* nested angle brackets or parentheses:
-            args = re.split(r',\s*(?![^<]*>)', raw_args) if raw_args else []
-            arg_list = []
-            for a in args:
-                a = a.strip()
-                if not a or a.lower() == "void":
-                    continue
-                # split into type and name
-                parts = a.rsplit(' ', 1)
-                if len(parts) == 2:
-                    tp, nm = parts
-                else:
-                    tp, nm = parts[0], f"arg{len(arg_list)}"
-                
-                # normalize C-style arrays → pointers + capture size
-                tp, nm, array_size = normalize_array(tp, nm)
-
-                meta = classify_c_type(parse_result, tp, config)
-
-                if array_size is not None:
-                    meta["is_ref"]         = True
-                    meta["extension_type"] = "string"
-
-                entry = {"name": nm, "type": tp, **meta}
-                arg_list.append(entry)
-
-            ret_meta = classify_c_type(parse_result, m.group("ret").strip(), config)
-            parse_result["functions"].append({
-                "name":        fn_name,
-                "return_type": ret_meta["canonical_type"],
-                "return_meta": ret_meta,
-                "args":        arg_list
-            })
-
-        skip_prefixes = config.get("skip_function_prefixes", [])
-        if skip_prefixes:
-            filtered = []
-            for fn in parse_result["functions"]:
-                name = fn.get("name", "")
-                # if it matches any of the skip-prefixes, drop it
-                if any(name.startswith(pref) for pref in skip_prefixes):
-                    if config.get("debug", False):
-                        print(f"[GMBridge] Skipping function '{name}' (prefix filter)")
-                    continue
-                filtered.append(fn)
-            parse_result["functions"] = filtered
-
-        # If debugging is enabled, dump the preprocessed content
-        if config.get("debug", False):
-            # Compute a safe filename: <originalbasename>_expanded.h
-            base_name = os.path.splitext(os.path.basename(hdr))[0]
-            dump_name = f"{base_name}_expanded.h"
-            with open(dump_name, "w", encoding="utf-8") as dbg_file:
-                dbg_file.write(content)
-            print(f"[GMBridge] Wrote expanded macros to: {dump_name}")
-
+    if cpp_cmd is None:
+        tried = ", ".join(c[0] for c in candidates)
+        raise RuntimeError(f"No C preprocessor found. Tried: {tried}")
+
+    # 3) Decide include-flag syntax
+    inc_flag = "/I" if cpp_cmd[0].lower() == "cl" else "-I"
+    tool_path = shutil.which(cpp_cmd[0])
+
+    # 4) One job per header: every header sees all include folders but is
+    #    preprocessed and parsed on its own
+    jobs_args = [
+        (hdr, cpp_cmd + [f"{inc_flag}{folder}" for folder in include_folders] + [abs_hdr], tool_path, config)
+        for hdr, abs_hdr in zip(header_files, include_files)
+    ]
+
+    jobs = int(config.get("jobs", 1) or os.cpu_count() or 1)
+    if jobs > 1 and len(jobs_args) > 1:
+        print(f"[GMBridge] Parsing {len(jobs_args)} headers with {jobs} worker processes")
+        with ProcessPoolExecutor(max_workers=min(jobs, len(jobs_args))) as pool:
+            # map() yields in submission order, so the merge order matches the serial path
+            header_results = list(pool.map(parse_one_header, *zip(*jobs_args)))
+    else:
+        header_results = [parse_one_header(*args) for args in jobs_args]
+
+    for hdr, (parse_result, hit, actual, uncached) in zip(header_files, header_results):
+        cache_stats["hits"]     += hit
+        cache_stats["actual"]   += actual
+        cache_stats["uncached"] += uncached
         all_results["files"][hdr] = parse_result
 
+
     
+    started = time.perf_counter()
     parse_result = flatten_parse_data(all_results)
+    flatten_seconds = time.perf_counter() - started
 
-    # If the user supplied one or more .lib files, extract their exported symbols
-    exports = []
-    for lib_path_str in config.get("libraries", []):
-        lib_path = Path(lib_path_str)
-        print(f"[GMBridge] Dumping exports from {lib_path!r}")
-        try:
-            proc = subprocess.run(
-                ["dumpbin", "/EXPORTS", str(lib_path)],
-                stdout=subprocess.PIPE, stderr=subprocess.PIPE,
-                encoding="utf-8", check=True
-            )
-        except subprocess.CalledProcessError as err:
-            print(f"[GMBridge] dumpbin failed on {lib_path!r}: {err.stderr.strip()}")
-            continue
+    # Run summary for the per-header parse cache
+    actual   = cache_stats["actual"] + flatten_seconds
+    uncached = cache_stats["uncached"] + flatten_seconds
+    speedup  = f"{uncached / actual:.1f}x" if actual > 0 else "n/a"
+    print(
+        f"[GMBridge] Parse cache: reused {cache_stats['hits']}/{len(header_files)} headers, "
+        f"{actual:.3f}s vs {uncached:.3f}s uncached ({speedup})"
+    )
 
-        for line in proc.stdout.splitlines():
-            m = re.match(r'^\s+([A-Za-z_]\w+)$', line)
-            if m:
-                exports.append(m.group(1))
-    
-    parse_result["exports"] = exports
+    # If the user supplied one or more .lib files, extract their exported symbols
+    export_sources = collect_exports(config.get("libraries", []), config)
 
-    
     # Report counts before pruning
     funcs = parse_result.get("functions", [])
-    print(f"[GMBridge] Parsed {len(funcs)} functions, found {len(exports)} exports")
+    print(f"[GMBridge] Parsed {len(funcs)} functions, found {len(export_sources)} exports")
 
-    # Now prune to intersection: only keep functions whose names are in exports,
-    # and only keep export names that correspond to a parsed function.
-    funcs = parse_result.get("functions", [])
-    if parse_result["exports"]:
-        pruned_funcs = [fn for fn in funcs if fn["name"] in parse_result["exports"]]
-        pruned_exports = [name for name in parse_result["exports"]
-                          if any(fn["name"] == name for fn in pruned_funcs)]
-        parse_result["functions"] = pruned_funcs
-        parse_result["exports"]   = pruned_exports
+    prune_to_exports(parse_result, export_sources, config)
 
     # Report counts after pruning
     print(f"[GMBridge] Kept {len(parse_result['functions'])} functions, {len(parse_result['exports'])} exports")
 
-    
-    if config.get("debug"):
-        with open("debug_parser.json","w",encoding="utf-8") as f:
-            json.dump(parse_result, f, indent=2)
+    # Natural C layout (offsets, sizes, padding) of every struct and union
+    layouts, failures = compute_layouts(parse_result)
+    parse_result["struct_layouts"] = layouts
+    print(f"[GMBridge] Laid out {len(layouts)} structs/unions, {len(failures)} with unknown member sizes")
+    if profile_option(config, "verbose"):
+        for name, reason in failures.items():
+            print(f"[GMBridge]   no layout for {name}: {reason}")
+
+    if profile_option(config, "debug_dumps"):
+        write_if_changed("debug_parser.json", json.dumps(parse_result, indent=2))
 
     return parse_result
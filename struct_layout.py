@@ -0,0 +1,172 @@
+import re
+
+from generator.marshaling import BUFFER_SCALARS
+
+# ——— C struct layouts ———
+# The natural (unpacked) layout MSVC gives every parsed struct and union on
+# x64: each member aligned to its own alignment, pointers, handles and
+# function pointers 8 bytes, enums 4, and runs of bitfields packed into
+# storage units of their declared type (a new unit whenever the type size
+# changes or the bits run out; ":0" pads to the next boundary). #pragma
+# pack is not modelled; the static_asserts the bridge emits with config
+# "layout_asserts" are what catch a header that uses it.
+
+POINTER_SIZE = 8
+ENUM_SIZE    = 4
+
+# Scalar name → size in bytes (alignment == size)
+SCALAR_SIZES = {name: size for name, (_, _, size) in BUFFER_SCALARS.items()}
+SCALAR_SIZES.update({
+    "signed": 4, "unsigned": 4, "wchar_t": 2, "char16_t": 2, "char32_t": 4,
+    "size_t": 8, "ptrdiff_t": 8, "intptr_t": 8, "uintptr_t": 8,
+    "__int64": 8, "unsigned __int64": 8, "long double": 8,
+})
+
+TAG_PREFIXES = ("struct ", "union ", "enum ")
+QUALIFIER_RE = re.compile(r'\b(?:const|volatile)\b\s*')
+
+
+def align_up(offset, align):
+    return (offset + align - 1) // align * align
+
+
+class LayoutError(ValueError):
+    pass
+
+
+def compute_layouts(parse_result) -> tuple[dict, dict]:
+    """
+    Layout of every struct (struct_fields) and union (union_fields) whose
+    members all have a known size, keyed by its canonical name:
+        {"kind", "size", "align", "padding", "fields": [...]}
+    "padding" is the tail padding. Each field entry carries name, offset,
+    size and align (of one element), count (all array extents multiplied),
+    dims, and padding (bytes inserted before it); bitfields add bit_offset
+    and bit_width, fields of a struct/union type name it in "struct", and
+    inline (nested) struct/union members carry their own "layout". Typedef
+    aliases are not repeated.
+    Returns (layouts, {name: reason} for the structs left out).
+    """
+    typedef_map = parse_result["typedef_map"]
+    using_map   = parse_result["using_map"]
+    enum_names  = set(parse_result["enums"])
+    aggregates  = {name: ("struct", fields) for name, fields in parse_result["struct_fields"].items()}
+    aggregates.update(
+        (name, ("union", fields)) for name, fields in parse_result.get("union_fields", {}).items()
+    )
+
+    layouts, failed, visiting = {}, {}, set()
+
+    def named(name):
+        if name in layouts:
+            return layouts[name]
+        if name in failed:
+            raise LayoutError(failed[name])
+        if name in visiting:
+            raise LayoutError(f"{name} contains itself")
+        visiting.add(name)
+        try:
+            kind, fields = aggregates[name]
+            layouts[name] = aggregate(kind, fields)
+        except LayoutError as err:
+            failed[name] = str(err)
+            raise
+        finally:
+            visiting.discard(name)
+        return layouts[name]
+
+    def element(field):
+        """(size, align, struct/union name) of one element of a plain field."""
+        if field.get("has_pointer") or field.get("is_function_ptr"):
+            return POINTER_SIZE, POINTER_SIZE, None
+        if field.get("is_enum"):
+            return ENUM_SIZE, ENUM_SIZE, None
+        # Walk the typedef chain one step at a time: the fixed-width names
+        # (int64_t, uint32_t…) must win over whatever the platform headers
+        # the preprocessor saw define them as
+        name, seen = QUALIFIER_RE.sub('', field["type"]).strip(), set()
+        while True:
+            for prefix in TAG_PREFIXES:
+                if name.startswith(prefix):
+                    name = name[len(prefix):].strip()
+            if name in enum_names:
+                return ENUM_SIZE, ENUM_SIZE, None
+            if name in aggregates:
+                # aliases (typedef XrUuid XrUuidEXT) share the canonical layout
+                while typedef_map.get(name, name) in aggregates and typedef_map.get(name, name) != name:
+                    name = typedef_map[name]
+                inner = named(name)
+                return inner["size"], inner["align"], name
+            scalar = name.lower()
+            if scalar.startswith("signed ") and scalar != "signed char":
+                scalar = scalar[len("signed "):]
+            if scalar in SCALAR_SIZES:
+                return SCALAR_SIZES[scalar], SCALAR_SIZES[scalar], None
+            target = typedef_map.get(name) or using_map.get(name)
+            if target is None or name in seen:
+                raise LayoutError(f"unknown size of {field['type']!r} ({field['name'] or 'anonymous'})")
+            seen.add(name)
+            name = target.strip()
+
+    def aggregate(kind, fields):
+        entries, end, max_align = [], 0, 1
+        unit = None   # open bitfield storage unit: [offset, size, bits used]
+        for field in fields:
+            inner = struct = None
+            if "members" in field:
+                inner = aggregate(field["aggregate"], field["members"])
+                size, align = inner["size"], inner["align"]
+            else:
+                size, align, struct = element(field)
+            dims = field.get("array_dims") or []
+            if any(not isinstance(dim, int) for dim in dims):
+                raise LayoutError(f"unknown array extent in {field['name']}")
+            count = 1
+            for dim in dims:
+                count *= dim
+
+            entry = {"name": field["name"], "size": size, "align": align, "count": count, "dims": dims}
+            width = field.get("bit_width")
+            if width is not None:
+                if not isinstance(width, int):
+                    raise LayoutError(f"unknown bitfield width of {field['name']}")
+                if width == 0:
+                    # ":0" closes the open unit and pads to its own type's boundary
+                    if unit and kind == "struct":
+                        end = align_up(end, align)
+                    unit = None
+                    continue
+                if kind == "union":
+                    offset, bit_offset = 0, 0
+                elif unit and unit[1] == size and unit[2] + width <= size * 8:
+                    offset, bit_offset = unit[0], unit[2]
+                    unit[2] += width
+                else:
+                    offset, bit_offset = align_up(end, align), 0
+                    unit = [offset, size, width]
+                entry.update(bit_offset=bit_offset, bit_width=width)
+            else:
+                unit   = None
+                offset = 0 if kind == "union" else align_up(end, align)
+
+            entry["offset"]  = offset
+            entry["padding"] = max(offset - end, 0) if kind == "struct" else 0
+            if struct is not None:
+                entry["struct"] = struct
+            if inner is not None:
+                entry["layout"] = inner
+            entries.append(entry)
+            max_align = max(max_align, align)
+            end = max(end, offset + size * count)
+
+        size = align_up(end, max_align)
+        return {"kind": kind, "size": size, "align": max_align, "padding": size - end, "fields": entries}
+
+    for name in aggregates:
+        if typedef_map.get(name, name) != name:
+            continue
+        try:
+            named(name)
+        except LayoutError:
+            pass
+    return layouts, failed
@@ -0,0 +1,179 @@
+import mmap
+import struct
+from pathlib import Path
+
+# Bump when the extraction rules change so cached symbol lists are rebuilt.
+SYMBOL_READER_VERSION = 1
+
+AR_MAGIC         = b"!<arch>\n"
+AR_HEADER_SIZE   = 60
+ELF_MAGIC        = b"\x7fELF"
+
+# ELF constants
+SHT_DYNSYM       = 11
+SHN_UNDEF        = 0
+SHN_ABS          = 0xFFF1    # version-definition markers (GLIBC_2.2.5, …) live here
+STB_GLOBAL       = 1
+STB_WEAK         = 2
+STT_OBJECT       = 1
+STT_FUNC         = 2
+STT_GNU_IFUNC    = 10
+
+# COFF short import header (IMPORT_OBJECT_HEADER)
+IMPORT_OBJECT_HDR_SIZE   = 20
+IMPORT_OBJECT_ORDINAL    = 0
+IMPORT_OBJECT_NAME       = 1
+IMPORT_OBJECT_NO_PREFIX  = 2
+IMPORT_OBJECT_UNDECORATE = 3
+
+# Linker-member entries that are import plumbing, not exported API
+IMPORT_PLUMBING = ("__IMPORT_DESCRIPTOR_", "__NULL_IMPORT_DESCRIPTOR", "_NULL_THUNK_DATA")
+
+
+class UnsupportedLibrary(ValueError):
+    """Raised when a file is not a COFF/ELF archive or ELF shared object."""
+
+
+def read_exported_symbols(path) -> list[str]:
+    """
+    Return the exported symbol names of a COFF import/static library (.lib),
+    an ELF static archive (.a) or an ELF shared object (.so), in file order
+    and without duplicates. The file is memory-mapped, never fully copied.
+    """
+    path = Path(path)
+    with open(path, "rb") as f:
+        if path.stat().st_size == 0:
+            raise UnsupportedLibrary(f"{path} is empty")
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            if data[:len(AR_MAGIC)] == AR_MAGIC:
+                names = _read_archive(data)
+            elif data[:len(ELF_MAGIC)] == ELF_MAGIC:
+                names = _read_elf_dynsym(data, 0)
+            else:
+                raise UnsupportedLibrary(f"{path} is not an ar archive or ELF object")
+    return list(dict.fromkeys(names))
+
+
+# ——— ar archives (COFF .lib and ELF .a share the container) ———
+
+def _archive_members(data):
+    """Yield (name, offset, size) for every member of an ar archive."""
+    pos = len(AR_MAGIC)
+    end = len(data)
+    while pos + AR_HEADER_SIZE <= end:
+        header = data[pos:pos + AR_HEADER_SIZE]
+        if header[58:60] != b"`\n":
+            break
+        name = header[0:16].decode("ascii", "replace").rstrip()
+        size = int(header[48:58].decode("ascii").strip() or 0)
+        body = pos + AR_HEADER_SIZE
+        yield name, body, size
+        pos = body + size + (size & 1)
+
+
+def _read_archive(data) -> list[str]:
+    linker_symbols = None
+    imports = []
+    for name, offset, size in _archive_members(data):
+        if name in ("/", "/SYM64/"):
+            # The first "/" member is the (big-endian) symbol index written by
+            # both MSVC lib and GNU ar; MSVC's second "/" member is redundant.
+            if linker_symbols is None:
+                linker_symbols = _read_symbol_index(data, offset, size, wide=(name == "/SYM64/"))
+            continue
+        if name == "//":
+            continue
+        imported = _read_short_import(data, offset, size)
+        if imported:
+            imports.append(imported)
+
+    # Import libraries describe every export with a short import object, which
+    # carries the undecorated name the DLL actually exports.
+    if imports:
+        return imports
+
+    names = []
+    for sym in linker_symbols or []:
+        if any(marker in sym for marker in IMPORT_PLUMBING):
+            continue
+        if sym.startswith("__imp_"):
+            sym = sym[len("__imp_"):]
+        names.append(sym)
+    return names
+
+
+def _read_symbol_index(data, offset, size, wide=False) -> list[str]:
+    word   = 8 if wide else 4
+    fmt    = ">Q" if wide else ">I"
+    count, = struct.unpack_from(fmt, data, offset)
+    strings_at = offset + word + count * word
+    strings = data[strings_at:offset + size].split(b"\0")
+    return [s.decode("ascii", "replace") for s in strings[:count] if s]
+
+
+def _read_short_import(data, offset, size) -> str | None:
+    if size < IMPORT_OBJECT_HDR_SIZE:
+        return None
+    sig1, sig2 = struct.unpack_from("<HH", data, offset)
+    if sig1 != 0 or sig2 != 0xFFFF:
+        return None
+    type_info, = struct.unpack_from("<H", data, offset + 18)
+    name_type  = (type_info >> 2) & 0x7
+    if name_type == IMPORT_OBJECT_ORDINAL:
+        return None
+    strings = data[offset + IMPORT_OBJECT_HDR_SIZE:offset + size]
+    symbol  = strings.split(b"\0", 1)[0].decode("ascii", "replace")
+    if name_type in (IMPORT_OBJECT_NO_PREFIX, IMPORT_OBJECT_UNDECORATE):
+        symbol = symbol.lstrip("?@_")
+    if name_type == IMPORT_OBJECT_UNDECORATE:
+        symbol = symbol.split("@", 1)[0]
+    return symbol or None
+
+
+# ——— ELF shared objects ———
+
+def _read_elf_dynsym(data, base) -> list[str]:
+    ei_class = data[base + 4]
+    ei_data  = data[base + 5]
+    if ei_class not in (1, 2) or ei_data not in (1, 2):
+        raise UnsupportedLibrary("malformed ELF identification")
+    is64 = ei_class == 2
+    end  = "<" if ei_data == 1 else ">"
+
+    if is64:
+        e_shoff, = struct.unpack_from(end + "Q", data, base + 0x28)
+        e_shentsize, e_shnum = struct.unpack_from(end + "HH", data, base + 0x3A)
+        sh_fmt  = end + "IIQQQQIIQQ"
+        sym_fmt = end + "IBBHQQ"
+    else:
+        e_shoff, = struct.unpack_from(end + "I", data, base + 0x20)
+        e_shentsize, e_shnum = struct.unpack_from(end + "HH", data, base + 0x2E)
+        sh_fmt  = end + "IIIIIIIIII"
+        sym_fmt = end + "IIIBBH"
+
+    sections = [
+        struct.unpack_from(sh_fmt, data, base + e_shoff + i * e_shentsize)
+        for i in range(e_shnum)
+    ]
+
+    names = []
+    for sh in sections:
+        # (name, type, flags, addr, offset, size, link, info, addralign, entsize)
+        if sh[1] != SHT_DYNSYM:
+            continue
+        sym_off, sym_size, link, entsize = sh[4], sh[5], sh[6], sh[9]
+        str_off = sections[link][4]
+        for i in range(1, sym_size // entsize):   # entry 0 is always null
+            fields = struct.unpack_from(sym_fmt, data, base + sym_off + i * entsize)
+            if is64:
+                st_name, st_info, _, st_shndx = fields[0], fields[1], fields[2], fields[3]
+            else:
+                st_name, st_info, st_shndx = fields[0], fields[3], fields[5]
+            bind, kind = st_info >> 4, st_info & 0xF
+            if st_shndx in (SHN_UNDEF, SHN_ABS) or bind not in (STB_GLOBAL, STB_WEAK):
+                continue
+            if kind not in (STT_FUNC, STT_OBJECT, STT_GNU_IFUNC):
+                continue
+            start = base + str_off + st_name
+            names.append(data[start:data.find(b"\0", start)].decode("ascii", "replace"))
+    return names